@@ -97,6 +97,7 @@ class ExportDestinationAdmin(admin.ModelAdmin):
                     "id",
                     "title",
                     "description",
+                    "backend",
                     "username",
                     "password",
                     "destination",
@@ -113,6 +114,13 @@ class ExportDestinationAdmin(admin.ModelAdmin):
                     "socket_timeout",
                     "negotiation_timeout",
                     "banner_timeout",
+                    "max_connections",
+                    "max_bandwidth",
+                    "ciphers",
+                    "ssh_compression",
+                    "window_size",
+                    "max_packet_size",
+                    "block_size",
                 ),
             },
         ),
@@ -125,6 +133,8 @@ class ExportDestinationAdmin(admin.ModelAdmin):
             return False
         else:
             return True
+        finally:
+            destination.release_connection()
 
     sftp.boolean = True
 
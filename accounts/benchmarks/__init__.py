@@ -0,0 +1,3 @@
+"""
+Export transfer benchmarks, see :mod:`accounts.benchmarks.export_backends`.
+"""
@@ -0,0 +1,397 @@
+"""
+Benchmarks exports of synthetic DICOM and NIfTI trees through each export
+backend and transfer mode, and reports files and megabytes per second.
+
+SFTP transfers are benchmarked against an in-process SSH server by default
+(see :class:`~accounts.benchmarks.sftp_server.SFTPStandIn`), or against a
+real SSH server if one is specified.
+
+Examples
+--------
+.. code-block:: bash
+
+    python -m accounts.benchmarks.export_backends --dicom-files 2000
+    python -m accounts.benchmarks.export_backends --ssh user@10.0.0.1:22
+
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+#: Default number of synthetic DICOM files.
+DEFAULT_DICOM_FILES: int = 1000
+#: Default synthetic DICOM file size (bytes).
+DEFAULT_DICOM_SIZE: int = 512 * 1024
+#: Default number of synthetic NIfTI files.
+DEFAULT_NIFTI_FILES: int = 4
+#: Default synthetic NIfTI file size (bytes).
+DEFAULT_NIFTI_SIZE: int = 128 * 1024 * 1024
+#: Number of synthetic DICOM files per series directory.
+FILES_PER_SERIES: int = 200
+#: Benchmark result table row template.
+ROW_TEMPLATE: str = (
+    "{tree:<8}{backend:<30}{files_per_second:>12}{mb_per_second:>12}"
+    "{seconds:>10}"
+)
+
+
+def write_synthetic_file(path: Path, size: int) -> None:
+    """
+    Writes a synthetic file of *size* bytes, half random (incompressible)
+    and half zeros, roughly resembling the compressibility of imaging data.
+
+    Parameters
+    ----------
+    path : Path
+        File path
+    size : int
+        File size in bytes
+    """
+    half = size // 2
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as synthetic_file:
+        synthetic_file.write(os.urandom(half))
+        synthetic_file.write(bytes(size - half))
+
+
+def create_dicom_tree(root: Path, n_files: int, size: int) -> List[str]:
+    """
+    Creates a synthetic DICOM session tree of many small files.
+
+    Parameters
+    ----------
+    root : Path
+        Tree root
+    n_files : int
+        Number of files
+    size : int
+        File size in bytes
+
+    Returns
+    -------
+    List[str]
+        Created file paths
+    """
+    paths = []
+    for i in range(n_files):
+        series = i // FILES_PER_SERIES
+        path = root / "DICOM" / f"series_{series}" / f"{i}.dcm"
+        write_synthetic_file(path, size)
+        paths.append(str(path))
+    return paths
+
+
+def create_nifti_tree(root: Path, n_files: int, size: int) -> List[str]:
+    """
+    Creates a synthetic NIfTI tree of few large, uncompressed files.
+
+    Parameters
+    ----------
+    root : Path
+        Tree root
+    n_files : int
+        Number of files
+    size : int
+        File size in bytes
+
+    Returns
+    -------
+    List[str]
+        Created file paths
+    """
+    paths = []
+    for i in range(n_files):
+        path = root / "NIfTI" / f"{i}.nii"
+        write_synthetic_file(path, size)
+        paths.append(str(path))
+    return paths
+
+
+def get_destinations(
+    sources: List[str], source_root: Path, root: Path
+) -> List[str]:
+    """
+    Returns the destinations of *sources* under *root*, keeping their paths
+    relative to *source_root*.
+
+    Parameters
+    ----------
+    sources : List[str]
+        Local file paths
+    source_root : Path
+        Local tree root
+    root : Path
+        Destination root
+
+    Returns
+    -------
+    List[str]
+        Absolute destinations
+    """
+    return [
+        str(root / Path(source).relative_to(source_root))
+        for source in sources
+    ]
+
+
+def measure(export: Callable, sources: List[str]) -> Dict[str, float]:
+    """
+    Measures a single export run.
+
+    Parameters
+    ----------
+    export : Callable
+        Called to export all *sources*
+    sources : List[str]
+        Local file paths
+
+    Returns
+    -------
+    Dict[str, float]
+        Duration in seconds, files per second and MiB per second
+    """
+    n_bytes = sum(os.stat(source).st_size for source in sources)
+    start = time.perf_counter()
+    export()
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "files_per_second": len(sources) / seconds,
+        "mb_per_second": n_bytes / seconds / 1024 ** 2,
+    }
+
+
+def get_runs(export_destination) -> Dict[str, Callable]:
+    """
+    Returns the transfer modes benchmarked for *export_destination*.
+
+    Parameters
+    ----------
+    export_destination : ExportDestination
+        Export destination
+
+    Returns
+    -------
+    Dict[str, Callable]
+        Export functions, called with sources and destinations, by name
+    """
+    from accounts.models.utils.export_engine import ExportEngine
+
+    def run_async(sources, destinations):
+        with ExportEngine() as engine:
+            engine.run([(export_destination, sources, destinations, None)])
+
+    return {
+        "put": export_destination.put,
+        "put (4 channels)": lambda sources, destinations: (
+            export_destination.put(sources, destinations, workers=4)
+        ),
+        "tar": export_destination.put_tar,
+        "async": run_async,
+    }
+
+
+def benchmark(
+    export_destination,
+    name: str,
+    trees: Dict[str, List[str]],
+    source_root: Path,
+    root: Path,
+) -> List[Dict]:
+    """
+    Benchmarks all transfer modes of *export_destination* with each tree.
+
+    Parameters
+    ----------
+    export_destination : ExportDestination
+        Export destination
+    name : str
+        Backend name
+    trees : Dict[str, List[str]]
+        Synthetic file paths by tree name
+    source_root : Path
+        Local root of all trees
+    root : Path
+        Destination root in the host
+
+    Returns
+    -------
+    List[Dict]
+        Benchmark results
+    """
+    results = []
+    with export_destination:
+        for mode, export in get_runs(export_destination).items():
+            for tree, sources in trees.items():
+                run_name = f"{name}-{mode}-{tree}".replace(" ", "_")
+                destinations = get_destinations(
+                    sources, source_root, root / run_name
+                )
+                result = measure(
+                    lambda: export(sources, destinations), sources
+                )
+                result.update({"tree": tree, "backend": f"{name} {mode}"})
+                print(format_result(result), flush=True)
+                results.append(result)
+    return results
+
+
+def format_result(result: Dict) -> str:
+    """
+    Formats a benchmark result as a table row.
+
+    Parameters
+    ----------
+    result : Dict
+        Benchmark result
+
+    Returns
+    -------
+    str
+        Table row
+    """
+    return ROW_TEMPLATE.format(
+        tree=result["tree"],
+        backend=result["backend"],
+        files_per_second=f"{result['files_per_second']:.1f}",
+        mb_per_second=f"{result['mb_per_second']:.1f}",
+        seconds=f"{result['seconds']:.2f}",
+    )
+
+
+def parse_ssh_address(address: str) -> Tuple[str, str, int]:
+    """
+    Parses an SSH server address of the form *user@host[:port]*.
+
+    Parameters
+    ----------
+    address : str
+        SSH server address
+
+    Returns
+    -------
+    Tuple[str, str, int]
+        Username, host and port
+    """
+    username, _, host = address.rpartition("@")
+    host, _, port = host.partition(":")
+    return username, host, int(port or 22)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dicom-files", type=int, default=DEFAULT_DICOM_FILES)
+    parser.add_argument("--dicom-size", type=int, default=DEFAULT_DICOM_SIZE)
+    parser.add_argument("--nifti-files", type=int, default=DEFAULT_NIFTI_FILES)
+    parser.add_argument("--nifti-size", type=int, default=DEFAULT_NIFTI_SIZE)
+    parser.add_argument(
+        "--local-root",
+        help="Local or mounted export root (a temporary directory by default)",
+    )
+    parser.add_argument(
+        "--ssh",
+        help="Real SSH server to benchmark instead of the stand-in "
+        "(user@host[:port], the password is read from EXPORT_SSH_PASSWORD)",
+    )
+    parser.add_argument(
+        "--ssh-root", help="Export root in the real SSH server's host"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> List[Dict]:
+    """
+    Runs the benchmark suite.
+
+    Parameters
+    ----------
+    argv : List[str], optional
+        Command line arguments
+
+    Returns
+    -------
+    List[Dict]
+        Benchmark results
+    """
+    args = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pylabber.settings")
+    import django
+
+    django.setup()
+    from accounts.benchmarks.sftp_server import SFTPStandIn
+    from accounts.models.choices import ExportBackend
+    from accounts.models.export_destination import ExportDestination
+    from accounts.models.utils.connection_pool import CONNECTION_POOL
+
+    workspace = Path(tempfile.mkdtemp(prefix="export_benchmark_"))
+    source_root = workspace / "source"
+    try:
+        trees = {
+            "dicom": create_dicom_tree(
+                source_root, args.dicom_files, args.dicom_size
+            ),
+            "nifti": create_nifti_tree(
+                source_root, args.nifti_files, args.nifti_size
+            ),
+        }
+        print(
+            ROW_TEMPLATE.format(
+                tree="Tree",
+                backend="Backend",
+                files_per_second="Files/s",
+                mb_per_second="MiB/s",
+                seconds="Seconds",
+            )
+        )
+        local_root = Path(args.local_root or workspace / "local")
+        local = ExportDestination(
+            id=-1,
+            ip="127.0.0.1",
+            backend=ExportBackend.LOCAL.name,
+            destination=str(local_root),
+        )
+        results = benchmark(local, "local", trees, source_root, local_root)
+        if args.ssh:
+            username, host, port = parse_ssh_address(args.ssh)
+            ssh_root = Path(args.ssh_root or "/tmp/export_benchmark")
+            remote = ExportDestination(
+                id=-2,
+                ip=host,
+                port=port,
+                username=username,
+                password=os.environ.get("EXPORT_SSH_PASSWORD", ""),
+                destination=str(ssh_root),
+            )
+            results += benchmark(remote, "ssh", trees, source_root, ssh_root)
+        else:
+            with SFTPStandIn() as server:
+                stand_in_root = workspace / "sftp"
+                stand_in = ExportDestination(
+                    id=-2,
+                    ip=server.host,
+                    port=server.port,
+                    username="benchmark",
+                    password="benchmark",
+                    destination=str(stand_in_root),
+                )
+                results += benchmark(
+                    stand_in,
+                    "sftp stand-in",
+                    trees,
+                    source_root,
+                    stand_in_root,
+                )
+                # Close client transports before the server shuts down.
+                CONNECTION_POOL.close_all()
+    finally:
+        CONNECTION_POOL.close_all()
+        shutil.rmtree(workspace, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Definition of the :class:`SFTPStandIn` class, an in-process SSH server
+serving SFTP and exec requests over the local filesystem, used as a stand-in
+for a real SSH daemon when benchmarking SFTP exports.
+"""
+import os
+import socket
+import subprocess
+import threading
+from typing import List
+
+import paramiko
+
+#: Number of bytes relayed per read between exec channels and processes.
+RELAY_CHUNK_SIZE: int = 32 * 1024
+#: Number of seconds between checks for shutdown while accepting.
+ACCEPT_TIMEOUT: float = 0.2
+
+
+class StandInSFTPHandle(paramiko.SFTPHandle):
+    """
+    SFTP file handle over a local file.
+    """
+
+    def stat(self) -> paramiko.SFTPAttributes:
+        fileobj = self.readfile or self.writefile
+        try:
+            return paramiko.SFTPAttributes.from_stat(
+                os.fstat(fileobj.fileno())
+            )
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def chattr(self, attr: paramiko.SFTPAttributes) -> int:
+        return paramiko.SFTP_OK
+
+
+class StandInSFTPServer(paramiko.SFTPServerInterface):
+    """
+    SFTP server interface serving the local filesystem as is.
+    """
+
+    def list_folder(self, path: str):
+        try:
+            return [
+                paramiko.SFTPAttributes.from_stat(entry.stat(), entry.name)
+                for entry in os.scandir(path)
+            ]
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def stat(self, path: str):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def lstat(self, path: str):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.lstat(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def open(self, path: str, flags: int, attr: paramiko.SFTPAttributes):
+        try:
+            fd = os.open(path, flags | getattr(os, "O_BINARY", 0), 0o666)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        if flags & os.O_APPEND:
+            mode = "ab"
+        elif flags & os.O_WRONLY:
+            mode = "wb"
+        elif flags & os.O_RDWR:
+            mode = "r+b"
+        else:
+            mode = "rb"
+        handle = StandInSFTPHandle(flags)
+        handle.filename = path
+        handle.readfile = handle.writefile = os.fdopen(fd, mode)
+        return handle
+
+    def mkdir(self, path: str, attr: paramiko.SFTPAttributes) -> int:
+        try:
+            os.mkdir(path)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    def remove(self, path: str) -> int:
+        try:
+            os.remove(path)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+
+class StandInServer(paramiko.ServerInterface):
+    """
+    SSH server interface accepting any password and running exec requests as
+    local subprocesses.
+    """
+
+    def get_allowed_auths(self, username: str) -> str:
+        return "password"
+
+    def check_auth_password(self, username: str, password: str) -> int:
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(
+        self, channel: paramiko.Channel, command: bytes
+    ) -> bool:
+        thread = threading.Thread(
+            target=self.run_command, args=(channel, command), daemon=True
+        )
+        thread.start()
+        return True
+
+    def run_command(self, channel: paramiko.Channel, command: bytes) -> None:
+        """
+        Runs *command*, relaying its standard streams over *channel*.
+
+        Parameters
+        ----------
+        channel : paramiko.Channel
+            Exec channel
+        command : bytes
+            Shell command
+        """
+        process = subprocess.Popen(
+            command.decode(),
+            shell=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+        def relay_input() -> None:
+            while True:
+                data = channel.recv(RELAY_CHUNK_SIZE)
+                if not data:
+                    break
+                process.stdin.write(data)
+            process.stdin.close()
+
+        def relay_stderr() -> None:
+            while True:
+                data = process.stderr.read(RELAY_CHUNK_SIZE)
+                if not data:
+                    break
+                channel.sendall_stderr(data)
+
+        # Commands that do not read their input never see its end, so the
+        # input relay is not waited for.
+        threading.Thread(target=relay_input, daemon=True).start()
+        stderr_relay = threading.Thread(target=relay_stderr, daemon=True)
+        stderr_relay.start()
+        while True:
+            data = process.stdout.read(RELAY_CHUNK_SIZE)
+            if not data:
+                break
+            channel.sendall(data)
+        stderr_relay.join()
+        channel.send_exit_status(process.wait())
+        channel.close()
+
+
+class SFTPStandIn:
+    """
+    Context manager running an SSH server on the loopback interface, serving
+    SFTP and exec requests over the local filesystem. Any username and
+    password are accepted.
+
+    Examples
+    --------
+    >>> with SFTPStandIn() as server:
+    ...     destination = ExportDestination(ip=server.host, port=server.port)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Parameters
+        ----------
+        host : str, optional
+            Address to listen on
+        port : int, optional
+            Port to listen on, chosen by the operating system by default
+        """
+        self.host = host
+        self.port = port
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self._socket: socket.socket = None
+        self._transports: List[paramiko.Transport] = []
+        self._thread: threading.Thread = None
+        self._stop = threading.Event()
+
+    def __enter__(self) -> "SFTPStandIn":
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._socket.listen()
+        self._socket.settimeout(ACCEPT_TIMEOUT)
+        self.port = self._socket.getsockname()[1]
+        self._thread = threading.Thread(target=self.serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._socket.close()
+        for transport in self._transports:
+            transport.close()
+
+    def serve(self) -> None:
+        """
+        Accepts connections until the context is exited.
+        """
+        while not self._stop.is_set():
+            try:
+                connection, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            connection.settimeout(None)
+            transport = paramiko.Transport(connection)
+            transport.add_server_key(self.host_key)
+            transport.set_subsystem_handler(
+                "sftp", paramiko.SFTPServer, StandInSFTPServer
+            )
+            transport.start_server(server=StandInServer())
+            self._transports.append(transport)
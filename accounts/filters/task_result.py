@@ -2,27 +2,23 @@
 Definition of the :class:`TaskResultFilter` class.
 """
 from accounts.filters.utils import STATUS_CHOICES
+from accounts.models.task_lineage import TaskLineage
 from django_celery_results.models import TaskResult
 from django_filters import rest_framework as filters
 
 from pylabber.utils.filters import DEFUALT_LOOKUP_CHOICES
 
 
-class EmptyCharFilter(filters.CharFilter):
-    empty_value = "NULL"
-
-    def filter(self, qs, value):
-        if value != self.empty_value:
-            return super().filter(qs, value)
-
-        qs = self.get_method(qs)(**{f"{self.field_name}__isnull": True})
-        return qs.distinct() if self.distinct else qs
+#: Parent filter value selecting root tasks.
+EMPTY_PARENT: str = "NULL"
 
 
 class TaskResultFilter(filters.FilterSet):
     """
     Provides useful filtering options for the
     :class:`~accounts.models.export_destination.ExportDestination` model.
+    Parent and root task filters are resolved through the indexed task
+    lineage table (see :class:`~accounts.models.task_lineage.TaskLineage`).
     """
 
     task_id = filters.LookupChoiceFilter(lookup_choices=DEFUALT_LOOKUP_CHOICES)
@@ -31,8 +27,31 @@ class TaskResultFilter(filters.FilterSet):
     )
     worker = filters.LookupChoiceFilter(lookup_choices=DEFUALT_LOOKUP_CHOICES)
     status = filters.MultipleChoiceFilter(choices=STATUS_CHOICES)
-    parent = EmptyCharFilter(lookup_expr="exact", label="Parent task ID:")
+    parent = filters.CharFilter(
+        method="filter_by_parent", label="Parent task ID:"
+    )
+    root = filters.CharFilter(method="filter_by_root", label="Root task ID:")
 
     class Meta:
         model = TaskResult
-        fields = ("id", "parent")
+        fields = ("id", "parent", "root")
+
+    def filter_by_parent(self, queryset, name, value):
+        """
+        Returns the tasks published by the task with ID *value*, or the root
+        tasks if *value* is "NULL" (including tasks without a recorded
+        lineage).
+        """
+        if value == EMPTY_PARENT:
+            children = TaskLineage.objects.filter(parent_id__isnull=False)
+            return queryset.exclude(task_id__in=children.values("task_id"))
+        children = TaskLineage.objects.filter(parent_id=value)
+        return queryset.filter(task_id__in=children.values("task_id"))
+
+    def filter_by_root(self, queryset, name, value):
+        """
+        Returns the tasks in the tree of the root task with ID *value*,
+        including the root task itself.
+        """
+        tree = TaskLineage.objects.filter(root_id=value)
+        return queryset.filter(task_id__in=tree.values("task_id"))
@@ -15,6 +15,7 @@ class ExportDestinationForm(ModelForm):
             "id",
             "title",
             "description",
+            "backend",
             "ip",
             "port",
             "username",
@@ -23,5 +24,12 @@ class ExportDestinationForm(ModelForm):
             "socket_timeout",
             "negotiation_timeout",
             "banner_timeout",
+            "max_connections",
+            "max_bandwidth",
+            "ciphers",
+            "ssh_compression",
+            "window_size",
+            "max_packet_size",
+            "block_size",
             "users",
         )
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.3 on 2026-10-18 19:26
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_auto_20211126_1958'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportManifest',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('job_id', models.CharField(help_text='Identifier of the export job (usually the Celery task ID)', max_length=255)),
+                ('export_destination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='manifest_set', to='accounts.exportdestination')),
+            ],
+            options={
+                'unique_together': {('export_destination', 'job_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ExportManifestEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=1024)),
+                ('destination', models.CharField(db_index=True, help_text='Absolute destination path in the host', max_length=1024)),
+                ('size', models.BigIntegerField()),
+                ('mtime', models.FloatField(verbose_name='Modification time')),
+                ('state', models.CharField(choices=[('PENDING', 'Pending'), ('DONE', 'Done'), ('SKIPPED', 'Skipped'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('manifest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entry_set', to='accounts.exportmanifest')),
+            ],
+            options={
+                'verbose_name_plural': 'Export manifest entries',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.1.3 on 2026-10-18 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_exportmanifest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportTransferMetrics',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('n_files', models.PositiveIntegerField(default=0)),
+                ('n_skipped', models.PositiveIntegerField(default=0)),
+                ('n_failed', models.PositiveIntegerField(default=0)),
+                ('n_bytes', models.BigIntegerField(default=0)),
+                ('retries', models.PositiveIntegerField(default=0)),
+                ('duration', models.FloatField(default=0)),
+                ('handshake_duration', models.FloatField(default=0)),
+                ('mkdir_duration', models.FloatField(default=0)),
+                ('stat_duration', models.FloatField(default=0)),
+                ('latency_histogram', models.JSONField(default=list, help_text='Per-file transfer latency counts per logarithmic bucket (1 ms to ~65 s)')),
+                ('export_destination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metrics_set', to='accounts.exportdestination')),
+            ],
+            options={
+                'verbose_name_plural': 'Export transfer metrics',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1.3 on 2026-10-18 20:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_exporttransfermetrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportdestination',
+            name='max_bandwidth',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Maximal aggregate transfer rate to this destination across all workers in bytes per second (blank for unlimited)', null=True),
+        ),
+        migrations.AddField(
+            model_name='exportdestination',
+            name='max_connections',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximal number of concurrent export tasks to this destination across all workers (blank for unlimited)', null=True),
+        ),
+        migrations.CreateModel(
+            name='ExportLease',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(max_length=255)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('expires', models.DateTimeField(db_index=True)),
+                ('export_destination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lease_set', to='accounts.exportdestination')),
+            ],
+            options={
+                'unique_together': {('export_destination', 'task_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.3 on 2026-10-18 20:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_export_limits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportRequest',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(db_index=True, help_text='Hash of the export destination, file format and resolved file set', max_length=64)),
+                ('task_ids', models.JSONField(default=list)),
+                ('n_files', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('export_destination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='request_set', to='accounts.exportdestination')),
+            ],
+        ),
+    ]
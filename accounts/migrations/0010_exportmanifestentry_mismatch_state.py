@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_exportrequest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportmanifestentry',
+            name='state',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('DONE', 'Done'), ('SKIPPED', 'Skipped'), ('FAILED', 'Failed'), ('MISMATCH', 'Checksum mismatch')], default='PENDING', max_length=10),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_exportmanifestentry_mismatch_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportdestination',
+            name='backend',
+            field=models.CharField(choices=[('SFTP', 'SFTP'), ('LOCAL', 'Local or mounted path')], default='SFTP', help_text='Transfer backend, local or mounted paths are exported without SSH (the connection settings are then ignored)', max_length=5),
+        ),
+    ]
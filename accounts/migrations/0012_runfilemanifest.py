@@ -0,0 +1,34 @@
+# Generated by Django 4.1.3 on 2026-10-18 22:05
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_analyses', '__first__'),
+        ('accounts', '0011_exportdestination_backend'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunFileManifest',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('root', models.CharField(help_text='Listed run output directory', max_length=1024)),
+                ('files', models.JSONField(default=list)),
+                ('directories', models.JSONField(default=dict)),
+                ('n_files', models.PositiveIntegerField(default=0)),
+                ('n_bytes', models.BigIntegerField(default=0)),
+                ('run', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='file_manifest', to='django_analyses.run')),
+            ],
+            options={
+                'get_latest_by': 'modified',
+                'abstract': False,
+            },
+        ),
+    ]
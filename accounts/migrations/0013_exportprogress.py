@@ -0,0 +1,38 @@
+# Generated by Django 4.1.3 on 2026-10-18 22:40
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_runfilemanifest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('job_id', models.CharField(help_text='Identifier of the export job (usually the Celery task ID of the export request)', max_length=255, unique=True)),
+                ('n_files_total', models.PositiveIntegerField(default=0)),
+                ('n_bytes_total', models.BigIntegerField(default=0)),
+                ('n_files_done', models.PositiveIntegerField(default=0)),
+                ('n_bytes_done', models.BigIntegerField(default=0)),
+                ('n_files_failed', models.PositiveIntegerField(default=0)),
+                ('last_progress', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Export progress',
+            },
+        ),
+        migrations.AddField(
+            model_name='exportmanifest',
+            name='progress',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='manifest_set', to='accounts.exportprogress'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.1.3 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_exportprogress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportdestination',
+            name='block_size',
+            field=models.PositiveIntegerField(blank=True, help_text='SFTP write request size in bytes (blank for the default)', null=True),
+        ),
+        migrations.AddField(
+            model_name='exportdestination',
+            name='ciphers',
+            field=models.CharField(blank=True, default='', help_text='Preferred SSH ciphers in order, comma-separated (blank for the defaults)', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='exportdestination',
+            name='max_packet_size',
+            field=models.PositiveIntegerField(blank=True, help_text='SSH channel maximal packet size in bytes (blank for the default)', null=True),
+        ),
+        migrations.AddField(
+            model_name='exportdestination',
+            name='ssh_compression',
+            field=models.BooleanField(default=False, help_text='Whether to compress the SSH transport (usually only worthwhile over slow links)'),
+        ),
+        migrations.AddField(
+            model_name='exportdestination',
+            name='window_size',
+            field=models.PositiveIntegerField(blank=True, help_text='SSH channel window size in bytes (blank for the default)', null=True),
+        ),
+    ]
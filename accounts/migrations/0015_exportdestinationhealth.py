@@ -0,0 +1,34 @@
+# Generated by Django 4.1.3 on 2026-10-18 23:35
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_exportdestination_transport_tuning'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportDestinationHealth',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('reachable', models.BooleanField(default=False)),
+                ('authenticated', models.BooleanField(default=False)),
+                ('handshake_latency', models.FloatField(blank=True, help_text='Duration of the SSH session negotiation during the last health probe (seconds)', null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('consecutive_failures', models.PositiveIntegerField(default=0)),
+                ('last_checked', models.DateTimeField(blank=True, null=True)),
+                ('last_success', models.DateTimeField(blank=True, null=True)),
+                ('export_destination', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='health', to='accounts.exportdestination')),
+            ],
+            options={
+                'verbose_name_plural': 'Export destination health',
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.1.3 on 2026-10-18 23:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_exportdestinationhealth'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportprogress',
+            name='finished',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='exportprogress',
+            name='n_tasks_done',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='exportprogress',
+            name='n_tasks_failed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='exportprogress',
+            name='n_tasks_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ExportTaskFailure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(db_index=True, max_length=255)),
+                ('task_name', models.CharField(max_length=255)),
+                ('exception', models.TextField()),
+                ('traceback', models.TextField(blank=True, default='', help_text='Traceback of the exception the task failed with')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('progress', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='failure_set', to='accounts.exportprogress')),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.1.3 on 2026-10-19 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_export_task_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskLineage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(max_length=255, unique=True)),
+                ('task_name', models.CharField(blank=True, default='', max_length=255)),
+                ('parent_id', models.CharField(blank=True, db_index=True, help_text='ID of the Celery task this task was published by (blank for root tasks)', max_length=255, null=True)),
+                ('root_id', models.CharField(db_index=True, help_text="ID of the first Celery task in this task's tree (the task itself for root tasks)", max_length=255)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Task lineage',
+            },
+        ),
+    ]
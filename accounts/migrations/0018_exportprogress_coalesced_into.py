@@ -0,0 +1,19 @@
+# Generated by Django 4.1.3 on 2026-10-19 00:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_tasklineage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportprogress',
+            name='coalesced_into',
+            field=models.ForeignKey(blank=True, help_text='Export job an identical request coalesced onto, whose progress is reported instead', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='coalesced_set', to='accounts.exportprogress'),
+        ),
+    ]
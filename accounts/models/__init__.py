@@ -7,8 +7,20 @@ between the different models, see the :ref:`overview:Overview`.
 """
 from accounts.models.user import User  # isort:skip
 from accounts.models.export_destination import ExportDestination
+from accounts.models.export_destination_health import (
+    ExportDestinationHealth,
+)
+from accounts.models.export_lease import ExportLease
+from accounts.models.export_manifest import ExportManifest
+from accounts.models.export_manifest_entry import ExportManifestEntry
+from accounts.models.export_progress import ExportProgress
+from accounts.models.export_request import ExportRequest
+from accounts.models.export_task_failure import ExportTaskFailure
+from accounts.models.export_transfer_metrics import ExportTransferMetrics
 from accounts.models.laboratory import Laboratory
 from accounts.models.laboratory_membership import LaboratoryMembership
 from accounts.models.profile import Profile
+from accounts.models.run_file_manifest import RunFileManifest
+from accounts.models.task_lineage import TaskLineage
 
 # flake8: noqa: F401
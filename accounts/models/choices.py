@@ -23,3 +23,28 @@ class Role(ChoiceEnum):
     AFF = "Research Affiliate"
     MAN = "Lab Manager"
     PI = "Principle Investigator"
+
+
+class ExportState(ChoiceEnum):
+    PENDING = "Pending"
+    DONE = "Done"
+    SKIPPED = "Skipped"
+    FAILED = "Failed"
+    MISMATCH = "Checksum mismatch"
+
+
+class TransferMode(ChoiceEnum):
+    SFTP = "SFTP"
+    TAR = "Tar stream"
+    ASYNC = "Asynchronous SFTP"
+    FAN_OUT = "Read once, write to all destinations"
+
+
+class ChecksumMode(ChoiceEnum):
+    REMOTE = "Compare with a host-side hash"
+    FILE = "Write a checksum file"
+
+
+class ExportBackend(ChoiceEnum):
+    SFTP = "SFTP"
+    LOCAL = "Local or mounted path"
@@ -1,14 +1,63 @@
 """
 Definition of the :class:`ExportDestination` class.
 """
+import copy
+import io
 import logging
+import os
+import queue
+import shlex
+import tarfile
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Iterable, Tuple, Union
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import paramiko
 from accounts.models import help_text, logs
+from accounts.models.choices import ChecksumMode, ExportBackend, ExportState
+from accounts.models.utils.bandwidth_limiter import (
+    BandwidthLimiter,
+    ThrottledWriter,
+)
+from accounts.models.utils.checksum import (
+    CHECKSUM_FILE_NAME,
+    REMOTE_CHECKSUM_BATCH_SIZE,
+    REMOTE_CHECKSUM_COMMAND,
+    HashingReader,
+    batches,
+    format_checksum_file,
+    parse_checksum_output,
+)
+from accounts.models.utils.compression import (
+    CompressingReader,
+    compression_executor,
+    get_compressed_destination,
+    is_compressible,
+)
+from accounts.models.utils.connection_pool import (
+    CONNECTION_POOL,
+    PooledConnection,
+)
+from accounts.models.utils.local_backend import (
+    LocalSFTPClient,
+    LocalTransport,
+)
 from accounts.models.utils.ssh import get_known_hosts
+from accounts.models.utils.transfer_statistics import TransferStatistics
+from accounts.models.utils.transport_tuning import (
+    DEFAULT_BENCHMARK_SIZE,
+    TRANSPORT_PROFILES,
+    TUNING_FIELDS,
+    get_supported_ciphers,
+    parse_ciphers,
+    put_blocks,
+)
 from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django_extensions.db.models import TitleDescriptionModel
 from mirage import fields
@@ -19,6 +68,13 @@ DEFAULT_PORT: int = 22
 DEFAULT_BANNER_TIMEOUT: int = 100
 DEFAULT_SOCKET_TIMEOUT: int = 3
 DEFAULT_NEGOTIATION_TIMEOUT: int = 3
+DEFAULT_PUT_WORKERS: int = 1
+DEFAULT_PROBE_SIZE: int = 4 * 1024 * 1024
+PROBE_FILE_NAME: str = ".export_probe_{uid}"
+HEALTH_AUTH_FAILURE: str = "Authentication failed"
+HEALTH_NOT_WRITABLE: str = "Destination is not writable"
+TAR_EXTRACT_COMMAND: str = "mkdir -p {root} && tar -x{flags}f - -C {root}"
+TAR_COMPRESSION_FLAGS: dict = {None: "", "gz": "z", "bz2": "j", "xz": "J"}
 
 
 class ExportDestination(TitleDescriptionModel):
@@ -84,15 +140,69 @@ class ExportDestination(TitleDescriptionModel):
         help_text=help_text.SSH_NEGOTIATION_TIMEOUT,
     )
 
+    #: Transfer backend.
+    backend = models.CharField(
+        max_length=5,
+        choices=ExportBackend.choices(),
+        default=ExportBackend.SFTP.name,
+        help_text=help_text.EXPORT_DESTINATION_BACKEND,
+    )
+
+    #: Maximal number of concurrent export tasks across all workers.
+    max_connections = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text=help_text.EXPORT_DESTINATION_MAX_CONNECTIONS,
+    )
+
+    #: Maximal aggregate transfer rate across all workers (bytes per second).
+    max_bandwidth = models.PositiveBigIntegerField(
+        blank=True,
+        null=True,
+        help_text=help_text.EXPORT_DESTINATION_MAX_BANDWIDTH,
+    )
+
+    #: Preferred SSH ciphers (comma-separated).
+    ciphers = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text=help_text.SSH_CIPHERS,
+    )
+
+    #: Whether to enable SSH transport compression.
+    ssh_compression = models.BooleanField(
+        default=False, help_text=help_text.SSH_COMPRESSION
+    )
+
+    #: SSH channel window size in bytes.
+    window_size = models.PositiveIntegerField(
+        blank=True, null=True, help_text=help_text.SSH_WINDOW_SIZE
+    )
+
+    #: SSH channel maximal packet size in bytes.
+    max_packet_size = models.PositiveIntegerField(
+        blank=True, null=True, help_text=help_text.SSH_MAX_PACKET_SIZE
+    )
+
+    #: SFTP read/write request size in bytes.
+    block_size = models.PositiveIntegerField(
+        blank=True, null=True, help_text=help_text.SFTP_BLOCK_SIZE
+    )
+
     #: Users that may export to this destination.
     users = models.ManyToManyField("accounts.User")
 
     # Host key cache.
     _key = None
-    # Transport instance cache.
-    _transport = None
-    # SFTPClient cache.
-    _sftp_client = None
+    # Connection leased from the worker-wide pool.
+    _connection = None
+    # Transfer statistics collected by this instance.
+    _statistics = None
+
+    #: Throttles transfers while a connection slot is held, see
+    #: :class:`~accounts.models.utils.destination_limiter.DestinationLimiter`.
+    bandwidth_limiter: BandwidthLimiter = None
 
     _logger = logging.getLogger("accounts.export_destination")
 
@@ -110,6 +220,12 @@ class ExportDestination(TitleDescriptionModel):
         """
         return self.STRING_TEMPLATE.format(username=self.username, ip=self.ip)
 
+    def __enter__(self) -> "ExportDestination":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release_connection()
+
     def get_key(self) -> paramiko.ecdsakey.ECDSAKey:
         """
         Returns the public key of the host if it exists within the
@@ -148,7 +264,10 @@ class ExportDestination(TitleDescriptionModel):
     ) -> paramiko.Transport:
         """
         Returns the transport instance which will be used to negotiate the
-        connection.
+        connection. Called by the worker-wide connection pool whenever no
+        reusable connection to this destination is available. Destinations
+        using the local backend get a
+        :class:`~accounts.models.utils.local_backend.LocalTransport` instead.
 
         Parameters
         ----------
@@ -157,13 +276,16 @@ class ExportDestination(TitleDescriptionModel):
 
         See Also
         --------
-        :meth:`transport`
+        * :attr:`transport`
+        * :meth:`benchmark_transport`
 
         Returns
         -------
         paramiko.Transport
             SSH transport thread
         """
+        if self.is_local:
+            return LocalTransport()
         # Log start
         start_log = logs.SSH_TRANSPORT_INIT_START.format(
             export_destination=self
@@ -172,7 +294,15 @@ class ExportDestination(TitleDescriptionModel):
         # Create Transport instance.
         try:
             transport = paramiko.Transport(
-                (self.ip, self.port), socket_timeout=self.socket_timeout
+                (self.ip, self.port),
+                socket_timeout=self.socket_timeout,
+                default_window_size=(
+                    self.window_size or paramiko.common.DEFAULT_WINDOW_SIZE
+                ),
+                default_max_packet_size=(
+                    self.max_packet_size
+                    or paramiko.common.DEFAULT_MAX_PACKET_SIZE
+                ),
             )
         except Exception as e:
             # Log exception and re-raise,
@@ -197,8 +327,40 @@ class ExportDestination(TitleDescriptionModel):
                 ip=self.ip, key_name=expected_name
             )
             self._logger.debug(transport_key_log)
+        self.tune_transport(transport)
         return transport
 
+    def tune_transport(self, transport: paramiko.Transport) -> None:
+        """
+        Applies this destination's cipher preferences and compression
+        setting to a transport before negotiation.
+
+        Parameters
+        ----------
+        transport : paramiko.Transport
+            SSH transport
+        """
+        preferred = parse_ciphers(self.ciphers)
+        if preferred:
+            supported = get_supported_ciphers(preferred, transport)
+            unsupported = sorted(set(preferred) - set(supported))
+            if unsupported:
+                unsupported_log = logs.SSH_CIPHERS_UNSUPPORTED.format(
+                    export_destination=self, ciphers=", ".join(unsupported)
+                )
+                self._logger.info(unsupported_log)
+            if supported:
+                # Fall back to the remaining defaults if none is accepted.
+                remaining = [
+                    name
+                    for name in transport.get_security_options().ciphers
+                    if name not in supported
+                ]
+                transport.get_security_options().ciphers = (
+                    supported + remaining
+                )
+        transport.use_compression(self.ssh_compression)
+
     def query_public_key(self) -> Tuple[str, bytes]:
         """
         Queries the remote host for a public key.
@@ -299,24 +461,28 @@ class ExportDestination(TitleDescriptionModel):
                 export_destination=self
             )
             self._logger.debug(start_log)
-            # Initialize SSH client session.
-            try:
-                self.transport.start_client(timeout=self.negotiation_timeout)
-            except SSHException as e:
-                # Log raised exception and re-raise.
-                failure_log = logs.SSH_CONNECTION_FAILURE.format(
-                    export_destination=self, exception=e
-                )
-                self._logger.info(failure_log)
-                raise
-            else:
-                # Log success.
-                success_log = logs.SSH_CONNECTION_SUCCESS.format(
-                    export_destination=self
-                )
-                self._logger.info(success_log)
-            self.validate_public_key()
-            self.authenticate()
+            with self.statistics.measure("handshake"):
+                # Initialize SSH client session.
+                try:
+                    self.transport.start_client(
+                        timeout=self.negotiation_timeout
+                    )
+                except SSHException as e:
+                    # Log raised exception and re-raise.
+                    failure_log = logs.SSH_CONNECTION_FAILURE.format(
+                        export_destination=self, exception=e
+                    )
+                    self._logger.info(failure_log)
+                    raise
+                else:
+                    # Log success.
+                    success_log = logs.SSH_CONNECTION_SUCCESS.format(
+                        export_destination=self
+                    )
+                    self._logger.info(success_log)
+                self.validate_public_key()
+                self.authenticate()
+            self.connection.connected = True
         else:
             # Log existing active connection found.
             skip_log = logs.SSH_TRANSPORT_ACTIVE.format(
@@ -327,7 +493,9 @@ class ExportDestination(TitleDescriptionModel):
     def start_sftp_client(self) -> paramiko.sftp_client.SFTPClient:
         """
         Returns an SFTP client, enabling secure interaction with the host
-        filesystem.
+        filesystem. Destinations using the local backend get a
+        :class:`~accounts.models.utils.local_backend.LocalSFTPClient`
+        instead.
 
         See Also
         --------
@@ -338,6 +506,8 @@ class ExportDestination(TitleDescriptionModel):
         paramiko.sftp_client.SFTPClient
             SFTP Client connected to the host filesystem
         """
+        if self.is_local:
+            return LocalSFTPClient()
         # Log SFTP connection initialization.
         start_log = logs.SFTP_CLIENT_START.format(export_destination=self)
         self._logger.debug(start_log)
@@ -346,7 +516,11 @@ class ExportDestination(TitleDescriptionModel):
             self.connect()
         # Start SFTP client.
         try:
-            sftp_client = paramiko.SFTPClient.from_transport(self.transport)
+            sftp_client = paramiko.SFTPClient.from_transport(
+                self.transport,
+                window_size=self.window_size,
+                max_packet_size=self.max_packet_size,
+            )
         except Exception as e:
             # Log exception and re-raise.
             failure_log = logs.SFTP_CLIENT_FAILURE.format(
@@ -365,11 +539,21 @@ class ExportDestination(TitleDescriptionModel):
             sftp_client.chdir(path=None)
             return sftp_client
 
+    def release_connection(self) -> None:
+        """
+        Returns the leased connection (if any) to the worker-wide connection
+        pool, making it available for other export destination instances.
+        """
+        if self._connection is not None:
+            CONNECTION_POOL.release(self._connection)
+            self._connection = None
+
     def mkdir(
         self,
         path: Union[str, Path],
         parents: bool = True,
         exist_ok: bool = True,
+        sftp_client: paramiko.SFTPClient = None,
     ):
         """
         Create directory within the host.
@@ -383,7 +567,20 @@ class ExportDestination(TitleDescriptionModel):
         exist_ok : bool
             Whether to raise an exception if the destination directory already
             exists
+        sftp_client : paramiko.SFTPClient, optional
+            SFTP channel to use, defaults to :attr:`sftp_client`
         """
+        if sftp_client is None:
+            sftp_client = self.sftp_client
+        path = Path(path)
+        # Skip known existing directories.
+        if path in self.connection.directories:
+            if not exist_ok:
+                log_exists = logs.SFTP_MKDIR_EXISTS.format(
+                    path=path, export_destination=self
+                )
+                raise OSError(log_exists)
+            return
         # Log directory creation start.
         start_log = logs.SFTP_MKDIR_START.format(
             path=path, export_destination=self
@@ -405,19 +602,33 @@ class ExportDestination(TitleDescriptionModel):
             # If *parents* and the current path is not the destination path,
             # try to create the parent.
             elif parents and part != path.name:
-                self.mkdir(current_path, parents=False, exist_ok=exist_ok)
+                self.mkdir(
+                    current_path,
+                    parents=False,
+                    exist_ok=exist_ok,
+                    sftp_client=sftp_client,
+                )
                 continue
             # Handle destination directory creation.
             else:
                 try:
                     # Check if the directory already exists.
-                    self.sftp_client.stat(str(current_path))
+                    sftp_client.stat(str(current_path))
                 except FileNotFoundError:
                     # Directory does not exist, create it.
                     try:
-                        self.sftp_client.mkdir(str(current_path))
+                        sftp_client.mkdir(str(current_path))
                     except OSError as e:
-                        # Log failure and re-raise.
+                        # Another channel may have created the directory
+                        # concurrently.
+                        if exist_ok and self._remote_exists(
+                            current_path, sftp_client
+                        ):
+                            self._cache_directory(current_path)
+                            continue
+                        # Invalidate the directory cache, log failure and
+                        # re-raise.
+                        self.connection.directories.clear()
                         failure_log = logs.SFTP_MKDIR_FAILURE.format(
                             export_destination=self,
                             path=current_path,
@@ -431,16 +642,196 @@ class ExportDestination(TitleDescriptionModel):
                             export_destination=self, path=current_path
                         )
                         self._logger.debug(success_log)
+                        self._cache_directory(current_path)
                 else:
                     # Log existing directory found and raise or return.
                     log_exists = logs.SFTP_MKDIR_EXISTS.format(
                         path=current_path, export_destination=self
                     )
                     self._logger.debug(log_exists)
+                    self._cache_directory(current_path)
                     if not exist_ok:
                         raise OSError(log_exists)
 
-    def _put(self, source: Path, destination: Path):
+    def _cache_directory(self, path: Path) -> None:
+        """
+        Registers *path* and its parents as existing directories in the
+        leased connection's directory cache.
+
+        Parameters
+        ----------
+        path : Path
+            Existing directory in the host file system
+        """
+        self.connection.directories.update((path, *path.parents))
+
+    def make_parents(
+        self,
+        destinations: Iterable[Union[Path, str]],
+        sftp_client: paramiko.SFTPClient = None,
+    ) -> None:
+        """
+        Creates the parent directories of all *destinations* once, deepest
+        first, so that the creation of each directory caches its parents.
+
+        Parameters
+        ----------
+        destinations : Iterable[Union[Path, str]]
+            Absolute file destinations in the host file system
+        sftp_client : paramiko.SFTPClient, optional
+            SFTP channel to use, defaults to :attr:`sftp_client`
+        """
+        parents = {Path(destination).parent for destination in destinations}
+        by_depth = sorted(parents, key=lambda p: len(p.parts), reverse=True)
+        with self.statistics.measure("mkdir"):
+            for parent in by_depth:
+                self.mkdir(
+                    parent,
+                    parents=True,
+                    exist_ok=True,
+                    sftp_client=sftp_client,
+                )
+
+    def _remote_exists(
+        self, path: Path, sftp_client: paramiko.SFTPClient
+    ) -> bool:
+        """
+        Checks whether *path* exists in the host.
+
+        Parameters
+        ----------
+        path : Path
+            Absolute path in the host file system
+        sftp_client : paramiko.SFTPClient
+            SFTP channel to use
+
+        Returns
+        -------
+        bool
+            Whether *path* exists
+        """
+        try:
+            sftp_client.stat(str(path))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _remote_file_info(
+        self, path: Path, sftp_client: paramiko.SFTPClient
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Returns the size and modification time of *path* in the host.
+
+        Parameters
+        ----------
+        path : Path
+            Absolute path in the host file system
+        sftp_client : paramiko.SFTPClient
+            SFTP channel to use
+
+        Returns
+        -------
+        Optional[Tuple[int, int]]
+            Size in bytes and modification time, or None if *path* does not
+            exist
+        """
+        try:
+            with self.statistics.measure("stat"):
+                attributes = sftp_client.stat(str(path))
+        except FileNotFoundError:
+            return None
+        return attributes.st_size, attributes.st_mtime
+
+    def list_remote_files(
+        self,
+        destinations: Iterable[Union[Path, str]],
+        sftp_client: paramiko.SFTPClient = None,
+    ) -> Dict[Path, Tuple[int, int]]:
+        """
+        Queries which of *destinations* already exist in the host using a
+        single directory listing per parent directory.
+
+        Parameters
+        ----------
+        destinations : Iterable[Union[Path, str]]
+            Absolute file destinations in the host file system
+        sftp_client : paramiko.SFTPClient, optional
+            SFTP channel to use, defaults to :attr:`sftp_client`
+
+        Returns
+        -------
+        Dict[Path, Tuple[int, int]]
+            Existing destinations mapped to their size and modification time
+        """
+        if sftp_client is None:
+            sftp_client = self.sftp_client
+        names_by_parent = defaultdict(set)
+        for destination in destinations:
+            destination = Path(destination)
+            names_by_parent[destination.parent].add(destination.name)
+        remote_files = {}
+        for parent, names in names_by_parent.items():
+            try:
+                with self.statistics.measure("stat"):
+                    listing = sftp_client.listdir_attr(str(parent))
+            except FileNotFoundError:
+                continue
+            self._cache_directory(parent)
+            for attributes in listing:
+                if attributes.filename in names:
+                    path = parent / attributes.filename
+                    remote_files[path] = (
+                        attributes.st_size,
+                        attributes.st_mtime,
+                    )
+        return remote_files
+
+    def remove_files(
+        self,
+        destinations: Iterable[Union[Path, str]],
+        sftp_client: paramiko.SFTPClient = None,
+    ) -> int:
+        """
+        Removes *destinations* from the host, ignoring missing files. Used to
+        discard partial or corrupt files before they are re-uploaded, as
+        existing files are otherwise skipped by :meth:`put`.
+
+        Parameters
+        ----------
+        destinations : Iterable[Union[Path, str]]
+            Absolute file destinations in the host file system
+        sftp_client : paramiko.SFTPClient, optional
+            SFTP channel to use, defaults to :attr:`sftp_client`
+
+        Returns
+        -------
+        int
+            Number of removed files
+        """
+        if sftp_client is None:
+            sftp_client = self.sftp_client
+        n_removed = 0
+        for destination in destinations:
+            try:
+                sftp_client.remove(str(destination))
+            except FileNotFoundError:
+                continue
+            n_removed += 1
+        if n_removed:
+            removed_log = logs.SFTP_REMOVE_SUCCESS.format(
+                n=n_removed, export_destination=self
+            )
+            self._logger.info(removed_log)
+        return n_removed
+
+    def _put(
+        self,
+        source: Path,
+        destination: Path,
+        sftp_client: paramiko.SFTPClient = None,
+        checksums: Dict[Path, str] = None,
+        compressor: Executor = None,
+    ):
         """
         Utility method to reduce clutter due to logging and surrounding logic.
 
@@ -450,14 +841,59 @@ class ExportDestination(TitleDescriptionModel):
             Local file to copy
         destination : Path
             Absolute destination in the host file system
+        sftp_client : paramiko.SFTPClient, optional
+            SFTP channel to use, defaults to :attr:`sftp_client`
+        checksums : Dict[Path, str], optional
+            If provided, the file is hashed while it is read for the upload
+            and its digest is stored by destination
+        compressor : Executor, optional
+            If provided, compressible files are gzip-compressed by this pool
+            while they are uploaded, see
+            :class:`~accounts.models.utils.compression.CompressingReader`
         """
+        if sftp_client is None:
+            sftp_client = self.sftp_client
         # Create parent directory if needed.
-        self.mkdir(destination.parent, parents=True, exist_ok=True)
+        with self.statistics.measure("mkdir"):
+            self.mkdir(
+                destination.parent,
+                parents=True,
+                exist_ok=True,
+                sftp_client=sftp_client,
+            )
         # Transfer file.
+        start = time.perf_counter()
+        compress = compressor is not None and is_compressible(source)
+        block_size = None if self.is_local else self.block_size
         try:
-            self.sftp_client.put(str(source), str(destination), confirm=True)
+            if checksums is None and not compress and not block_size:
+                attributes = sftp_client.put(
+                    str(source),
+                    str(destination),
+                    callback=self._get_throttle_callback(),
+                    confirm=True,
+                )
+            else:
+                with open(source, "rb") as local_file:
+                    reader = (
+                        CompressingReader(local_file, compressor)
+                        if compress
+                        else local_file
+                    )
+                    if checksums is not None:
+                        reader = HashingReader(reader)
+                    attributes = self._putfo(
+                        sftp_client,
+                        reader,
+                        destination,
+                        file_size=Path(source).stat().st_size,
+                    )
+                if checksums is not None:
+                    checksums[destination] = reader.hexdigest()
         except (OSError, PermissionError) as e:
-            # Log file transfer failure and re-raise.
+            # Invalidate the directory cache, log file transfer failure and
+            # re-raise.
+            self.connection.directories.clear()
             failure_log = logs.SFTP_PUT_FAILURE.format(
                 source=source,
                 export_destination=self,
@@ -474,89 +910,180 @@ class ExportDestination(TitleDescriptionModel):
                 destination=destination,
             )
             self._logger.debug(success_log)
+            n_bytes = getattr(attributes, "st_size", None)
+            if n_bytes is None:
+                n_bytes = Path(source).stat().st_size
+            latency = time.perf_counter() - start
+            self.statistics.record_file(n_bytes, latency)
 
-    def put(
+    def _putfo(
         self,
-        source: Union[Path, str, Iterable[Union[Path, str]]],
-        destination: Union[Path, str] = None,
-        exist_ok: bool = True,
-        force: bool = False,
-        progressbar: bool = False,
-    ) -> None:
+        sftp_client: paramiko.SFTPClient,
+        fileobj,
+        destination: Path,
+        file_size: int = 0,
+    ) -> paramiko.SFTPAttributes:
         """
-        Copies *source* (a filesystem accessible file path) to *destination* in
-        the host using SFTP.
+        Uploads the contents of a file object, using :attr:`block_size` SFTP
+        write requests if set.
+
+        Parameters
+        ----------
+        sftp_client : paramiko.SFTPClient
+            SFTP channel to use
+        fileobj
+            Binary file object to upload
+        destination : Path
+            Absolute destination in the host file system
+        file_size : int, optional
+            Local file size in bytes
+
+        Returns
+        -------
+        paramiko.SFTPAttributes
+            Uploaded file attributes
+        """
+        callback = self._get_throttle_callback()
+        if self.block_size and not self.is_local:
+            return put_blocks(
+                sftp_client,
+                fileobj,
+                str(destination),
+                self.block_size,
+                file_size=file_size,
+                callback=callback,
+            )
+        return sftp_client.putfo(
+            fileobj,
+            str(destination),
+            file_size=file_size,
+            callback=callback,
+            confirm=True,
+        )
+
+    def _get_throttle_callback(self) -> Optional[Callable]:
+        """
+        Returns an SFTP transfer progress callback blocking as required by
+        :attr:`bandwidth_limiter`, if set.
+
+        Returns
+        -------
+        Optional[Callable]
+            Progress callback
+        """
+        limiter = self.bandwidth_limiter
+        if limiter is None:
+            return None
+        transferred = [0]
+
+        def throttle(n_bytes: int, total: int) -> None:
+            limiter.consume(n_bytes - transferred[0])
+            transferred[0] = n_bytes
+
+        return throttle
+
+    def resolve_destination(
+        self, source: Union[Path, str], destination: Union[Path, str] = None
+    ) -> Path:
+        """
+        Infers the absolute destination path of *source* in the host.
 
         Parameters
         ----------
         source : Union[Path, str]
             Local file to copy
-        destination : Union[Path, str]
-            Destination in the host file system. if None, tries to use the
-            *source* path relative to the application's MEDIA_ROOT
-        exist_ok : bool, optional
-            Whether to forgive trying to put an existing file (rather than
-            raising an exception), default is True
-        force : bool, optional
-            Whether to override the file if it already exists in the host,
-            default is False (if set to True, *exist_ok* is meaningless)
-        progressbar : bool, optional
-            Whether to display a progressbar or not, applicable only if
-            *source* is an interable of paths, default is False
+        destination : Union[Path, str], optional
+            Destination in the host file system. if None, uses the *source*
+            path relative to the application's MEDIA_ROOT, if relative, it is
+            considered relative to :attr:`destination`
+
+        Returns
+        -------
+        Path
+            Absolute destination path in the host
         """
-        # Handle iterable of paths.
-        if not isinstance(source, (Path, str)):
-            try:
-                # Create progressbar if *progressbar* is True.
-                iterable = (
-                    tqdm(source, unit="file", desc=f"Copying to {self}")
-                    if progressbar
-                    else source
-                )
-                # Iterate *source* and transfer files.
-                for i, path in enumerate(iterable):
-                    dest = destination[i] if destination else None
-                    self.put(path, dest, exist_ok=exist_ok, force=force)
-            except TypeError:
-                # If iteration failed, log and re-raise.
-                bad_input_log = logs.SFTP_PUT_BAD_INPUT.format(
-                    bad_type=type(source)
-                )
-                self._logger.warn(bad_input_log)
-                raise
-            else:
-                return
-        # Handle single file path.
-        # Infer absolute destination path.
         destination = (
             Path(source).relative_to(settings.MEDIA_ROOT)
             if destination is None
             else destination
         )
-        destination = (
+        return (
             Path(destination)
             if Path(destination).is_absolute()
             else Path(self.destination) / destination
         )
+
+    def _put_file(
+        self,
+        source: Union[Path, str],
+        destination: Union[Path, str] = None,
+        exist_ok: bool = True,
+        force: bool = False,
+        skip_same_size: bool = False,
+        sftp_client: paramiko.SFTPClient = None,
+        remote_files: Dict[Path, Tuple[int, int]] = None,
+        callback: Callable = None,
+        checksums: Dict[Path, str] = None,
+        compressor: Executor = None,
+    ) -> None:
+        """
+        Copies a single file to the host, see :meth:`put`.
+
+        Parameters
+        ----------
+        source : Union[Path, str]
+            Local file to copy
+        destination : Union[Path, str]
+            Destination in the host file system
+        exist_ok : bool, optional
+            Whether to forgive trying to put an existing file, default is True
+        force : bool, optional
+            Whether to override the file if it already exists in the host,
+            default is False
+        skip_same_size : bool, optional
+            Whether to skip existing files of the same size even if *force* is
+            True, default is False
+        sftp_client : paramiko.SFTPClient, optional
+            SFTP channel to use, defaults to :attr:`sftp_client`
+        remote_files : Dict[Path, Tuple[int, int]], optional
+            Pre-fetched existing destinations, as returned by
+            :meth:`list_remote_files`, if None the destination is queried
+            directly
+        callback : Callable, optional
+            Called with the source, destination and resulting
+            :class:`~accounts.models.choices.ExportState` of the transfer
+        checksums : Dict[Path, str], optional
+            Digests of transferred files by destination, see :meth:`_put`
+        compressor : Executor, optional
+            Compression worker pool, see :meth:`_put`
+        """
+        if sftp_client is None:
+            sftp_client = self.sftp_client
+        destination = self.resolve_destination(source, destination)
         # Log file transfer start.
         start_log = logs.SFTP_PUT_START.format(
             source=source, export_destination=self, destination=destination
         )
         self._logger.debug(start_log)
         # Look for an existing file at the destination.
-        try:
-            self.sftp_client.stat(str(destination))
-        except FileNotFoundError:
-            # No existing file found, continue to file transfer.
-            pass
-        else:
+        remote_info = (
+            self._remote_file_info(destination, sftp_client)
+            if remote_files is None
+            else remote_files.get(destination)
+        )
+        if remote_info is not None:
             # Log existing file found.
             exists_log = logs.SFTP_PUT_EXISTS.format(
                 export_destination=self, destination=destination
             )
             self._logger.debug(exists_log)
-            # Handle existing file found and *force* is False.
-            if not force:
+            same_size = (
+                skip_same_size
+                and remote_info[0] == Path(source).stat().st_size
+            )
+            # Handle existing file found and *force* is False or the existing
+            # file is considered identical.
+            if not force or same_size:
                 # Log transfer termination and return.
                 abort_log = logs.SFTP_PUT_ABORT.format(
                     source=source,
@@ -564,14 +1091,747 @@ class ExportDestination(TitleDescriptionModel):
                     destination=destination,
                 )
                 self._logger.debug(abort_log)
+                self.statistics.record_skipped()
+                if callback is not None:
+                    callback(source, destination, ExportState.SKIPPED)
                 return
             # Handle existing file found and *exist_ok* is False.
             elif not exist_ok:
+                self.statistics.record_failed()
+                if callback is not None:
+                    callback(source, destination, ExportState.FAILED)
                 raise OSError(exists_log)
-        # Create parent directory if needed.
-        self.mkdir(destination.parent, parents=True, exist_ok=True)
-        # Transfer file.
-        self._put(source, destination)
+        # Transfer file (parent directories are created if needed).
+        try:
+            self._put(
+                source,
+                destination,
+                sftp_client=sftp_client,
+                checksums=checksums,
+                compressor=compressor,
+            )
+        except (OSError, SSHException):
+            self.statistics.record_failed()
+            if callback is not None:
+                callback(source, destination, ExportState.FAILED)
+            raise
+        if callback is not None:
+            callback(source, destination, ExportState.DONE)
+
+    def _put_parallel(
+        self,
+        sources: List[Union[Path, str]],
+        destinations: List[Union[Path, str]],
+        exist_ok: bool = True,
+        force: bool = False,
+        skip_same_size: bool = False,
+        progressbar: bool = False,
+        workers: int = DEFAULT_PUT_WORKERS,
+        remote_files: Dict[Path, Tuple[int, int]] = None,
+        callback: Callable = None,
+        checksums: Dict[Path, str] = None,
+        compressor: Executor = None,
+    ) -> None:
+        """
+        Copies *sources* to *destinations* over multiple SFTP channels opened
+        on the same authenticated transport, see :meth:`put`.
+
+        Parameters
+        ----------
+        sources : List[Union[Path, str]]
+            Local files to copy
+        destinations : List[Union[Path, str]]
+            Destinations in the host file system (or None)
+        exist_ok : bool, optional
+            Whether to forgive trying to put an existing file, default is True
+        force : bool, optional
+            Whether to override the file if it already exists in the host,
+            default is False
+        skip_same_size : bool, optional
+            Whether to skip existing files of the same size even if *force* is
+            True, default is False
+        progressbar : bool, optional
+            Whether to display a progressbar or not, default is False
+        workers : int, optional
+            Number of SFTP channels (and threads) to use
+        remote_files : Dict[Path, Tuple[int, int]], optional
+            Pre-fetched existing destinations, see :meth:`list_remote_files`
+        callback : Callable, optional
+            Per-file transfer state callback, see :meth:`put`
+        checksums : Dict[Path, str], optional
+            Digests of transferred files by destination, see :meth:`_put`
+        compressor : Executor, optional
+            Compression worker pool shared by all channels, see :meth:`_put`
+
+        Raises
+        ------
+        OSError
+            The first transfer error encountered, raised once all other files
+            have been processed
+        """
+        work = queue.Queue()
+        for item in zip(sources, destinations):
+            work.put(item)
+        # Open one SFTP channel per worker over the leased transport.
+        n_channels = min(workers, len(sources))
+        channels = [self.sftp_client]
+        try:
+            for _ in range(n_channels - 1):
+                channels.append(self.start_sftp_client())
+        except Exception as e:
+            # Continue with the channels opened so far.
+            channel_log = logs.SFTP_PUT_CHANNELS_LIMITED.format(
+                export_destination=self, n=len(channels), exception=e
+            )
+            self._logger.info(channel_log)
+        progress = (
+            tqdm(
+                total=len(sources), unit="file", desc=f"Copying to {self}"
+            )
+            if progressbar
+            else None
+        )
+        errors = []
+
+        def drain(sftp_client: paramiko.SFTPClient) -> None:
+            while True:
+                try:
+                    source, destination = work.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self._put_file(
+                        source,
+                        destination,
+                        exist_ok=exist_ok,
+                        force=force,
+                        skip_same_size=skip_same_size,
+                        sftp_client=sftp_client,
+                        remote_files=remote_files,
+                        callback=callback,
+                        checksums=checksums,
+                        compressor=compressor,
+                    )
+                except (OSError, SSHException) as e:
+                    # Failures are logged per file by _put(), keep going.
+                    errors.append(e)
+                finally:
+                    if progress is not None:
+                        progress.update()
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(channels)) as executor:
+                list(executor.map(drain, channels))
+        finally:
+            if progress is not None:
+                progress.close()
+            # Close the additional channels, the first one stays pooled.
+            for sftp_client in channels[1:]:
+                sftp_client.close()
+        if errors:
+            summary_log = logs.SFTP_PUT_PARALLEL_FAILURES.format(
+                export_destination=self, n_failed=len(errors), n=len(sources)
+            )
+            self._logger.warning(summary_log)
+            raise errors[0]
+
+    def put(
+        self,
+        source: Union[Path, str, Iterable[Union[Path, str]]],
+        destination: Union[Path, str] = None,
+        exist_ok: bool = True,
+        force: bool = False,
+        progressbar: bool = False,
+        workers: int = DEFAULT_PUT_WORKERS,
+        skip_same_size: bool = False,
+        callback: Callable = None,
+        verify: str = None,
+        compress: bool = False,
+    ) -> None:
+        """
+        Copies *source* (a filesystem accessible file path) to *destination* in
+        the host using SFTP. If *source* is an iterable, the existing files in
+        the host are queried once per destination directory before any
+        transfer starts.
+
+        Parameters
+        ----------
+        source : Union[Path, str]
+            Local file to copy
+        destination : Union[Path, str]
+            Destination in the host file system. if None, tries to use the
+            *source* path relative to the application's MEDIA_ROOT
+        exist_ok : bool, optional
+            Whether to forgive trying to put an existing file (rather than
+            raising an exception), default is True
+        force : bool, optional
+            Whether to override the file if it already exists in the host,
+            default is False (if set to True, *exist_ok* is meaningless)
+        progressbar : bool, optional
+            Whether to display a progressbar or not, applicable only if
+            *source* is an interable of paths, default is False
+        workers : int, optional
+            Number of parallel SFTP channels to use, applicable only if
+            *source* is an iterable of paths, default is 1
+        skip_same_size : bool, optional
+            Whether to skip existing files with the same size as the local
+            file even if *force* is True, default is False
+        callback : Callable, optional
+            Called after each file with its source, destination and resulting
+            :class:`~accounts.models.choices.ExportState`, e.g. a
+            :class:`~accounts.models.utils.manifest_recorder.ManifestRecorder`
+        verify : str, optional
+            :class:`~accounts.models.choices.ChecksumMode` name, if provided,
+            files are hashed in the same read pass that feeds the upload and
+            verified once transferred, see :meth:`verify_checksums`
+        compress : bool, optional
+            Whether to gzip-compress compressible files (e.g. *.nii* to
+            *.nii.gz* in the host) in a worker pool while they are uploaded,
+            see :mod:`~accounts.models.utils.compression`, default is False
+
+        Raises
+        ------
+        OSError
+            If a transfer failed or a checksum did not match
+        """
+        # Handle single file path.
+        if isinstance(source, (Path, str)):
+            if verify is None and not compress:
+                self._put_file(
+                    source,
+                    destination,
+                    exist_ok=exist_ok,
+                    force=force,
+                    skip_same_size=skip_same_size,
+                    callback=callback,
+                )
+                return
+            source = [source]
+            destination = [destination]
+        # Handle iterable of paths.
+        try:
+            sources = list(source)
+        except TypeError:
+            # If iteration failed, log and re-raise.
+            bad_input_log = logs.SFTP_PUT_BAD_INPUT.format(
+                bad_type=type(source)
+            )
+            self._logger.warn(bad_input_log)
+            raise
+        destinations = (
+            list(destination) if destination else [None] * len(sources)
+        )
+        destinations = [
+            self.resolve_destination(path, dest)
+            for path, dest in zip(sources, destinations)
+        ]
+        if compress:
+            destinations = [
+                get_compressed_destination(path, dest)
+                for path, dest in zip(sources, destinations)
+            ]
+        # Query existing files and create all required directories up
+        # front.
+        remote_files = self.list_remote_files(destinations)
+        self.make_parents(destinations)
+        # When verifying, completed transfers are only reported once their
+        # checksums have been compared.
+        checksums, transferred = ({}, []) if verify else (None, None)
+
+        def report(path: str, dest: Path, state: ExportState) -> None:
+            if transferred is not None and state is ExportState.DONE:
+                transferred.append((path, dest))
+            elif callback is not None:
+                callback(path, dest, state)
+
+        compression = compression_executor() if compress else nullcontext()
+        try:
+            with compression as compressor:
+                if workers > 1 and len(sources) > 1:
+                    self._put_parallel(
+                        sources,
+                        destinations,
+                        exist_ok=exist_ok,
+                        force=force,
+                        skip_same_size=skip_same_size,
+                        progressbar=progressbar,
+                        workers=workers,
+                        remote_files=remote_files,
+                        callback=report,
+                        checksums=checksums,
+                        compressor=compressor,
+                    )
+                else:
+                    # Create progressbar if *progressbar* is True.
+                    iterable = (
+                        tqdm(sources, unit="file", desc=f"Copying to {self}")
+                        if progressbar
+                        else sources
+                    )
+                    # Iterate *source* and transfer files.
+                    for path, dest in zip(iterable, destinations):
+                        self._put_file(
+                            path,
+                            dest,
+                            exist_ok=exist_ok,
+                            force=force,
+                            skip_same_size=skip_same_size,
+                            remote_files=remote_files,
+                            callback=report,
+                            checksums=checksums,
+                            compressor=compressor,
+                        )
+        except (OSError, SSHException):
+            if verify:
+                self.verify_checksums_after_failure(
+                    checksums, transferred, verify, callback=callback
+                )
+            raise
+        if verify:
+            self.verify_checksums(
+                checksums,
+                transferred,
+                mode=ChecksumMode[verify.upper()],
+                callback=callback,
+            )
+
+    def probe(
+        self, size: int = DEFAULT_PROBE_SIZE
+    ) -> Tuple[float, Optional[float]]:
+        """
+        Measures the per-file latency and throughput of transfers to the host
+        by uploading (and then removing) an empty and a *size* bytes probe
+        file in :attr:`destination`. No exported files are transferred.
+
+        Parameters
+        ----------
+        size : int, optional
+            Probe file size in bytes
+
+        Returns
+        -------
+        Tuple[float, Optional[float]]
+            Per-file latency in seconds and throughput in bytes per second
+            (None if too fast to measure)
+        """
+        root = Path(self.destination)
+        self.mkdir(root, parents=True, exist_ok=True)
+        sftp_client = self.sftp_client
+        durations = []
+        for n_bytes in (0, size):
+            path = root / PROBE_FILE_NAME.format(uid=uuid.uuid4().hex)
+            data = io.BytesIO(os.urandom(n_bytes))
+            start = time.perf_counter()
+            try:
+                sftp_client.putfo(data, str(path), file_size=n_bytes)
+                durations.append(time.perf_counter() - start)
+            finally:
+                try:
+                    sftp_client.remove(str(path))
+                except OSError:
+                    pass
+        latency, duration = durations
+        transfer_duration = duration - latency
+        throughput = None
+        if transfer_duration > 0:
+            throughput = size / transfer_duration
+        probe_log = logs.EXPORT_PROBE_RESULT.format(
+            export_destination=self, latency=latency, throughput=throughput
+        )
+        self._logger.info(probe_log)
+        return latency, throughput
+
+    def check_health(self) -> Dict:
+        """
+        Probes the host over a dedicated connection outside the worker-wide
+        pool: negotiates an SSH session (timing the handshake), validates the
+        host key and authenticates. Destinations using the local backend are
+        checked for an existing, writable destination (or nearest existing
+        parent directory) instead. Exceptions are reported rather than
+        raised.
+
+        See Also
+        --------
+        * :func:`~accounts.tasks.probe_export_destinations`
+
+        Returns
+        -------
+        Dict
+            Probe result, see
+            :meth:`~accounts.models.managers.export_destination_health.ExportDestinationHealthManager.record`
+        """
+        result = {
+            "reachable": False,
+            "authenticated": False,
+            "handshake_latency": None,
+            "error": "",
+        }
+        if self.is_local:
+            start = time.perf_counter()
+            path = Path(self.destination)
+            while not path.exists() and path != path.parent:
+                path = path.parent
+            result["reachable"] = path.is_dir()
+            result["authenticated"] = os.access(path, os.W_OK | os.X_OK)
+            result["handshake_latency"] = time.perf_counter() - start
+            if not result["authenticated"]:
+                result["error"] = HEALTH_NOT_WRITABLE
+            return result
+        candidate = copy.copy(self)
+        candidate._statistics = None
+        candidate._connection = PooledConnection(self.id)
+        try:
+            transport = candidate.create_transport()
+            candidate._connection.transport = transport
+            start = time.perf_counter()
+            transport.start_client(timeout=self.negotiation_timeout)
+            result["handshake_latency"] = time.perf_counter() - start
+            result["reachable"] = True
+            candidate.validate_public_key()
+            candidate.authenticate()
+            result["authenticated"] = transport.is_authenticated()
+            if not result["authenticated"]:
+                result["error"] = HEALTH_AUTH_FAILURE
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+        finally:
+            candidate._connection.close()
+        if result["authenticated"]:
+            success_log = logs.HEALTH_CHECK_SUCCESS.format(
+                export_destination=self, latency=result["handshake_latency"]
+            )
+            self._logger.debug(success_log)
+        else:
+            failure_log = logs.HEALTH_CHECK_FAILURE.format(
+                export_destination=self, exception=result["error"]
+            )
+            self._logger.warning(failure_log)
+        return result
+
+    def benchmark_transport(
+        self,
+        profiles: Iterable[Dict] = TRANSPORT_PROFILES,
+        size: int = DEFAULT_BENCHMARK_SIZE,
+        save: bool = True,
+    ) -> List[Dict]:
+        """
+        Measures the upload throughput to the host with each candidate
+        transport profile (see
+        :data:`~accounts.models.utils.transport_tuning.TRANSPORT_PROFILES`)
+        and optionally stores the fastest one's settings. Each profile is
+        benchmarked over a dedicated connection outside the worker-wide pool
+        by uploading (and then removing) a *size* bytes probe file in
+        :attr:`destination`. Profiles without any cipher supported by the
+        installed paramiko version are skipped.
+
+        Parameters
+        ----------
+        profiles : Iterable[Dict], optional
+            Candidate transport profiles
+        size : int, optional
+            Probe file size in bytes
+        save : bool, optional
+            Whether to store the fastest profile's settings, default is True
+
+        Returns
+        -------
+        List[Dict]
+            Benchmarked profiles with their throughput in bytes per second
+        """
+        if self.is_local:
+            return []
+        results = []
+        for profile in profiles:
+            preferred = parse_ciphers(profile["ciphers"])
+            if preferred and not get_supported_ciphers(preferred):
+                skip_log = logs.TRANSPORT_BENCHMARK_SKIP.format(
+                    profile=profile["name"], export_destination=self
+                )
+                self._logger.info(skip_log)
+                continue
+            candidate = copy.copy(self)
+            for field in TUNING_FIELDS:
+                setattr(candidate, field, profile[field])
+            # Measure the link rather than the configured bandwidth limit.
+            candidate.bandwidth_limiter = None
+            candidate._statistics = None
+            candidate._connection = PooledConnection(self.id)
+            try:
+                transport = candidate.create_transport()
+                candidate._connection.transport = transport
+                throughput = candidate._measure_upload(size)
+            except (OSError, SSHException) as e:
+                failure_log = logs.TRANSPORT_BENCHMARK_FAILURE.format(
+                    profile=profile["name"],
+                    export_destination=self,
+                    exception=e,
+                )
+                self._logger.warning(failure_log)
+                continue
+            finally:
+                candidate._connection.close()
+            result_log = logs.TRANSPORT_BENCHMARK_RESULT.format(
+                profile=profile["name"],
+                export_destination=self,
+                throughput=throughput,
+            )
+            self._logger.info(result_log)
+            results.append({**profile, "throughput": throughput})
+        if save and results:
+            fastest = max(results, key=lambda result: result["throughput"])
+            for field in TUNING_FIELDS:
+                setattr(self, field, fastest[field])
+            self.save(update_fields=TUNING_FIELDS)
+            selected_log = logs.TRANSPORT_BENCHMARK_SELECTED.format(
+                profile=fastest["name"], export_destination=self
+            )
+            self._logger.info(selected_log)
+        return results
+
+    def _measure_upload(self, size: int) -> float:
+        """
+        Uploads (and then removes) a *size* bytes probe file in
+        :attr:`destination` and returns the upload throughput.
+
+        Parameters
+        ----------
+        size : int
+            Probe file size in bytes
+
+        Returns
+        -------
+        float
+            Throughput in bytes per second
+        """
+        root = Path(self.destination)
+        self.mkdir(root, parents=True, exist_ok=True)
+        sftp_client = self.sftp_client
+        path = root / PROBE_FILE_NAME.format(uid=uuid.uuid4().hex)
+        data = io.BytesIO(os.urandom(size))
+        start = time.perf_counter()
+        try:
+            self._putfo(sftp_client, data, path, file_size=size)
+            duration = time.perf_counter() - start
+        finally:
+            try:
+                sftp_client.remove(str(path))
+            except OSError:
+                pass
+        return size / max(duration, 1e-9)
+
+    def execute(self, command: str) -> Tuple[int, str, str]:
+        """
+        Runs *command* in the host over an SSH exec channel.
+
+        Parameters
+        ----------
+        command : str
+            Shell command
+
+        Returns
+        -------
+        Tuple[int, str, str]
+            Exit status, standard output and standard error
+        """
+        channel = self.transport.open_session()
+        try:
+            channel.exec_command(command)
+            stdout = channel.makefile("rb").read().decode(errors="replace")
+            stderr = channel.makefile_stderr("rb").read()
+            exit_status = channel.recv_exit_status()
+        finally:
+            channel.close()
+        return exit_status, stdout, stderr.decode(errors="replace")
+
+    def remote_checksums(self, paths: List[Path]) -> Optional[Dict[Path, str]]:
+        """
+        Computes the checksums of *paths* in the host, batching many files
+        per exec channel.
+
+        Parameters
+        ----------
+        paths : List[Path]
+            Absolute paths in the host file system
+
+        Returns
+        -------
+        Optional[Dict[Path, str]]
+            Digests by path, or None if hashing in the host failed
+        """
+        checksums = {}
+        for batch in batches(paths, REMOTE_CHECKSUM_BATCH_SIZE):
+            quoted = " ".join(shlex.quote(str(path)) for path in batch)
+            command = f"{REMOTE_CHECKSUM_COMMAND} {quoted}"
+            try:
+                exit_status, stdout, stderr = self.execute(command)
+            except (OSError, SSHException) as e:
+                exit_status, stdout, stderr = None, "", str(e)
+            if exit_status != 0:
+                failure_log = logs.CHECKSUM_REMOTE_FAILURE.format(
+                    export_destination=self,
+                    exit_status=exit_status,
+                    stderr=stderr,
+                )
+                self._logger.warning(failure_log)
+                return None
+            checksums.update(parse_checksum_output(stdout))
+        return checksums
+
+    def write_checksum_file(self, checksums: Dict[Path, str]) -> Path:
+        """
+        Adds *checksums* to a checksum file in the common directory of the
+        files, verifiable in the host with ``sha256sum -c``. Existing entries
+        of the same files are replaced, and the file is rewritten through a
+        temporary file, so that retries and re-exports do not leave stale
+        lines behind.
+
+        Parameters
+        ----------
+        checksums : Dict[Path, str]
+            Digests by absolute destination path
+
+        Returns
+        -------
+        Path
+            Checksum file path in the host
+        """
+        root = Path(
+            os.path.commonpath([str(path.parent) for path in checksums])
+        )
+        path = root / CHECKSUM_FILE_NAME
+        sftp_client = self.sftp_client
+        try:
+            with sftp_client.open(str(path), "rb") as checksum_file:
+                existing = checksum_file.read()
+        except FileNotFoundError:
+            existing = b""
+        merged = {
+            root / relative: digest
+            for relative, digest in parse_checksum_output(
+                existing.decode()
+            ).items()
+        }
+        merged.update(checksums)
+        content = format_checksum_file(merged, root)
+        temporary = root / f".{CHECKSUM_FILE_NAME}.{uuid.uuid4().hex}"
+        with sftp_client.open(str(temporary), "w") as checksum_file:
+            checksum_file.write(content)
+        sftp_client.posix_rename(str(temporary), str(path))
+        written_log = logs.CHECKSUM_FILE_WRITTEN.format(
+            n=len(checksums), export_destination=self, path=path
+        )
+        self._logger.info(written_log)
+        return path
+
+    def verify_checksums(
+        self,
+        checksums: Dict[Path, str],
+        transferred: List[Tuple[Union[Path, str], Path]],
+        mode: ChecksumMode = ChecksumMode.REMOTE,
+        callback: Callable = None,
+    ) -> None:
+        """
+        Verifies transferred files against the checksums computed during
+        their upload, and reports each file as either
+        :attr:`~accounts.models.choices.ExportState.DONE` or
+        :attr:`~accounts.models.choices.ExportState.MISMATCH`. If hashing in
+        the host is unavailable, or *mode* is
+        :attr:`~accounts.models.choices.ChecksumMode.FILE`, the checksums are
+        recorded in a checksum file instead.
+
+        Parameters
+        ----------
+        checksums : Dict[Path, str]
+            Local digests by destination
+        transferred : List[Tuple[Union[Path, str], Path]]
+            Transferred sources and destinations
+        mode : ChecksumMode, optional
+            Verification mode
+        callback : Callable, optional
+            Per-file transfer state callback, see :meth:`put`
+
+        Raises
+        ------
+        OSError
+            If any checksum did not match
+        """
+        mismatched = set()
+        if checksums and mode is ChecksumMode.REMOTE:
+            remote = self.remote_checksums(list(checksums))
+            if remote is None:
+                mode = ChecksumMode.FILE
+            else:
+                for path, expected in checksums.items():
+                    found = remote.get(path)
+                    if found != expected:
+                        mismatched.add(path)
+                        mismatch_log = logs.CHECKSUM_MISMATCH.format(
+                            export_destination=self,
+                            destination=path,
+                            expected=expected,
+                            found=found,
+                        )
+                        self._logger.warning(mismatch_log)
+                verified_log = logs.CHECKSUM_VERIFIED.format(
+                    n=len(checksums),
+                    export_destination=self,
+                    n_mismatched=len(mismatched),
+                )
+                self._logger.info(verified_log)
+        if checksums and mode is ChecksumMode.FILE:
+            self.write_checksum_file(checksums)
+        for source, destination in transferred:
+            if destination in mismatched:
+                self.statistics.record_failed()
+                state = ExportState.MISMATCH
+            else:
+                state = ExportState.DONE
+            if callback is not None:
+                callback(source, destination, state)
+        if mismatched:
+            raise OSError(
+                logs.CHECKSUM_VERIFIED.format(
+                    n=len(checksums),
+                    export_destination=self,
+                    n_mismatched=len(mismatched),
+                )
+            )
+
+    def verify_checksums_after_failure(
+        self,
+        checksums: Dict[Path, str],
+        transferred: List[Tuple[Union[Path, str], Path]],
+        verify: str,
+        callback: Callable = None,
+    ) -> None:
+        """
+        Verifies the files transferred before a transfer error, see
+        :meth:`verify_checksums`. Verification errors are logged rather than
+        raised, so that they do not replace the transfer error in flight.
+
+        Parameters
+        ----------
+        checksums : Dict[Path, str]
+            Local digests by destination
+        transferred : List[Tuple[Union[Path, str], Path]]
+            Transferred sources and destinations
+        verify : str
+            :class:`~accounts.models.choices.ChecksumMode` name
+        callback : Callable, optional
+            Per-file transfer state callback, see :meth:`put`
+        """
+        try:
+            self.verify_checksums(
+                checksums,
+                transferred,
+                mode=ChecksumMode[verify.upper()],
+                callback=callback,
+            )
+        except (OSError, SSHException) as e:
+            failure_log = logs.CHECKSUM_VERIFY_FAILURE.format(
+                export_destination=self, exception=e
+            )
+            self._logger.warning(failure_log)
 
     @property
     def key(self):
@@ -591,6 +1851,221 @@ class ExportDestination(TitleDescriptionModel):
             self._key = self.get_key()
         return self._key
 
+    def put_tar(
+        self,
+        source: Iterable[Union[Path, str]],
+        destination: Iterable[Union[Path, str]] = None,
+        exist_ok: bool = True,
+        force: bool = False,
+        compression: str = None,
+        callback: Callable = None,
+        verify: str = None,
+    ) -> None:
+        """
+        Copies *source* to the host by streaming a tar archive, generated on
+        the fly, into ``tar -x`` running on the host over an SSH exec channel.
+        Avoids the per-file overhead of SFTP for many small files, and never
+        writes the archive to the local disk.
+
+        Parameters
+        ----------
+        source : Iterable[Union[Path, str]]
+            Local files to copy
+        destination : Iterable[Union[Path, str]], optional
+            Destinations in the host file system, see
+            :meth:`resolve_destination`
+        exist_ok : bool, optional
+            Whether to forgive trying to put an existing file (rather than
+            raising an exception), default is True
+        force : bool, optional
+            Whether to override files that already exist in the host, default
+            is False
+        compression : str, optional
+            Archive compression, one of "gz", "bz2" or "xz", default is None
+        callback : Callable, optional
+            Per-file transfer state callback, see :meth:`put`
+        verify : str, optional
+            :class:`~accounts.models.choices.ChecksumMode` name, if provided,
+            files are hashed as they are archived and verified once
+            extracted, see :meth:`verify_checksums`
+
+        Raises
+        ------
+        OSError
+            If extraction in the host failed or a checksum did not match
+        """
+        sources = list(source)
+        destinations = list(destination) if destination else [None] * len(
+            sources
+        )
+        destinations = [
+            self.resolve_destination(path, dest)
+            for path, dest in zip(sources, destinations)
+        ]
+        # Skip existing files (tar would silently override them).
+        remote_files = self.list_remote_files(destinations)
+        transfers = []
+        for path, dest in zip(sources, destinations):
+            if dest in remote_files and not force:
+                self.statistics.record_skipped()
+                if callback is not None:
+                    callback(path, dest, ExportState.SKIPPED)
+                continue
+            elif dest in remote_files and not exist_ok:
+                exists_log = logs.SFTP_PUT_EXISTS.format(
+                    export_destination=self, destination=dest
+                )
+                raise OSError(exists_log)
+            transfers.append((path, dest))
+        if not transfers:
+            return
+        root = Path(
+            os.path.commonpath([str(dest.parent) for _, dest in transfers])
+        )
+        command = TAR_EXTRACT_COMMAND.format(
+            root=shlex.quote(str(root)),
+            flags=TAR_COMPRESSION_FLAGS[compression],
+        )
+        # Log tar stream start.
+        checksums = {} if verify else None
+        start_log = logs.TAR_STREAM_START.format(
+            n=len(transfers), export_destination=self, root=root
+        )
+        self._logger.debug(start_log)
+        channel = self.transport.open_session()
+        try:
+            channel.exec_command(command)
+            with channel.makefile("wb") as stream:
+                mode = f"w|{compression or ''}"
+                fileobj = (
+                    stream
+                    if self.bandwidth_limiter is None
+                    else ThrottledWriter(stream, self.bandwidth_limiter)
+                )
+                with tarfile.open(fileobj=fileobj, mode=mode) as archive:
+                    for path, dest in transfers:
+                        tarinfo = archive.gettarinfo(
+                            str(path), arcname=str(dest.relative_to(root))
+                        )
+                        with open(path, "rb") as local_file:
+                            if checksums is None:
+                                archive.addfile(tarinfo, local_file)
+                                continue
+                            reader = HashingReader(local_file)
+                            archive.addfile(tarinfo, reader)
+                            checksums[dest] = reader.hexdigest()
+            channel.shutdown_write()
+            exit_status = channel.recv_exit_status()
+            stderr = channel.makefile_stderr("rb").read()
+        except (OSError, SSHException) as e:
+            exit_status, stderr = None, str(e)
+        finally:
+            channel.close()
+        if exit_status != 0:
+            # Log failure, report and raise.
+            failure_log = logs.TAR_STREAM_FAILURE.format(
+                export_destination=self,
+                root=root,
+                exit_status=exit_status,
+                stderr=stderr,
+            )
+            self._logger.warning(failure_log)
+            for path, dest in transfers:
+                self.statistics.record_failed()
+                if callback is not None:
+                    callback(path, dest, ExportState.FAILED)
+            raise OSError(failure_log)
+        # Log success and report.
+        success_log = logs.TAR_STREAM_SUCCESS.format(
+            n=len(transfers), export_destination=self, root=root
+        )
+        self._logger.info(success_log)
+        for path, dest in transfers:
+            # Per-file latency is not observable within a single stream.
+            self.statistics.record_file(Path(path).stat().st_size)
+            if callback is not None and not verify:
+                callback(path, dest, ExportState.DONE)
+        if verify:
+            self.verify_checksums(
+                checksums,
+                transfers,
+                mode=ChecksumMode[verify.upper()],
+                callback=callback,
+            )
+
+    @property
+    def is_local(self) -> bool:
+        """
+        Whether this destination is a local or mounted path, exported to
+        without SSH.
+
+        Returns
+        -------
+        bool
+            Whether the local backend is used
+        """
+        return self.backend == ExportBackend.LOCAL.name
+
+    @property
+    def is_available(self) -> bool:
+        """
+        Whether export tasks to this destination may start, i.e. its circuit
+        breaker is closed. Destinations that were never probed are considered
+        available.
+
+        See Also
+        --------
+        * :mod:`~accounts.models.export_destination_health`
+
+        Returns
+        -------
+        bool
+            False if the circuit is open
+        """
+        try:
+            health = self.health
+        except ObjectDoesNotExist:
+            return True
+        return not health.is_circuit_open
+
+    @property
+    def connection(self) -> PooledConnection:
+        """
+        Returns the connection leased from the worker-wide connection pool.
+        Connections that dropped since they were negotiated are discarded and
+        replaced.
+
+        See Also
+        --------
+        * :meth:`release_connection`
+
+        Returns
+        -------
+        PooledConnection
+            Leased connection
+        """
+        if self._connection is not None and self._connection.is_stale:
+            CONNECTION_POOL.discard(self._connection)
+            self._connection = None
+        if self._connection is None:
+            self._connection = CONNECTION_POOL.acquire(self)
+        return self._connection
+
+    @property
+    def statistics(self) -> TransferStatistics:
+        """
+        Returns the transfer statistics collected by this instance, see
+        :class:`~accounts.models.export_transfer_metrics.ExportTransferMetrics`.
+
+        Returns
+        -------
+        TransferStatistics
+            Transfer statistics
+        """
+        if self._statistics is None:
+            self._statistics = TransferStatistics()
+        return self._statistics
+
     @property
     def transport(self):
         """
@@ -599,16 +2074,15 @@ class ExportDestination(TitleDescriptionModel):
 
         See Also
         --------
-        :meth:`create_transport`
+        * :meth:`create_transport`
+        * :attr:`connection`
 
         Returns
         -------
         paramiko.Transport
             SSH transport thread
         """
-        if self._transport is None:
-            self._transport = self.create_transport()
-        return self._transport
+        return self.connection.transport
 
     @property
     def sftp_client(self) -> paramiko.sftp_client.SFTPClient:
@@ -625,6 +2099,7 @@ class ExportDestination(TitleDescriptionModel):
         paramiko.sftp_client.SFTPClient
             SFTP Client connected to the host filesystem
         """
-        if self._sftp_client is None:
-            self._sftp_client = self.start_sftp_client()
-        return self._sftp_client
+        connection = self.connection
+        if connection.sftp_client is None:
+            connection.sftp_client = self.start_sftp_client()
+        return connection.sftp_client
@@ -0,0 +1,105 @@
+"""
+Definition of the :class:`ExportDestinationHealth` class.
+"""
+from accounts.models import help_text
+from accounts.models.managers.export_destination_health import (
+    ExportDestinationHealthManager,
+)
+from accounts.models.utils.circuit_breaker import is_circuit_open, is_stale
+from django.db import models
+from django_extensions.db.models import TimeStampedModel
+
+
+class ExportDestinationHealth(TimeStampedModel):
+    """
+    The latest health probe result of an
+    :class:`~accounts.models.export_destination.ExportDestination`, recorded
+    periodically by :func:`~accounts.tasks.probe_export_destinations`, so that
+    a destination's status may be read without connecting to it and export
+    tasks may consult its circuit breaker (see
+    :mod:`~accounts.models.utils.circuit_breaker`).
+    """
+
+    #: Export destination.
+    export_destination = models.OneToOneField(
+        "accounts.ExportDestination",
+        on_delete=models.CASCADE,
+        related_name="health",
+    )
+
+    #: Whether an SSH session could be negotiated.
+    reachable = models.BooleanField(default=False)
+
+    #: Whether the host key was valid and authentication succeeded.
+    authenticated = models.BooleanField(default=False)
+
+    #: Session negotiation duration in seconds.
+    handshake_latency = models.FloatField(
+        blank=True, null=True, help_text=help_text.HEALTH_HANDSHAKE_LATENCY
+    )
+
+    #: Error raised by the last failed probe.
+    error = models.TextField(blank=True, default="")
+
+    #: Number of consecutive failed probes.
+    consecutive_failures = models.PositiveIntegerField(default=0)
+
+    #: Time of the last probe.
+    last_checked = models.DateTimeField(blank=True, null=True)
+
+    #: Time of the last successful probe.
+    last_success = models.DateTimeField(blank=True, null=True)
+
+    objects = ExportDestinationHealthManager.as_manager()
+
+    class Meta:
+        verbose_name_plural = "Export destination health"
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Export destination health string representation
+        """
+        state = "healthy" if self.is_healthy else "unhealthy"
+        return f"{self.export_destination} ({state})"
+
+    @property
+    def is_healthy(self) -> bool:
+        """
+        Whether the last probe succeeded.
+
+        Returns
+        -------
+        bool
+            True if the destination was reachable and authenticated
+        """
+        return self.reachable and self.authenticated
+
+    @property
+    def is_stale(self) -> bool:
+        """
+        Whether this record is too old to rely on (e.g. the prober is not
+        running).
+
+        Returns
+        -------
+        bool
+            True if stale
+        """
+        return is_stale(self.last_checked)
+
+    @property
+    def is_circuit_open(self) -> bool:
+        """
+        Whether export tasks to this destination should be held back.
+
+        Returns
+        -------
+        bool
+            True if the circuit is open
+        """
+        return is_circuit_open(self.consecutive_failures, self.last_checked)
@@ -0,0 +1,46 @@
+"""
+Definition of the :class:`ExportLease` class.
+"""
+from accounts.models.managers.export_lease import ExportLeaseManager
+from django.db import models
+
+
+class ExportLease(models.Model):
+    """
+    A connection slot to an
+    :class:`~accounts.models.export_destination.ExportDestination` held by a
+    running export task. Leases are shared by all worker processes through the
+    database, and expire if not refreshed (e.g. if the worker died).
+    """
+
+    #: Export destination.
+    export_destination = models.ForeignKey(
+        "accounts.ExportDestination",
+        on_delete=models.CASCADE,
+        related_name="lease_set",
+    )
+
+    #: Holding Celery task ID.
+    task_id = models.CharField(max_length=255)
+
+    #: Lease creation time.
+    created = models.DateTimeField(auto_now_add=True)
+
+    #: Lease expiration time.
+    expires = models.DateTimeField(db_index=True)
+
+    objects = ExportLeaseManager.as_manager()
+
+    class Meta:
+        unique_together = ("export_destination", "task_id")
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Export lease string representation
+        """
+        return f"{self.export_destination} [{self.task_id}]"
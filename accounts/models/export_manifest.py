@@ -0,0 +1,120 @@
+"""
+Definition of the :class:`ExportManifest` class.
+"""
+from accounts.models import help_text
+from accounts.models.choices import ExportState
+from accounts.models.export_manifest_entry import (
+    COMPLETE_STATES,
+    FAILED_STATES,
+    ExportManifestEntry,
+)
+from accounts.models.export_progress import ExportProgress
+from accounts.models.managers.export_manifest import ExportManifestManager
+from accounts.models.utils.manifest_recorder import ManifestRecorder
+from django.db import models
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet, Sum
+from django.utils import timezone
+from django_extensions.db.models import TimeStampedModel
+
+
+class ExportManifest(TimeStampedModel):
+    """
+    Persisted file list of an export job, used to checkpoint and resume
+    transfers and to keep a record of the files exported to each
+    :class:`~accounts.models.export_destination.ExportDestination`.
+    """
+
+    #: Export destination.
+    export_destination = models.ForeignKey(
+        "accounts.ExportDestination",
+        on_delete=models.CASCADE,
+        related_name="manifest_set",
+    )
+
+    #: Export job identifier.
+    job_id = models.CharField(
+        max_length=255, help_text=help_text.EXPORT_MANIFEST_JOB_ID
+    )
+
+    #: Aggregated progress of the export request this job is part of.
+    progress = models.ForeignKey(
+        "accounts.ExportProgress",
+        on_delete=models.SET_NULL,
+        related_name="manifest_set",
+        blank=True,
+        null=True,
+    )
+
+    objects = ExportManifestManager.as_manager()
+
+    class Meta:
+        unique_together = ("export_destination", "job_id")
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Export manifest string representation
+        """
+        return f"{self.export_destination} [{self.job_id}]"
+
+    def get_pending_entries(self, use_history: bool = True) -> QuerySet:
+        """
+        Returns the entries that still need to be transferred. Entries
+        skipped by history are counted in the aggregated export progress, if
+        any, as they are never reported by a
+        :class:`~accounts.models.utils.manifest_recorder.ManifestRecorder`.
+
+        Parameters
+        ----------
+        use_history : bool, optional
+            Whether to mark files previously exported to the same destination
+            (with an unchanged size and modification time) as skipped, without
+            querying the host, default is True
+
+        Returns
+        -------
+        QuerySet
+            Pending entries
+        """
+        pending = self.entry_set.exclude(state__in=COMPLETE_STATES)
+        if use_history:
+            exported = ExportManifestEntry.objects.filter(
+                manifest__export_destination=self.export_destination_id,
+                state__in=COMPLETE_STATES,
+                destination=OuterRef("destination"),
+                size=OuterRef("size"),
+                mtime=OuterRef("mtime"),
+            ).exclude(manifest=self)
+            skipped = pending.filter(Exists(exported))
+            if self.progress_id is not None:
+                counts = skipped.aggregate(
+                    n_files=Count("id"),
+                    n_bytes=Sum("size"),
+                    n_failed=Count("id", filter=Q(state__in=FAILED_STATES)),
+                )
+            n_skipped = skipped.update(
+                state=ExportState.SKIPPED.name, modified=timezone.now()
+            )
+            if n_skipped and self.progress_id is not None:
+                ExportProgress.objects.add_progress(
+                    self.progress_id,
+                    n_files=counts["n_files"],
+                    n_bytes=counts["n_bytes"] or 0,
+                    n_failed=-counts["n_failed"],
+                )
+        return pending.all()
+
+    def recorder(self, **kwargs) -> ManifestRecorder:
+        """
+        Returns a recorder used to checkpoint transfer states.
+
+        Returns
+        -------
+        ManifestRecorder
+            Batched state recorder
+        """
+        return ManifestRecorder(self, **kwargs)
@@ -0,0 +1,66 @@
+"""
+Definition of the :class:`ExportManifestEntry` class.
+"""
+from accounts.models import help_text
+from accounts.models.choices import ExportState
+from django.db import models
+
+#: States of files that are present in the export destination.
+COMPLETE_STATES = ExportState.DONE.name, ExportState.SKIPPED.name
+#: States of files that may have been left partial or corrupt in the export
+#: destination.
+FAILED_STATES = ExportState.FAILED.name, ExportState.MISMATCH.name
+
+
+class ExportManifestEntry(models.Model):
+    """
+    A single file within an
+    :class:`~accounts.models.export_manifest.ExportManifest`.
+    """
+
+    #: The manifest this file belongs to.
+    manifest = models.ForeignKey(
+        "accounts.ExportManifest",
+        on_delete=models.CASCADE,
+        related_name="entry_set",
+    )
+
+    #: Local file path.
+    source = models.CharField(max_length=1024)
+
+    #: Absolute destination path in the host.
+    destination = models.CharField(
+        max_length=1024,
+        db_index=True,
+        help_text=help_text.EXPORT_MANIFEST_ENTRY_DESTINATION,
+    )
+
+    #: Local file size in bytes.
+    size = models.BigIntegerField()
+
+    #: Local file modification time.
+    mtime = models.FloatField(verbose_name="Modification time")
+
+    #: Transfer state.
+    state = models.CharField(
+        max_length=10,
+        choices=ExportState.choices(),
+        default=ExportState.PENDING.name,
+    )
+
+    #: Last state change.
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Export manifest entries"
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Export manifest entry string representation
+        """
+        return f"{self.source} -> {self.destination} ({self.state})"
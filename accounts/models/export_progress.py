@@ -0,0 +1,140 @@
+"""
+Definition of the :class:`ExportProgress` class.
+"""
+from typing import Optional
+
+from accounts.models import help_text
+from accounts.models.managers.export_progress import ExportProgressManager
+from django.db import models
+from django.utils import timezone
+from django_extensions.db.models import TimeStampedModel
+
+
+class ExportProgress(TimeStampedModel):
+    """
+    Aggregated progress of an export job fanned out to any number of
+    :func:`~accounts.tasks.export_files` work units, so that the progress of
+    a whole job may be followed by polling a single record. Work units
+    update it in batches, along with their manifests (see
+    :class:`~accounts.models.utils.manifest_recorder.ManifestRecorder`), and
+    count their outcome once done (see :class:`~accounts.tasks.ExportUnit`),
+    summarizing the job when individual task results are not stored.
+    """
+
+    #: Export job identifier.
+    job_id = models.CharField(
+        max_length=255, unique=True, help_text=help_text.EXPORT_PROGRESS_JOB_ID
+    )
+
+    #: Number of dispatched files.
+    n_files_total = models.PositiveIntegerField(default=0)
+
+    #: Number of dispatched bytes.
+    n_bytes_total = models.BigIntegerField(default=0)
+
+    #: Number of transferred or skipped files.
+    n_files_done = models.PositiveIntegerField(default=0)
+
+    #: Number of transferred or skipped bytes.
+    n_bytes_done = models.BigIntegerField(default=0)
+
+    #: Number of failed files.
+    n_files_failed = models.PositiveIntegerField(default=0)
+
+    #: Time of the last reported file transfer.
+    last_progress = models.DateTimeField(blank=True, null=True)
+
+    #: Number of dispatched tasks (work units and conversions).
+    n_tasks_total = models.PositiveIntegerField(default=0)
+
+    #: Number of succeeded tasks.
+    n_tasks_done = models.PositiveIntegerField(default=0)
+
+    #: Number of failed tasks, see
+    #: :class:`~accounts.models.export_task_failure.ExportTaskFailure`.
+    n_tasks_failed = models.PositiveIntegerField(default=0)
+
+    #: Time all dispatched tasks finished.
+    finished = models.DateTimeField(blank=True, null=True)
+
+    #: Export job this one coalesced onto, see
+    #: :func:`~accounts.tasks.dispatch_export`.
+    coalesced_into = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        related_name="coalesced_set",
+        blank=True,
+        null=True,
+        help_text=help_text.EXPORT_PROGRESS_COALESCED_INTO,
+    )
+
+    objects = ExportProgressManager.as_manager()
+
+    class Meta:
+        verbose_name_plural = "Export progress"
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Export progress string representation
+        """
+        return f"{self.job_id} ({self.n_files_done}/{self.n_files_total})"
+
+    @property
+    def is_finished(self) -> bool:
+        """
+        Whether all dispatched files were either exported or failed.
+
+        Returns
+        -------
+        bool
+            True if no files are pending
+        """
+        return self.n_files_done + self.n_files_failed >= self.n_files_total
+
+    @property
+    def fraction_done(self) -> Optional[float]:
+        """
+        Returns the exported fraction of the dispatched bytes.
+
+        Returns
+        -------
+        Optional[float]
+            Fraction between 0 and 1, or None if nothing was dispatched
+        """
+        if not self.n_bytes_total:
+            return None
+        return min(self.n_bytes_done / self.n_bytes_total, 1.0)
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """
+        Returns the average throughput since the job was created.
+
+        Returns
+        -------
+        Optional[float]
+            Bytes per second, or None if nothing was exported yet
+        """
+        if self.last_progress is None:
+            return None
+        seconds = (self.last_progress - self.created).total_seconds()
+        return self.n_bytes_done / seconds if seconds > 0 else None
+
+    @property
+    def duration(self) -> float:
+        """
+        Returns the number of seconds from the job's creation until all of
+        its tasks finished (or until now, if still running).
+
+        Returns
+        -------
+        float
+            Duration in seconds
+        """
+        end = self.finished or timezone.now()
+        return (end - self.created).total_seconds()
@@ -0,0 +1,69 @@
+"""
+Definition of the :class:`ExportRequest` class.
+"""
+from accounts.models import help_text
+from accounts.models.export_manifest_entry import (
+    FAILED_STATES,
+    ExportManifestEntry,
+)
+from accounts.models.managers.export_request import ExportRequestManager
+from django.db import models
+
+
+class ExportRequest(models.Model):
+    """
+    A planned export to an
+    :class:`~accounts.models.export_destination.ExportDestination`, identified
+    by a content-derived idempotency key so that identical requests coalesce
+    onto the tasks already dispatched.
+    """
+
+    #: Export destination.
+    export_destination = models.ForeignKey(
+        "accounts.ExportDestination",
+        on_delete=models.CASCADE,
+        related_name="request_set",
+    )
+
+    #: Idempotency key.
+    key = models.CharField(
+        max_length=64, db_index=True, help_text=help_text.EXPORT_REQUEST_KEY
+    )
+
+    #: Dispatched work unit task IDs.
+    task_ids = models.JSONField(default=list)
+
+    #: Number of files dispatched (after excluding files in flight).
+    n_files = models.PositiveIntegerField(default=0)
+
+    #: Request creation time.
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = ExportRequestManager.as_manager()
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Export request string representation
+        """
+        return f"{self.export_destination} [{self.key[:8]}]"
+
+    def has_failures(self) -> bool:
+        """
+        Whether any of the dispatched files failed to transfer or verify, in
+        which case identical requests should not coalesce onto this one.
+
+        Returns
+        -------
+        bool
+            True if any file transfer failed
+        """
+        return ExportManifestEntry.objects.filter(
+            manifest__export_destination=self.export_destination_id,
+            manifest__job_id__in=self.task_ids,
+            state__in=FAILED_STATES,
+        ).exists()
@@ -0,0 +1,48 @@
+"""
+Definition of the :class:`ExportTaskFailure` class.
+"""
+from accounts.models import help_text
+from django.db import models
+
+
+class ExportTaskFailure(models.Model):
+    """
+    The details of a failed task of an export job, recorded by
+    :class:`~accounts.tasks.ExportUnit` whether or not task results are
+    stored, so that failures may be inspected on demand.
+    """
+
+    #: Export job progress.
+    progress = models.ForeignKey(
+        "accounts.ExportProgress",
+        on_delete=models.CASCADE,
+        related_name="failure_set",
+    )
+
+    #: Failed Celery task ID.
+    task_id = models.CharField(max_length=255, db_index=True)
+
+    #: Failed Celery task name.
+    task_name = models.CharField(max_length=255)
+
+    #: Raised exception.
+    exception = models.TextField()
+
+    #: Exception traceback.
+    traceback = models.TextField(
+        blank=True, default="", help_text=help_text.EXPORT_TASK_TRACEBACK
+    )
+
+    #: Failure time.
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Export task failure string representation
+        """
+        return f"{self.task_name} [{self.task_id}]"
@@ -0,0 +1,78 @@
+"""
+Definition of the :class:`ExportTransferMetrics` class.
+"""
+from accounts.models import help_text
+from accounts.models.managers.export_transfer_metrics import (
+    ExportTransferMetricsManager,
+)
+from django.db import models
+
+
+class ExportTransferMetrics(models.Model):
+    """
+    Metrics collected during a single export task's transfers to an
+    :class:`~accounts.models.export_destination.ExportDestination`.
+    """
+
+    #: Export destination.
+    export_destination = models.ForeignKey(
+        "accounts.ExportDestination",
+        on_delete=models.CASCADE,
+        related_name="metrics_set",
+    )
+
+    #: Celery task ID.
+    task_id = models.CharField(
+        max_length=255, blank=True, null=True, db_index=True
+    )
+
+    #: Record creation time.
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    #: Number of transferred files.
+    n_files = models.PositiveIntegerField(default=0)
+
+    #: Number of skipped files.
+    n_skipped = models.PositiveIntegerField(default=0)
+
+    #: Number of failed files.
+    n_failed = models.PositiveIntegerField(default=0)
+
+    #: Number of transferred bytes.
+    n_bytes = models.BigIntegerField(default=0)
+
+    #: Number of task retries.
+    retries = models.PositiveIntegerField(default=0)
+
+    #: Total transfer duration in seconds.
+    duration = models.FloatField(default=0)
+
+    #: Time spent negotiating and authenticating SSH sessions in seconds.
+    handshake_duration = models.FloatField(default=0)
+
+    #: Time spent creating remote directories in seconds.
+    mkdir_duration = models.FloatField(default=0)
+
+    #: Time spent querying remote files in seconds.
+    stat_duration = models.FloatField(default=0)
+
+    #: Per-file latency histogram.
+    latency_histogram = models.JSONField(
+        default=list, help_text=help_text.EXPORT_METRICS_LATENCY_HISTOGRAM
+    )
+
+    objects = ExportTransferMetricsManager.as_manager()
+
+    class Meta:
+        verbose_name_plural = "Export transfer metrics"
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Export transfer metrics string representation
+        """
+        return f"{self.export_destination} [{self.task_id}]"
@@ -11,5 +11,24 @@ EXPORT_DESTINATION_USERNAME: str = "Username used for SSH authentication"
 EXPORT_DESTINATION_PASSWORD: str = "Password used for SSH authentication"
 EXPORT_DESTINATION_USERS: str = "Users that will have access to this export destination."
 EXPORT_DESTINATION_PATH: str = "Base path on the host to use for relative file transfers"
+EXPORT_DESTINATION_BACKEND: str = "Transfer backend, local or mounted paths are exported without SSH (the connection settings are then ignored)"
+EXPORT_DESTINATION_MAX_CONNECTIONS: str = "Maximal number of concurrent export tasks to this destination across all workers (blank for unlimited)"
+EXPORT_DESTINATION_MAX_BANDWIDTH: str = "Maximal aggregate transfer rate to this destination across all workers in bytes per second (blank for unlimited)"
+SSH_CIPHERS: str = "Preferred SSH ciphers in order, comma-separated (blank for the defaults)"
+SSH_COMPRESSION: str = "Whether to compress the SSH transport (usually only worthwhile over slow links)"
+SSH_WINDOW_SIZE: str = "SSH channel window size in bytes (blank for the default)"
+SSH_MAX_PACKET_SIZE: str = "SSH channel maximal packet size in bytes (blank for the default)"
+SFTP_BLOCK_SIZE: str = "SFTP write request size in bytes (blank for the default)"
+EXPORT_MANIFEST_JOB_ID: str = "Identifier of the export job (usually the Celery task ID)"
+EXPORT_METRICS_LATENCY_HISTOGRAM: str = "Per-file transfer latency counts per logarithmic bucket (1 ms to ~65 s)"
+EXPORT_REQUEST_KEY: str = "Hash of the export destination, file format and resolved file set"
+EXPORT_MANIFEST_ENTRY_DESTINATION: str = "Absolute destination path in the host"
+EXPORT_PROGRESS_JOB_ID: str = "Identifier of the export job (usually the Celery task ID of the export request)"
+EXPORT_PROGRESS_COALESCED_INTO: str = "Export job an identical request coalesced onto, whose progress is reported instead"
+HEALTH_HANDSHAKE_LATENCY: str = "Duration of the SSH session negotiation during the last health probe (seconds)"
+EXPORT_TASK_TRACEBACK: str = "Traceback of the exception the task failed with"
+TASK_LINEAGE_PARENT: str = "ID of the Celery task this task was published by (blank for root tasks)"
+TASK_LINEAGE_ROOT: str = "ID of the first Celery task in this task's tree (the task itself for root tasks)"
+RUN_FILE_MANIFEST_ROOT: str = "Listed run output directory"
 
 # flake8: noqa: E501
@@ -23,6 +23,26 @@ SSH_PASSWORD_AUTH_START: str = "Attempting password authentication to {export_de
 SSH_PASSWORD_AUTH_FAILURE: str = "Password authentication to {export_destination} failed with the following exception:\n{exception}"
 SSH_PASSWORD_AUTH_SUCCESS: str = "Password authentication to {export_destination} successful."
 SSH_TRANSPORT_ACTIVE: str = "Active SSH Transport instance found for {export_destination}."
+SSH_POOL_REUSE: str = "Reusing pooled SSH connection to {export_destination}."
+SSH_POOL_NEW: str = "Opened a new pooled SSH connection to {export_destination}."
+SSH_POOL_EVICT: str = "Evicted idle or inactive pooled SSH connection to export destination #{destination_id}."
+SSH_POOL_EXHAUSTED: str = "No pooled SSH connection to {export_destination} became available within {timeout} seconds!"
+EXPORT_LEASE_ACQUIRED: str = "Acquired an export slot to {export_destination} for task {task_id} ({rate} bytes/s)."
+EXPORT_LEASE_BUSY: str = "All {max_connections} export slots to {export_destination} are taken, task {task_id} could not start within {timeout} seconds."
+EXPORT_LEASE_RELEASED: str = "Released the export slot to {export_destination} held by task {task_id}."
+EXPORT_PROBE_RESULT: str = "Probed {export_destination}: {latency:.3f} seconds per file, {throughput} bytes/s."
+SSH_CIPHERS_UNSUPPORTED: str = "Ciphers not supported for {export_destination}: {ciphers}."
+TRANSPORT_BENCHMARK_SKIP: str = "Skipping transport profile {profile} for {export_destination}: no supported ciphers."
+TRANSPORT_BENCHMARK_RESULT: str = "Benchmarked transport profile {profile} for {export_destination}: {throughput:.0f} bytes/s."
+TRANSPORT_BENCHMARK_FAILURE: str = "Failed to benchmark transport profile {profile} for {export_destination}:\n{exception}"
+TRANSPORT_BENCHMARK_SELECTED: str = "Selected transport profile {profile} for {export_destination}."
+FAN_OUT_LANE_FAILURE: str = "Fan-out export to {export_destination} failed with the following exception:\n{exception}"
+FAN_OUT_LANE_DETACHED: str = "Detached {export_destination} from the fan-out export after holding back other destinations for {stalled:.1f} seconds, {n_pending} files left pending."
+FAN_OUT_SIZE_MISMATCH: str = "Size mismatch in {export_destination}:{destination}: expected {expected} bytes, found {found}!"
+FAN_OUT_READ_FAILURE: str = "Failed to read {source} for a fan-out export with the following exception:\n{exception}"
+HEALTH_CHECK_SUCCESS: str = "Health probe of {export_destination} succeeded ({latency:.3f} seconds handshake)."
+HEALTH_CHECK_FAILURE: str = "Health probe of {export_destination} failed with the following exception:\n{exception}"
+EXPORT_CIRCUIT_OPEN: str = "Export to {export_destination} held back, the destination failed its last {n_failures} health probes."
 SFTP_CLIENT_START: str = "Starting SFTP client connection to {export_destination}..."
 SFTP_CLIENT_FAILURE: str = "Failed to start SFTP client connection to {export_destination} with the following exception:\n{exception}"
 SFTP_CLIENT_SUCCESS: str = "SFTP client connection to {export_destination} successfully started."
@@ -31,7 +51,18 @@ SFTP_PUT_FAILURE: str = "Failed to transfer {source} to {export_destination}:{de
 SFTP_PUT_SUCCESS: str = "Successfully copied {source} to {export_destination}:{destination}."
 SFTP_PUT_EXISTS: str = "File already exists in {export_destination}:{destination}!"
 SFTP_PUT_BAD_INPUT: str = "Bad put() source input type: {bad_type}! source may only be a Path instance, a string representing a path, or an iterable of either."
+SFTP_PUT_CHANNELS_LIMITED: str = "Parallel transfer to {export_destination} limited to {n} SFTP channels, opening another channel failed with the following exception:\n{exception}"
+SFTP_PUT_PARALLEL_FAILURES: str = "{n_failed} out of {n} parallel file transfers to {export_destination} failed!"
 SFTP_PUT_ABORT: str = "Aborting file transfer from {source} to {export_destination}:{destination}."
+SFTP_REMOVE_SUCCESS: str = "Removed {n} files from {export_destination}."
+TAR_STREAM_START: str = "Streaming {n} files as a tar archive to {export_destination}:{root}..."
+TAR_STREAM_FAILURE: str = "Tar stream extraction in {export_destination}:{root} failed (exit status {exit_status}) with the following error:\n{stderr}"
+TAR_STREAM_SUCCESS: str = "Successfully streamed {n} files to {export_destination}:{root}."
+CHECKSUM_MISMATCH: str = "Checksum mismatch for {export_destination}:{destination} (expected {expected}, found {found})!"
+CHECKSUM_REMOTE_FAILURE: str = "Failed to compute checksums in {export_destination} (exit status {exit_status}), writing a checksum file instead:\n{stderr}"
+CHECKSUM_FILE_WRITTEN: str = "Wrote {n} checksums to {export_destination}:{path}."
+CHECKSUM_VERIFIED: str = "Verified {n} checksums in {export_destination}, {n_mismatched} mismatched."
+CHECKSUM_VERIFY_FAILURE: str = "Failed to verify the files transferred to {export_destination} before the transfer failed with the following exception:\n{exception}"
 SFTP_MKDIR_START: str = "Creating directory {path} within {export_destination}..."
 SFTP_MKDIR_FAILURE: str = "Failed to create directory {path} within {export_destination} with the following exception:\n{exception}"
 SFTP_MKDIR_SUCCESS: str = "Successfully create {path} within {export_destination}."
@@ -0,0 +1,51 @@
+from django.db import models
+from django.utils import timezone
+
+
+class ExportDestinationHealthManager(models.QuerySet):
+    def record(
+        self,
+        export_destination_id: int,
+        reachable: bool,
+        authenticated: bool,
+        handshake_latency: float = None,
+        error: str = "",
+    ):
+        """
+        Records a health probe result, see
+        :meth:`~accounts.models.export_destination.ExportDestination.check_health`.
+
+        Parameters
+        ----------
+        export_destination_id : int
+            Export destination ID
+        reachable : bool
+            Whether an SSH session could be negotiated
+        authenticated : bool
+            Whether the host key was valid and authentication succeeded
+        handshake_latency : float, optional
+            Session negotiation duration in seconds
+        error : str, optional
+            Raised error, if any
+
+        Returns
+        -------
+        ExportDestinationHealth
+            Updated health record
+        """
+        now = timezone.now()
+        health, _ = self.get_or_create(
+            export_destination_id=export_destination_id
+        )
+        health.reachable = reachable
+        health.authenticated = authenticated
+        health.handshake_latency = handshake_latency
+        health.error = error
+        health.last_checked = now
+        if health.is_healthy:
+            health.consecutive_failures = 0
+            health.last_success = now
+        else:
+            health.consecutive_failures += 1
+        health.save()
+        return health
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class ExportLeaseManager(models.QuerySet):
+    def active(self):
+        """
+        Returns unexpired leases.
+
+        Returns
+        -------
+        QuerySet
+            Active leases
+        """
+        return self.filter(expires__gt=timezone.now())
+
+    def acquire(self, export_destination, task_id: str, ttl: int):
+        """
+        Tries to acquire a connection slot to *export_destination*. The
+        destination's row is locked while counting its active leases, so that
+        concurrent workers never exceed
+        :attr:`~accounts.models.export_destination.ExportDestination.max_connections`.
+
+        Parameters
+        ----------
+        export_destination : ExportDestination
+            Export destination
+        task_id : str
+            Holding Celery task ID, a task holding a lease may re-acquire it
+        ttl : int
+            Lease duration in seconds
+
+        Returns
+        -------
+        ExportLease
+            Acquired lease, or None if all slots are taken
+        """
+        ExportDestination = apps.get_model("accounts", "ExportDestination")
+        expires = timezone.now() + timedelta(seconds=ttl)
+        with transaction.atomic():
+            destination = ExportDestination.objects.select_for_update().get(
+                id=export_destination.id
+            )
+            leases = self.filter(export_destination=destination)
+            leases.filter(expires__lte=timezone.now()).delete()
+            lease = leases.filter(task_id=task_id).first()
+            if lease is not None:
+                lease.expires = expires
+                lease.save(update_fields=["expires"])
+                return lease
+            limit = destination.max_connections
+            if limit and leases.count() >= limit:
+                return None
+            return self.create(
+                export_destination=destination,
+                task_id=task_id,
+                expires=expires,
+            )
@@ -0,0 +1,137 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List
+
+from accounts.models.choices import ExportState
+from accounts.models.export_lease import ExportLease
+from accounts.models.export_manifest_entry import (
+    COMPLETE_STATES,
+    ExportManifestEntry,
+)
+from accounts.models.utils.export_plan import ExportItem
+from django.db import models
+from django.db.models import Q
+
+#: Number of entries created per query.
+BULK_CREATE_BATCH_SIZE: int = 1000
+
+
+class ExportManifestManager(models.QuerySet):
+    def for_job(
+        self,
+        export_destination,
+        job_id: str,
+        sources: Iterable[str],
+        destinations: Iterable[str] = None,
+        progress_id: int = None,
+    ):
+        """
+        Returns the manifest of the given export job, creating it (and its
+        entries) if it does not exist yet. Retries of the same job reuse the
+        existing manifest and its checkpointed states.
+
+        Parameters
+        ----------
+        export_destination : ExportDestination
+            Export destination
+        job_id : str
+            Export job identifier (usually the Celery task ID)
+        sources : Iterable[str]
+            Local file paths
+        destinations : Iterable[str], optional
+            Destinations in the host, see
+            :meth:`~accounts.models.export_destination.ExportDestination.resolve_destination`
+        progress_id : int, optional
+            :class:`~accounts.models.export_progress.ExportProgress` ID, set
+            only when the manifest is created
+
+        Returns
+        -------
+        ExportManifest
+            Export job manifest
+        """
+        manifest, created = self.get_or_create(
+            export_destination=export_destination,
+            job_id=job_id,
+            defaults={"progress_id": progress_id},
+        )
+        if created:
+            sources = list(sources)
+            destinations = destinations or [None] * len(sources)
+            entries = []
+            for source, destination in zip(sources, destinations):
+                stat = Path(source).stat()
+                destination = export_destination.resolve_destination(
+                    source, destination
+                )
+                entry = ExportManifestEntry(
+                    manifest=manifest,
+                    source=str(source),
+                    destination=str(destination),
+                    size=stat.st_size,
+                    mtime=stat.st_mtime,
+                )
+                entries.append(entry)
+            ExportManifestEntry.objects.bulk_create(
+                entries, batch_size=BULK_CREATE_BATCH_SIZE
+            )
+        return manifest
+
+    def exclude_in_flight(
+        self, export_destination, items: List[ExportItem], since: datetime
+    ) -> List[ExportItem]:
+        """
+        Drops export items that are in transfer or exported to
+        *export_destination* by manifests active since *since*, i.e. items
+        with a matching entry (same source, destination and size) that is
+        either complete, or pending in a job currently holding a connection
+        slot (see :class:`~accounts.models.export_lease.ExportLease`).
+        Pending entries of jobs that crashed, were revoked or are still
+        queued are taken over, as files exported twice are skipped as
+        existing while dropped files would never be exported.
+
+        Parameters
+        ----------
+        export_destination : ExportDestination
+            Export destination
+        items : List[ExportItem]
+            Export items
+        since : datetime
+            Earliest entry modification time considered
+
+        Returns
+        -------
+        List[ExportItem]
+            Export items that are not in flight
+        """
+        resolved = [
+            str(export_destination.resolve_destination(source, destination))
+            for source, destination, _ in items
+        ]
+        live_jobs = (
+            ExportLease.objects.active()
+            .filter(export_destination=export_destination)
+            .values("task_id")
+        )
+        in_flight_states = Q(state__in=COMPLETE_STATES) | Q(
+            state=ExportState.PENDING.name, manifest__job_id__in=live_jobs
+        )
+        in_flight = set()
+        batch_size = BULK_CREATE_BATCH_SIZE
+        for start in range(0, len(resolved), batch_size):
+            batch = resolved[start:start + batch_size]
+            entries = (
+                ExportManifestEntry.objects.filter(
+                    manifest__export_destination=export_destination,
+                    destination__in=batch,
+                    modified__gte=since,
+                )
+                .filter(in_flight_states)
+                .values_list("source", "destination", "size")
+            )
+            in_flight.update(entries)
+        return [
+            item
+            for item, destination in zip(items, resolved)
+            if (item[0], destination, item[2]) not in in_flight
+        ]
@@ -0,0 +1,119 @@
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
+
+class ExportProgressManager(models.QuerySet):
+    def add_totals(
+        self,
+        progress_id: int,
+        n_files: int = 0,
+        n_bytes: int = 0,
+        n_tasks: int = 0,
+    ) -> int:
+        """
+        Adds dispatched files and tasks to the totals of an export job.
+
+        Parameters
+        ----------
+        progress_id : int
+            Export progress ID
+        n_files : int, optional
+            Number of dispatched files
+        n_bytes : int, optional
+            Number of dispatched bytes
+        n_tasks : int, optional
+            Number of dispatched tasks
+
+        Returns
+        -------
+        int
+            Number of updated records
+        """
+        return self.filter(id=progress_id).update(
+            n_files_total=F("n_files_total") + n_files,
+            n_bytes_total=F("n_bytes_total") + n_bytes,
+            n_tasks_total=F("n_tasks_total") + n_tasks,
+            modified=timezone.now(),
+        )
+
+    def add_progress(
+        self,
+        progress_id: int,
+        n_files: int = 0,
+        n_bytes: int = 0,
+        n_failed: int = 0,
+    ) -> int:
+        """
+        Increments the counters of an export job in a single query, so that
+        concurrent work units may update the same record.
+
+        Parameters
+        ----------
+        progress_id : int
+            Export progress ID
+        n_files : int, optional
+            Number of newly completed (transferred or skipped) files
+        n_bytes : int, optional
+            Number of newly completed bytes
+        n_failed : int, optional
+            Change in the number of failed files (negative when failed files
+            are retried successfully)
+
+        Returns
+        -------
+        int
+            Number of updated records
+        """
+        now = timezone.now()
+        return self.filter(id=progress_id).update(
+            n_files_done=F("n_files_done") + n_files,
+            n_bytes_done=F("n_bytes_done") + n_bytes,
+            n_files_failed=F("n_files_failed") + n_failed,
+            modified=now,
+            last_progress=now,
+        )
+
+    def add_task_result(self, progress_id: int, failed: bool = False) -> int:
+        """
+        Counts a finished task of an export job, marking the job as finished
+        once all of its dispatched tasks are.
+
+        Parameters
+        ----------
+        progress_id : int
+            Export progress ID
+        failed : bool, optional
+            Whether the task failed
+
+        Returns
+        -------
+        int
+            Number of updated records
+        """
+        field = "n_tasks_failed" if failed else "n_tasks_done"
+        updated = self.filter(id=progress_id).update(
+            **{field: F(field) + 1}, modified=timezone.now()
+        )
+        self.finish_if_done(progress_id)
+        return updated
+
+    def finish_if_done(self, progress_id: int) -> int:
+        """
+        Marks an export job as finished if all of its dispatched tasks are.
+
+        Parameters
+        ----------
+        progress_id : int
+            Export progress ID
+
+        Returns
+        -------
+        int
+            Number of updated records
+        """
+        return self.filter(
+            id=progress_id,
+            finished__isnull=True,
+            n_tasks_total__lte=F("n_tasks_done") + F("n_tasks_failed"),
+        ).update(finished=timezone.now())
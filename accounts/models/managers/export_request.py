@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+#: Setting key for the number of seconds identical requests are coalesced.
+DEDUPLICATION_WINDOW_SETTING: str = "EXPORT_DEDUPLICATION_WINDOW"
+#: Default deduplication window (seconds).
+DEFAULT_DEDUPLICATION_WINDOW: int = 3 * 60 * 60
+
+
+def get_deduplication_window() -> timedelta:
+    """
+    Returns the period in which identical or overlapping export requests are
+    deduplicated.
+
+    Returns
+    -------
+    timedelta
+        Deduplication window
+    """
+    seconds = getattr(
+        settings, DEDUPLICATION_WINDOW_SETTING, DEFAULT_DEDUPLICATION_WINDOW
+    )
+    return timedelta(seconds=seconds)
+
+
+class ExportRequestManager(models.QuerySet):
+    def recent(self):
+        """
+        Returns requests created within the deduplication window.
+
+        Returns
+        -------
+        QuerySet
+            Recent export requests
+        """
+        since = timezone.now() - get_deduplication_window()
+        return self.filter(created__gte=since)
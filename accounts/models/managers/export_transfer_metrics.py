@@ -0,0 +1,95 @@
+from accounts.models.utils.transfer_statistics import (
+    LATENCY_BUCKETS,
+    TransferStatistics,
+    get_latency_percentile,
+)
+from django.db import models
+from django.db.models import Count, Sum
+
+#: Latency percentiles included in metrics summaries.
+SUMMARY_PERCENTILES = 50, 90, 99
+#: Summed fields included in metrics summaries.
+SUMMED_FIELDS = (
+    "n_files",
+    "n_skipped",
+    "n_failed",
+    "n_bytes",
+    "retries",
+    "duration",
+    "handshake_duration",
+    "mkdir_duration",
+    "stat_duration",
+)
+
+
+class ExportTransferMetricsManager(models.QuerySet):
+    def from_statistics(
+        self,
+        export_destination,
+        statistics: TransferStatistics,
+        task_id: str = None,
+        retries: int = 0,
+    ):
+        """
+        Creates a metrics record from collected transfer statistics.
+
+        Parameters
+        ----------
+        export_destination : ExportDestination
+            Export destination
+        statistics : TransferStatistics
+            Collected transfer statistics
+        task_id : str, optional
+            Celery task ID
+        retries : int, optional
+            Number of times the task was retried
+
+        Returns
+        -------
+        ExportTransferMetrics
+            Created metrics record
+        """
+        durations = statistics.durations
+        return self.create(
+            export_destination=export_destination,
+            task_id=task_id,
+            n_files=statistics.n_files,
+            n_skipped=statistics.n_skipped,
+            n_failed=statistics.n_failed,
+            n_bytes=statistics.n_bytes,
+            retries=retries,
+            duration=durations["transfer"],
+            handshake_duration=durations["handshake"],
+            mkdir_duration=durations["mkdir"],
+            stat_duration=durations["stat"],
+            latency_histogram=statistics.latency_histogram,
+        )
+
+    def summarize(self) -> dict:
+        """
+        Aggregates the metrics in this queryset.
+
+        Returns
+        -------
+        dict
+            Summed counters and durations, overall throughput (bytes per
+            second) and estimated per-file latency percentiles (seconds)
+        """
+        aggregates = {field: Sum(field) for field in SUMMED_FIELDS}
+        summary = self.aggregate(n_transfers=Count("id"), **aggregates)
+        for field in SUMMED_FIELDS:
+            summary[field] = summary[field] or 0
+        summary["throughput"] = (
+            summary["n_bytes"] / summary["duration"]
+            if summary["duration"]
+            else None
+        )
+        histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        for counts in self.values_list("latency_histogram", flat=True):
+            for index, count in enumerate(counts):
+                histogram[index] += count
+        summary["latency"] = {
+            f"p{percentile}": get_latency_percentile(histogram, percentile)
+            for percentile in SUMMARY_PERCENTILES
+        }
+        return summary
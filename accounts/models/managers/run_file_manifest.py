@@ -0,0 +1,44 @@
+from accounts.models.utils.file_walker import get_changed_directories, walk
+from django.db import models
+
+
+class RunFileManifestManager(models.QuerySet):
+    def for_run(self, run, workers: int = None):
+        """
+        Returns the file manifest of an analysis run, listing the run's
+        directory only if it was never listed or any of its directories has
+        changed since.
+
+        Parameters
+        ----------
+        run : Run
+            Analysis run
+        workers : int, optional
+            Number of directory scanning threads, see
+            :func:`~accounts.models.utils.file_walker.get_walk_workers`
+
+        Returns
+        -------
+        RunFileManifest
+            Up-to-date run file manifest
+        """
+        root = str(run.path)
+        manifest = self.filter(run=run).first()
+        if manifest is not None and manifest.root == root:
+            changed = get_changed_directories(
+                root, manifest.directories, workers=workers
+            )
+            if not changed:
+                return manifest
+        files, directories = walk(root, workers=workers)
+        manifest, _ = self.update_or_create(
+            run=run,
+            defaults={
+                "root": root,
+                "files": files,
+                "directories": directories,
+                "n_files": len(files),
+                "n_bytes": sum(size for _, size, _ in files),
+            },
+        )
+        return manifest
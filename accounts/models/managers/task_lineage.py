@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from django.db import models
+
+
+class TaskLineageManager(models.QuerySet):
+    def record(
+        self,
+        task_id: str,
+        task_name: str = "",
+        parent_id: str = None,
+        root_id: str = None,
+    ) -> None:
+        """
+        Records a task's lineage with a single insert, ignoring tasks already
+        recorded (e.g. when published and again when started, or requeued
+        with the same ID).
+
+        Parameters
+        ----------
+        task_id : str
+            Celery task ID
+        task_name : str, optional
+            Celery task name
+        parent_id : str, optional
+            ID of the publishing task, None for root tasks
+        root_id : str, optional
+            ID of the tree's root task, defaults to *task_id*
+        """
+        lineage = self.model(
+            task_id=task_id,
+            task_name=task_name or "",
+            parent_id=parent_id,
+            root_id=root_id or task_id,
+        )
+        self.bulk_create([lineage], ignore_conflicts=True)
+
+    def prune(self, before: datetime) -> int:
+        """
+        Deletes the lineage of tasks published before *before*.
+
+        Parameters
+        ----------
+        before : datetime
+            Oldest publication time kept
+
+        Returns
+        -------
+        int
+            Number of deleted records
+        """
+        deleted, _ = self.filter(created__lt=before).delete()
+        return deleted
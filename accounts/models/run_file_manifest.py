@@ -0,0 +1,82 @@
+"""
+Definition of the :class:`RunFileManifest` class.
+"""
+from pathlib import Path
+from typing import Dict, Iterator
+
+from accounts.models import help_text
+from accounts.models.managers.run_file_manifest import RunFileManifestManager
+from django.db import models
+from django_extensions.db.models import TimeStampedModel
+
+
+class RunFileManifest(TimeStampedModel):
+    """
+    Cached listing of an analysis run's output files, so that exports (and
+    their retries, size estimations and path mutators) do not walk large
+    output directories on every use. The listing is invalidated by changes
+    in the modification time of any of the run's directories, see
+    :meth:`~accounts.models.managers.run_file_manifest.RunFileManifestManager.for_run`.
+    """
+
+    #: Analysis run.
+    run = models.OneToOneField(
+        "django_analyses.Run",
+        on_delete=models.CASCADE,
+        related_name="file_manifest",
+    )
+
+    #: Listed directory.
+    root = models.CharField(
+        max_length=1024, help_text=help_text.RUN_FILE_MANIFEST_ROOT
+    )
+
+    #: Relative path, size and modification time of each file.
+    files = models.JSONField(default=list)
+
+    #: Modification time of each directory by relative path.
+    directories = models.JSONField(default=dict)
+
+    #: Number of files.
+    n_files = models.PositiveIntegerField(default=0)
+
+    #: Total size in bytes.
+    n_bytes = models.BigIntegerField(default=0)
+
+    objects = RunFileManifestManager.as_manager()
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Run file manifest string representation
+        """
+        return f"{self.root} ({self.n_files} files)"
+
+    def get_paths(self) -> Iterator[Path]:
+        """
+        Yields the absolute paths of the listed files.
+
+        Yields
+        ------
+        Path
+            File path
+        """
+        root = Path(self.root)
+        for relative, _, _ in self.files:
+            yield root / relative
+
+    def get_sizes(self) -> Dict[str, int]:
+        """
+        Returns the sizes of the listed files.
+
+        Returns
+        -------
+        Dict[str, int]
+            File sizes in bytes by absolute path
+        """
+        root = Path(self.root)
+        return {str(root / relative): size for relative, size, _ in self.files}
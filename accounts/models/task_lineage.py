@@ -0,0 +1,54 @@
+"""
+Definition of the :class:`TaskLineage` class.
+"""
+from accounts.models import help_text
+from accounts.models.managers.task_lineage import TaskLineageManager
+from django.db import models
+
+
+class TaskLineage(models.Model):
+    """
+    The position of a Celery task within the task tree it was spawned in,
+    recorded when the task is published and when it starts (see
+    :mod:`accounts.signals`), so that task results may be filtered and
+    ordered by their parent or root task through indexed lookups.
+    """
+
+    #: Celery task ID.
+    task_id = models.CharField(max_length=255, unique=True)
+
+    #: Celery task name.
+    task_name = models.CharField(max_length=255, blank=True, default="")
+
+    #: ID of the task this task was published by.
+    parent_id = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        db_index=True,
+        help_text=help_text.TASK_LINEAGE_PARENT,
+    )
+
+    #: ID of the first task in this task's tree.
+    root_id = models.CharField(
+        max_length=255, db_index=True, help_text=help_text.TASK_LINEAGE_ROOT
+    )
+
+    #: Publication time.
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = TaskLineageManager.as_manager()
+
+    class Meta:
+        verbose_name_plural = "Task lineage"
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Task lineage string representation
+        """
+        return f"{self.parent_id} -> {self.task_id}"
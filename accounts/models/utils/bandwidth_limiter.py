@@ -0,0 +1,101 @@
+"""
+Definition of the :class:`BandwidthLimiter` class.
+"""
+import threading
+import time
+
+
+class BandwidthLimiter:
+    """
+    Thread-safe token bucket throttling file transfers to a given rate.
+    """
+
+    def __init__(self, rate: float = None, burst: float = None):
+        """
+        Parameters
+        ----------
+        rate : float, optional
+            Maximal rate in bytes per second, None or 0 for unlimited
+        burst : float, optional
+            Bucket capacity in bytes, defaults to one second worth of *rate*
+        """
+        self._rate = rate
+        self._burst = burst
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """
+        Returns the maximal rate in bytes per second.
+
+        Returns
+        -------
+        float
+            Maximal rate, None or 0 for unlimited
+        """
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: float) -> None:
+        with self._lock:
+            self._rate = value
+            self._tokens = min(self._tokens, self.burst)
+
+    @property
+    def burst(self) -> float:
+        """
+        Returns the bucket capacity in bytes.
+
+        Returns
+        -------
+        float
+            Bucket capacity
+        """
+        if self._burst is not None:
+            return self._burst
+        return self._rate or 0
+
+    def consume(self, n_bytes: int) -> None:
+        """
+        Blocks until *n_bytes* may be transferred without exceeding
+        :attr:`rate`.
+
+        Parameters
+        ----------
+        n_bytes : int
+            Number of bytes about to be (or just) transferred
+        """
+        with self._lock:
+            if not self._rate:
+                return
+            now = time.monotonic()
+            elapsed = now - self._last
+            self._last = now
+            self._tokens = min(self.burst, self._tokens + elapsed * self._rate)
+            self._tokens -= n_bytes
+            delay = -self._tokens / self._rate if self._tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+class ThrottledWriter:
+    """
+    Write-only file object wrapper throttling writes with a
+    :class:`BandwidthLimiter`.
+    """
+
+    def __init__(self, fileobj, limiter: BandwidthLimiter):
+        self.fileobj = fileobj
+        self.limiter = limiter
+
+    def write(self, data: bytes) -> int:
+        self.limiter.consume(len(data))
+        return self.fileobj.write(data)
+
+    def flush(self) -> None:
+        self.fileobj.flush()
+
+    def close(self) -> None:
+        self.fileobj.close()
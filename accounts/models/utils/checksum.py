@@ -0,0 +1,116 @@
+"""
+Utilities used to verify exported files' integrity without re-reading them.
+"""
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable
+
+#: Hash algorithm used for export verification.
+CHECKSUM_ALGORITHM: str = "sha256"
+#: Host command computing :data:`CHECKSUM_ALGORITHM` digests.
+REMOTE_CHECKSUM_COMMAND: str = "sha256sum --"
+#: Name of the checksum file written to the export root.
+CHECKSUM_FILE_NAME: str = "SHA256SUMS"
+#: Maximal number of paths hashed per remote command.
+REMOTE_CHECKSUM_BATCH_SIZE: int = 100
+
+
+class HashingReader:
+    """
+    Read-only file object wrapper hashing the data as it is read, so that the
+    read pass feeding an upload also computes the file's checksum.
+    """
+
+    def __init__(self, fileobj, algorithm: str = CHECKSUM_ALGORITHM):
+        self.fileobj = fileobj
+        self.hash = hashlib.new(algorithm)
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        self.hash.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        """
+        Returns the digest of the data read so far.
+
+        Returns
+        -------
+        str
+            Hexadecimal digest
+        """
+        return self.hash.hexdigest()
+
+
+def parse_checksum_output(output: str) -> Dict[Path, str]:
+    """
+    Parses the output of *sha256sum* (or a checksum file).
+
+    Parameters
+    ----------
+    output : str
+        Lines of the form "<digest>  <path>"
+
+    Returns
+    -------
+    Dict[Path, str]
+        Digests by path
+    """
+    checksums = {}
+    for line in output.splitlines():
+        # Escaped file names are prefixed with a backslash.
+        line = line.lstrip("\\")
+        digest, _, path = line.partition(" ")
+        if digest and path:
+            checksums[Path(path.lstrip(" *"))] = digest
+    return checksums
+
+
+def format_checksum_file(checksums: Dict[Path, str], root: Path) -> str:
+    """
+    Formats *checksums* as a checksum file with paths relative to *root*,
+    verifiable with ``sha256sum -c`` from within *root*.
+
+    Parameters
+    ----------
+    checksums : Dict[Path, str]
+        Digests by absolute path
+    root : Path
+        Checksum file directory
+
+    Returns
+    -------
+    str
+        Checksum file content
+    """
+    lines = [
+        f"{digest}  {Path(path).relative_to(root)}\n"
+        for path, digest in sorted(checksums.items())
+    ]
+    return "".join(lines)
+
+
+def batches(items: Iterable, size: int) -> Iterable[list]:
+    """
+    Yields consecutive lists of at most *size* items.
+
+    Parameters
+    ----------
+    items : Iterable
+        Items to split
+    size : int
+        Batch size
+
+    Yields
+    ------
+    list
+        Batch of items
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,127 @@
+"""
+Circuit breaker settings and logic, used to hold back export tasks to
+destinations reported down by the periodic health prober (see
+:func:`~accounts.tasks.probe_export_destinations`), so that they wait for the
+destination to recover rather than use up their retries.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+#
+# Django settings keys.
+#
+#: Setting key for the number of seconds between health probes.
+HEALTH_INTERVAL_SETTING: str = "EXPORT_HEALTH_INTERVAL"
+#: Setting key for the number of consecutive failed probes opening the
+#: circuit.
+FAILURE_THRESHOLD_SETTING: str = "EXPORT_CIRCUIT_FAILURE_THRESHOLD"
+#: Setting key for the number of threads probing destinations.
+HEALTH_WORKERS_SETTING: str = "EXPORT_HEALTH_WORKERS"
+
+#: Default number of seconds between health probes.
+DEFAULT_HEALTH_INTERVAL: int = 60
+#: Default number of consecutive failed probes opening the circuit.
+DEFAULT_FAILURE_THRESHOLD: int = 3
+#: Default number of threads probing destinations.
+DEFAULT_HEALTH_WORKERS: int = 8
+#: Number of probe intervals after which a health record is considered stale.
+#: Stale records never open the circuit, so that exports are not held back
+#: when the prober is not running.
+STALE_INTERVALS: int = 3
+
+
+class DestinationUnavailable(RuntimeError):
+    """
+    Raised when an export destination's circuit is open.
+    """
+
+
+def get_health_interval() -> int:
+    """
+    Returns the configured number of seconds between health probes.
+
+    Returns
+    -------
+    int
+        Probe interval in seconds
+    """
+    return getattr(settings, HEALTH_INTERVAL_SETTING, DEFAULT_HEALTH_INTERVAL)
+
+
+def get_failure_threshold() -> int:
+    """
+    Returns the configured number of consecutive failed probes opening the
+    circuit.
+
+    Returns
+    -------
+    int
+        Failure threshold
+    """
+    return getattr(
+        settings, FAILURE_THRESHOLD_SETTING, DEFAULT_FAILURE_THRESHOLD
+    )
+
+
+def get_health_workers() -> int:
+    """
+    Returns the configured number of threads probing destinations.
+
+    Returns
+    -------
+    int
+        Number of threads
+    """
+    return getattr(settings, HEALTH_WORKERS_SETTING, DEFAULT_HEALTH_WORKERS)
+
+
+def is_stale(last_checked: datetime, now: datetime = None) -> bool:
+    """
+    Whether a health record checked at *last_checked* is too old to rely on.
+
+    Parameters
+    ----------
+    last_checked : datetime
+        Time of the last probe
+    now : datetime, optional
+        Current time
+
+    Returns
+    -------
+    bool
+        True if the record is stale
+    """
+    if last_checked is None:
+        return True
+    now = now or timezone.now()
+    max_age = timedelta(seconds=get_health_interval() * STALE_INTERVALS)
+    return now - last_checked > max_age
+
+
+def is_circuit_open(
+    consecutive_failures: int, last_checked: datetime, now: datetime = None
+) -> bool:
+    """
+    Whether export tasks to a destination should be held back. The circuit
+    opens once the configured number of consecutive probes failed, and
+    closes with the first successful probe (or once the record goes stale).
+
+    Parameters
+    ----------
+    consecutive_failures : int
+        Number of consecutive failed probes
+    last_checked : datetime
+        Time of the last probe
+    now : datetime, optional
+        Current time
+
+    Returns
+    -------
+    bool
+        True if the circuit is open
+    """
+    if consecutive_failures < get_failure_threshold():
+        return False
+    return not is_stale(last_checked, now=now)
@@ -0,0 +1,259 @@
+"""
+Utilities used to gzip-compress exported files on the fly, in parallel with
+their transfer.
+"""
+import gzip
+import multiprocessing
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Union
+
+from django.conf import settings
+
+#
+# Django settings keys.
+#
+#: Setting key for the number of compression worker processes.
+COMPRESSION_WORKERS_SETTING: str = "EXPORT_COMPRESSION_WORKERS"
+
+#
+# Default compression settings.
+#
+#: Default number of compression worker processes.
+DEFAULT_COMPRESSION_WORKERS: int = 2
+#: Default gzip compression level (favoring throughput over ratio).
+DEFAULT_COMPRESSION_LEVEL: int = 6
+#: Size of the blocks compressed independently (bytes).
+DEFAULT_BLOCK_SIZE: int = 4 * 1024 * 1024
+#: Suffixes of files compressed when exporting with compression enabled.
+COMPRESSIBLE_SUFFIXES = (".nii",)
+#: Suffix appended to the destination of compressed files.
+COMPRESSED_SUFFIX: str = ".gz"
+
+
+def is_compressible(path: Union[Path, str]) -> bool:
+    """
+    Returns whether *path* should be compressed on export.
+
+    Parameters
+    ----------
+    path : Union[Path, str]
+        Local file path
+
+    Returns
+    -------
+    bool
+        Whether *path* has one of the :data:`COMPRESSIBLE_SUFFIXES`
+    """
+    return Path(path).suffix.lower() in COMPRESSIBLE_SUFFIXES
+
+
+def get_compressed_destination(
+    source: Union[Path, str], destination: Path
+) -> Path:
+    """
+    Returns the destination of *source* in the host if it is compressed on
+    export, i.e. *destination* with :data:`COMPRESSED_SUFFIX` appended for
+    compressible sources (e.g. *.nii* to *.nii.gz*).
+
+    Parameters
+    ----------
+    source : Union[Path, str]
+        Local file path
+    destination : Path
+        Absolute destination in the host
+
+    Returns
+    -------
+    Path
+        Destination of the exported file
+    """
+    destination = Path(destination)
+    if not is_compressible(source) or destination.name.endswith(
+        COMPRESSED_SUFFIX
+    ):
+        return destination
+    return destination.with_name(destination.name + COMPRESSED_SUFFIX)
+
+
+def get_compressed_destinations(
+    export_destination,
+    sources: Iterable[Union[Path, str]],
+    destinations: Iterable[Union[Path, str]] = None,
+) -> List[str]:
+    """
+    Returns the absolute destinations of *sources* in the host when exported
+    with compression, see :func:`get_compressed_destination`.
+
+    Parameters
+    ----------
+    export_destination : ExportDestination
+        Export destination
+    sources : Iterable[Union[Path, str]]
+        Local file paths
+    destinations : Iterable[Union[Path, str]], optional
+        Destinations in the host, see
+        :meth:`~accounts.models.export_destination.ExportDestination.resolve_destination`
+
+    Returns
+    -------
+    List[str]
+        Absolute destinations in the host
+    """
+    sources = list(sources)
+    destinations = destinations or [None] * len(sources)
+    return [
+        str(
+            get_compressed_destination(
+                source,
+                export_destination.resolve_destination(source, destination),
+            )
+        )
+        for source, destination in zip(sources, destinations)
+    ]
+
+
+def compress_block(
+    data: bytes, level: int = DEFAULT_COMPRESSION_LEVEL
+) -> bytes:
+    """
+    Compresses *data* as a standalone gzip member.
+
+    Parameters
+    ----------
+    data : bytes
+        Uncompressed data
+    level : int, optional
+        Compression level
+
+    Returns
+    -------
+    bytes
+        Gzip member
+    """
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def get_compression_workers() -> int:
+    """
+    Returns the configured number of compression workers.
+
+    Returns
+    -------
+    int
+        Number of compression workers
+    """
+    return getattr(
+        settings, COMPRESSION_WORKERS_SETTING, DEFAULT_COMPRESSION_WORKERS
+    )
+
+
+@contextmanager
+def compression_executor(workers: int = None) -> Iterator[Executor]:
+    """
+    Returns a pool of compression workers. Daemonic processes (which may not
+    have children) fall back to threads, which still compress in parallel as
+    zlib releases the GIL.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of workers, see :func:`get_compression_workers`
+
+    Yields
+    ------
+    Executor
+        Compression worker pool
+    """
+    workers = workers or get_compression_workers()
+    if multiprocessing.current_process().daemon:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    with executor:
+        yield executor
+
+
+class CompressingReader:
+    """
+    Read-only file object wrapper returning the gzip-compressed content of
+    the wrapped file. The file is split into blocks that are compressed
+    independently by an executor, a bounded number of blocks ahead of the
+    consumer, so that compression overlaps with the transfer of previous
+    blocks while memory usage stays bounded. The result is a valid
+    multi-member gzip stream.
+    """
+
+    def __init__(
+        self,
+        fileobj,
+        executor: Executor,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_pending: int = None,
+        level: int = DEFAULT_COMPRESSION_LEVEL,
+    ):
+        """
+        Parameters
+        ----------
+        fileobj
+            Binary file object to compress
+        executor : Executor
+            Compression worker pool, see :func:`compression_executor`
+        block_size : int, optional
+            Size of the blocks compressed independently (bytes)
+        max_pending : int, optional
+            Maximal number of blocks read ahead, defaults to twice the number
+            of executor workers
+        level : int, optional
+            Compression level
+        """
+        self.fileobj = fileobj
+        self.executor = executor
+        self.block_size = block_size
+        self.max_pending = max_pending or 2 * getattr(
+            executor, "_max_workers", 1
+        )
+        self.level = level
+        self._blocks = self._compress()
+        self._buffer = bytearray()
+
+    def _compress(self) -> Iterator[bytes]:
+        """
+        Yields the compressed blocks in order.
+
+        Yields
+        ------
+        bytes
+            Gzip member
+        """
+        pending = deque()
+        eof = False
+        while pending or not eof:
+            while not eof and len(pending) < self.max_pending:
+                data = self.fileobj.read(self.block_size)
+                if not data:
+                    eof = True
+                    break
+                pending.append(
+                    self.executor.submit(compress_block, data, self.level)
+                )
+            if pending:
+                yield pending.popleft().result()
+
+    def read(self, size: int = -1) -> bytes:
+        while size is None or size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._blocks)
+            except StopIteration:
+                break
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
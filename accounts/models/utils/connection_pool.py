@@ -0,0 +1,311 @@
+"""
+Definition of the :class:`ConnectionPool` class, used to share SSH transports
+and SFTP clients between
+:class:`~accounts.models.export_destination.ExportDestination` instances
+within a single worker process.
+"""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Set
+
+import paramiko
+from accounts.models import logs
+from django.conf import settings
+
+#
+# Django settings keys.
+#
+#: Setting key for the number of seconds an idle connection is kept alive.
+IDLE_TIMEOUT_SETTING: str = "EXPORT_POOL_IDLE_TIMEOUT"
+#: Setting key for the maximal number of connections per export destination.
+MAX_CONNECTIONS_SETTING: str = "EXPORT_POOL_MAX_CONNECTIONS"
+#: Setting key for the number of seconds to wait for a free connection.
+ACQUIRE_TIMEOUT_SETTING: str = "EXPORT_POOL_ACQUIRE_TIMEOUT"
+
+#
+# Default pool settings.
+#
+#: Default idle connection timeout (seconds).
+DEFAULT_IDLE_TIMEOUT: int = 300
+#: Default maximal number of connections per export destination.
+DEFAULT_MAX_CONNECTIONS: int = 4
+#: Default timeout for acquiring a connection (seconds).
+DEFAULT_ACQUIRE_TIMEOUT: int = 600
+
+
+class PooledConnection:
+    """
+    An SSH transport and its SFTP client, leased out by a
+    :class:`ConnectionPool`.
+    """
+
+    def __init__(self, destination_id: int):
+        #: Export destination primary key.
+        self.destination_id = destination_id
+        #: SSH transport, set by the pool once the lease is granted.
+        self.transport: paramiko.Transport = None
+        #: SFTP client opened over :attr:`transport`.
+        self.sftp_client: paramiko.SFTPClient = None
+        #: Remote directories known to exist.
+        self.directories: Set[Path] = set()
+        #: Whether an SSH session was successfully negotiated.
+        self.connected: bool = False
+        #: Whether the connection is currently leased out.
+        self.in_use: bool = False
+        #: Monotonic time of the last release.
+        self.last_used: float = time.monotonic()
+
+    @property
+    def is_healthy(self) -> bool:
+        """
+        Whether this connection may be handed out again.
+
+        Returns
+        -------
+        bool
+            True if the transport is active and authenticated
+        """
+        return (
+            self.transport is not None
+            and self.transport.active
+            and self.transport.is_authenticated()
+        )
+
+    @property
+    def is_stale(self) -> bool:
+        """
+        Whether this connection was negotiated and has since dropped.
+
+        Returns
+        -------
+        bool
+            True if the connection should be discarded
+        """
+        return self.connected and not self.is_healthy
+
+    def close(self) -> None:
+        """
+        Closes the SFTP client and the underlying transport.
+        """
+        for closable in (self.sftp_client, self.transport):
+            if closable is not None:
+                try:
+                    closable.close()
+                except Exception:
+                    pass
+        self.sftp_client = None
+        self.transport = None
+        self.connected = False
+        self.directories.clear()
+
+
+class ConnectionPool:
+    """
+    Per-process pool of SSH connections keyed by export destination ID.
+    """
+
+    _logger = logging.getLogger("accounts.export_destination")
+
+    def __init__(
+        self,
+        idle_timeout: int = None,
+        max_connections: int = None,
+        acquire_timeout: int = None,
+    ):
+        self._idle_timeout = idle_timeout
+        self._max_connections = max_connections
+        self._acquire_timeout = acquire_timeout
+        self._connections: Dict[int, List[PooledConnection]] = {}
+        self._condition = threading.Condition()
+
+    @property
+    def idle_timeout(self) -> int:
+        """
+        Returns the number of seconds an idle connection is kept alive.
+
+        Returns
+        -------
+        int
+            Idle timeout in seconds
+        """
+        if self._idle_timeout is not None:
+            return self._idle_timeout
+        return getattr(settings, IDLE_TIMEOUT_SETTING, DEFAULT_IDLE_TIMEOUT)
+
+    @property
+    def max_connections(self) -> int:
+        """
+        Returns the maximal number of connections per export destination.
+
+        Returns
+        -------
+        int
+            Maximal number of connections
+        """
+        if self._max_connections is not None:
+            return self._max_connections
+        return getattr(
+            settings, MAX_CONNECTIONS_SETTING, DEFAULT_MAX_CONNECTIONS
+        )
+
+    @property
+    def acquire_timeout(self) -> int:
+        """
+        Returns the number of seconds to wait for a free connection.
+
+        Returns
+        -------
+        int
+            Acquire timeout in seconds
+        """
+        if self._acquire_timeout is not None:
+            return self._acquire_timeout
+        return getattr(
+            settings, ACQUIRE_TIMEOUT_SETTING, DEFAULT_ACQUIRE_TIMEOUT
+        )
+
+    def acquire(self, export_destination) -> PooledConnection:
+        """
+        Leases a connection to *export_destination*. Healthy idle connections
+        are reused, otherwise a new transport is created, as long as
+        :attr:`max_connections` is not exceeded.
+
+        Parameters
+        ----------
+        export_destination : ExportDestination
+            Export destination to connect to
+
+        Returns
+        -------
+        PooledConnection
+            Leased connection
+
+        Raises
+        ------
+        RuntimeError
+            If no connection became available within :attr:`acquire_timeout`
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            while True:
+                self._evict_idle()
+                connections = self._connections.setdefault(
+                    export_destination.id, []
+                )
+                for connection in connections:
+                    if not connection.in_use and connection.is_healthy:
+                        connection.in_use = True
+                        reuse_log = logs.SSH_POOL_REUSE.format(
+                            export_destination=export_destination
+                        )
+                        self._logger.debug(reuse_log)
+                        return connection
+                if len(connections) < self.max_connections:
+                    connection = PooledConnection(export_destination.id)
+                    connection.in_use = True
+                    connections.append(connection)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    exhausted_log = logs.SSH_POOL_EXHAUSTED.format(
+                        export_destination=export_destination,
+                        timeout=self.acquire_timeout,
+                    )
+                    self._logger.warning(exhausted_log)
+                    raise RuntimeError(exhausted_log)
+                self._condition.wait(remaining)
+        # Create the transport outside the lock, socket creation may block.
+        try:
+            connection.transport = export_destination.create_transport()
+        except Exception:
+            self.discard(connection)
+            raise
+        new_log = logs.SSH_POOL_NEW.format(
+            export_destination=export_destination
+        )
+        self._logger.debug(new_log)
+        return connection
+
+    def release(self, connection: PooledConnection) -> None:
+        """
+        Returns a leased connection to the pool. Unhealthy connections are
+        closed and dropped.
+
+        Parameters
+        ----------
+        connection : PooledConnection
+            Leased connection
+        """
+        if not connection.is_healthy:
+            self.discard(connection)
+            return
+        with self._condition:
+            connection.in_use = False
+            connection.last_used = time.monotonic()
+            self._evict_idle()
+            self._condition.notify()
+
+    def discard(self, connection: PooledConnection) -> None:
+        """
+        Closes a connection and removes it from the pool.
+
+        Parameters
+        ----------
+        connection : PooledConnection
+            Connection to discard
+        """
+        connection.close()
+        with self._condition:
+            connections = self._connections.get(connection.destination_id, [])
+            if connection in connections:
+                connections.remove(connection)
+            self._condition.notify()
+
+    def close_all(self) -> None:
+        """
+        Closes all pooled connections.
+        """
+        with self._condition:
+            for connections in self._connections.values():
+                for connection in connections:
+                    connection.close()
+            self._connections = {}
+            self._condition.notify_all()
+
+    def reset(self) -> None:
+        """
+        Forgets all pooled connections without closing them. Used in forked
+        child processes, where the sockets belong to the parent.
+        """
+        self._connections = {}
+        self._condition = threading.Condition()
+
+    def _evict_idle(self) -> None:
+        """
+        Closes connections that have been idle longer than
+        :attr:`idle_timeout` or that are no longer active. Expects the caller
+        to hold the pool's lock.
+        """
+        now = time.monotonic()
+        for destination_id, connections in self._connections.items():
+            for connection in list(connections):
+                if connection.in_use:
+                    continue
+                idle = now - connection.last_used > self.idle_timeout
+                if idle or not connection.is_healthy:
+                    connection.close()
+                    connections.remove(connection)
+                    evict_log = logs.SSH_POOL_EVICT.format(
+                        destination_id=destination_id
+                    )
+                    self._logger.debug(evict_log)
+
+
+#: Worker-wide connection pool.
+CONNECTION_POOL = ConnectionPool()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=CONNECTION_POOL.reset)
@@ -0,0 +1,188 @@
+"""
+Definition of the :class:`DestinationLimiter` class, enforcing
+per-destination concurrency and bandwidth limits across all worker processes.
+"""
+import logging
+import threading
+import time
+
+from accounts.models import logs
+from accounts.models.export_lease import ExportLease
+from accounts.models.utils.bandwidth_limiter import BandwidthLimiter
+from django.conf import settings
+from django.db import connection
+
+#: Setting key for the number of seconds a lease is valid without a refresh.
+LEASE_TTL_SETTING: str = "EXPORT_LEASE_TTL"
+#: Setting key for the number of seconds to wait for a free slot.
+LEASE_WAIT_SETTING: str = "EXPORT_LEASE_WAIT"
+
+#: Default lease time to live (seconds).
+DEFAULT_LEASE_TTL: int = 300
+#: Default time to wait for a free slot (seconds).
+DEFAULT_LEASE_WAIT: int = 30
+#: Number of seconds between slot acquisition attempts.
+POLL_INTERVAL: int = 2
+
+
+class DestinationBusy(RuntimeError):
+    """
+    Raised when no connection slot to an export destination became available
+    in time.
+    """
+
+
+class DestinationLimiter:
+    """
+    Context manager holding an
+    :class:`~accounts.models.export_lease.ExportLease` (a connection slot) to
+    an export destination for the duration of a transfer. While held, the
+    lease is periodically refreshed and the destination's bandwidth limit is
+    divided evenly between all active leases.
+    """
+
+    _logger = logging.getLogger("accounts.export_destination")
+
+    def __init__(
+        self,
+        export_destination,
+        task_id: str,
+        ttl: int = None,
+        wait: int = None,
+    ):
+        """
+        Parameters
+        ----------
+        export_destination : ExportDestination
+            Export destination
+        task_id : str
+            Holding Celery task ID
+        ttl : int, optional
+            Lease time to live in seconds, refreshed every third of it
+        wait : int, optional
+            Number of seconds to wait for a free slot
+        """
+        self.export_destination = export_destination
+        self.task_id = task_id
+        self.ttl = (
+            ttl
+            if ttl is not None
+            else getattr(settings, LEASE_TTL_SETTING, DEFAULT_LEASE_TTL)
+        )
+        self.wait = (
+            wait
+            if wait is not None
+            else getattr(settings, LEASE_WAIT_SETTING, DEFAULT_LEASE_WAIT)
+        )
+        self.lease: ExportLease = None
+        self.bandwidth_limiter = BandwidthLimiter()
+        self._stop = threading.Event()
+        self._heartbeat: threading.Thread = None
+
+    def __enter__(self) -> "DestinationLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    def acquire(self) -> ExportLease:
+        """
+        Acquires a connection slot, waiting up to :attr:`wait` seconds.
+
+        Returns
+        -------
+        ExportLease
+            Acquired lease
+
+        Raises
+        ------
+        DestinationBusy
+            If no slot became available in time
+        """
+        if self.lease is not None:
+            return self.lease
+        deadline = time.monotonic() + self.wait
+        while True:
+            self.lease = ExportLease.objects.acquire(
+                self.export_destination, self.task_id, self.ttl
+            )
+            if self.lease is not None:
+                break
+            if time.monotonic() >= deadline:
+                busy_log = logs.EXPORT_LEASE_BUSY.format(
+                    max_connections=self.export_destination.max_connections,
+                    export_destination=self.export_destination,
+                    task_id=self.task_id,
+                    timeout=self.wait,
+                )
+                self._logger.info(busy_log)
+                raise DestinationBusy(busy_log)
+            time.sleep(POLL_INTERVAL)
+        self.update_rate()
+        self.export_destination.bandwidth_limiter = self.bandwidth_limiter
+        acquired_log = logs.EXPORT_LEASE_ACQUIRED.format(
+            export_destination=self.export_destination,
+            task_id=self.task_id,
+            rate=self.bandwidth_limiter.rate or "unlimited",
+        )
+        self._logger.debug(acquired_log)
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._refresh, daemon=True)
+        self._heartbeat.start()
+        return self.lease
+
+    def release(self) -> None:
+        """
+        Stops refreshing and deletes the held lease.
+        """
+        if self.lease is None:
+            return
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        ExportLease.objects.filter(id=self.lease.id).delete()
+        self.lease = None
+        self.export_destination.bandwidth_limiter = None
+        released_log = logs.EXPORT_LEASE_RELEASED.format(
+            export_destination=self.export_destination, task_id=self.task_id
+        )
+        self._logger.debug(released_log)
+
+    def update_rate(self) -> None:
+        """
+        Sets the transfer rate of this lease to an even share of the
+        destination's current bandwidth limit.
+        """
+        ExportDestination = type(self.export_destination)
+        max_bandwidth = (
+            ExportDestination.objects.filter(id=self.export_destination.id)
+            .values_list("max_bandwidth", flat=True)
+            .first()
+        )
+        if not max_bandwidth:
+            self.bandwidth_limiter.rate = None
+            return
+        n_active = (
+            ExportLease.objects.active()
+            .filter(export_destination_id=self.export_destination.id)
+            .count()
+        )
+        self.bandwidth_limiter.rate = max_bandwidth / max(n_active, 1)
+
+    def _refresh(self) -> None:
+        """
+        Heartbeat loop extending the lease and rebalancing bandwidth until
+        released.
+        """
+        try:
+            interval = max(self.ttl / 3, POLL_INTERVAL)
+            while not self._stop.wait(interval):
+                ExportLease.objects.acquire(
+                    self.export_destination, self.task_id, self.ttl
+                )
+                self.update_rate()
+        finally:
+            # Heartbeat threads own a database connection of their own.
+            connection.close()
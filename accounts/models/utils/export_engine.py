@@ -0,0 +1,477 @@
+"""
+Definition of the :class:`ExportEngine` class, an asyncio-based alternative
+to :meth:`~accounts.models.export_destination.ExportDestination.put`
+multiplexing many concurrent file transfers to any number of export
+destinations from a single process.
+"""
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import paramiko
+from accounts.models import logs
+from accounts.models.choices import ChecksumMode, ExportState
+from accounts.models.utils.compression import (
+    compression_executor,
+    get_compressed_destination,
+)
+from django.conf import settings
+from paramiko import SSHException
+
+if TYPE_CHECKING:
+    from accounts.models.export_destination import ExportDestination
+
+#
+# Django settings keys.
+#
+#: Setting key for the maximal number of bytes in flight.
+MAX_IN_FLIGHT_BYTES_SETTING: str = "EXPORT_ENGINE_MAX_IN_FLIGHT_BYTES"
+#: Setting key for the number of SFTP channels per export destination.
+CHANNELS_SETTING: str = "EXPORT_ENGINE_CHANNELS"
+#: Setting key for the number of threads running blocking SFTP calls.
+THREADS_SETTING: str = "EXPORT_ENGINE_THREADS"
+
+#
+# Default engine settings.
+#
+#: Default maximal number of bytes in flight across all destinations.
+DEFAULT_MAX_IN_FLIGHT_BYTES: int = 256 * 1024 * 1024
+#: Default number of SFTP channels per export destination.
+DEFAULT_CHANNELS: int = 8
+#: Default number of threads running blocking SFTP calls.
+DEFAULT_THREADS: int = 32
+#: Minimal number of bytes reserved per file, bounding the number of
+#: scheduled transfers of small files.
+MIN_RESERVATION: int = 64 * 1024
+
+#: An export job: export destination, local file paths, their destinations
+#: in the host (or None) and a per-file transfer state callback (or None).
+ExportJob = Tuple[
+    "ExportDestination",
+    List[Union[Path, str]],
+    Optional[List[Union[Path, str]]],
+    Optional[Callable],
+]
+
+
+class ByteBudget:
+    """
+    Asyncio weighted semaphore bounding the number of bytes in flight.
+    Reservations larger than the budget are capped, so that large files wait
+    for the budget to drain rather than forever.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Parameters
+        ----------
+        capacity : int
+            Budget in bytes
+        """
+        self.capacity = capacity
+        self.available = capacity
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, n_bytes: int) -> int:
+        """
+        Waits until *n_bytes* (capped by :attr:`capacity`) are available and
+        reserves them.
+
+        Parameters
+        ----------
+        n_bytes : int
+            Requested number of bytes
+
+        Returns
+        -------
+        int
+            Reserved number of bytes, to be passed to :meth:`release`
+        """
+        n_bytes = min(n_bytes, self.capacity)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.available >= n_bytes)
+            self.available -= n_bytes
+        return n_bytes
+
+    async def release(self, n_bytes: int) -> None:
+        """
+        Returns *n_bytes* to the budget.
+
+        Parameters
+        ----------
+        n_bytes : int
+            Reserved number of bytes
+        """
+        async with self._condition:
+            self.available += n_bytes
+            self._condition.notify_all()
+
+
+class ExportEngine:
+    """
+    Exports files to any number of export destinations concurrently from a
+    single event loop. Blocking SFTP calls run in a shared thread pool over
+    multiple channels per destination, and new transfers are only scheduled
+    while the in-flight byte budget allows, so that a single process (e.g. a
+    single Celery task) may push an entire study with bounded memory.
+
+    Examples
+    --------
+    >>> with ExportEngine() as engine:
+    ...     engine.run([(destination, sources, None, None)])
+    """
+
+    _logger = logging.getLogger("accounts.export_destination")
+
+    def __init__(
+        self,
+        max_in_flight_bytes: int = None,
+        channels: int = None,
+        threads: int = None,
+    ):
+        """
+        Parameters
+        ----------
+        max_in_flight_bytes : int, optional
+            Maximal number of bytes scheduled for transfer at once across all
+            destinations
+        channels : int, optional
+            Number of SFTP channels per export destination
+        threads : int, optional
+            Number of threads running blocking SFTP calls
+        """
+        self.max_in_flight_bytes = max_in_flight_bytes or getattr(
+            settings, MAX_IN_FLIGHT_BYTES_SETTING, DEFAULT_MAX_IN_FLIGHT_BYTES
+        )
+        self.channels = channels or getattr(
+            settings, CHANNELS_SETTING, DEFAULT_CHANNELS
+        )
+        self.threads = threads or getattr(
+            settings, THREADS_SETTING, DEFAULT_THREADS
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.threads)
+        self._exit_stack = ExitStack()
+        self._compressor: Executor = None
+        self._budget: ByteBudget = None
+
+    def __enter__(self) -> "ExportEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Shuts down the engine's worker pools.
+        """
+        self._exit_stack.close()
+        self._compressor = None
+        self._executor.shutdown(wait=True)
+
+    @property
+    def budget(self) -> ByteBudget:
+        """
+        Returns the in-flight byte budget shared by all transfers.
+
+        Returns
+        -------
+        ByteBudget
+            In-flight byte budget
+        """
+        if self._budget is None:
+            self._budget = ByteBudget(self.max_in_flight_bytes)
+        return self._budget
+
+    @property
+    def compressor(self) -> Executor:
+        """
+        Returns the compression worker pool shared by all transfers, see
+        :func:`~accounts.models.utils.compression.compression_executor`.
+
+        Returns
+        -------
+        Executor
+            Compression worker pool
+        """
+        if self._compressor is None:
+            self._compressor = self._exit_stack.enter_context(
+                compression_executor()
+            )
+        return self._compressor
+
+    async def _call(self, function: Callable, *args, **kwargs):
+        """
+        Runs a blocking call in the engine's thread pool.
+
+        Parameters
+        ----------
+        function : Callable
+            Blocking function
+
+        Returns
+        -------
+        Any
+            Function result
+        """
+        loop = asyncio.get_event_loop()
+        call = functools.partial(function, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def _open_channels(
+        self, export_destination
+    ) -> List[paramiko.SFTPClient]:
+        """
+        Opens up to :attr:`channels` SFTP channels to *export_destination*,
+        the first being its pooled SFTP client.
+
+        Parameters
+        ----------
+        export_destination : ExportDestination
+            Export destination
+
+        Returns
+        -------
+        List[paramiko.SFTPClient]
+            SFTP channels
+        """
+        channels = [
+            await self._call(lambda: export_destination.sftp_client)
+        ]
+        for _ in range(self.channels - 1):
+            try:
+                sftp_client = await self._call(
+                    export_destination.start_sftp_client
+                )
+            except Exception as e:
+                # Continue with the channels opened so far.
+                channel_log = logs.SFTP_PUT_CHANNELS_LIMITED.format(
+                    export_destination=export_destination,
+                    n=len(channels),
+                    exception=e,
+                )
+                self._logger.info(channel_log)
+                break
+            channels.append(sftp_client)
+        return channels
+
+    async def put(
+        self,
+        export_destination,
+        sources: Iterable[Union[Path, str]],
+        destinations: Iterable[Union[Path, str]] = None,
+        callback: Callable = None,
+        exist_ok: bool = True,
+        force: bool = False,
+        skip_same_size: bool = False,
+        verify: str = None,
+        compress: bool = False,
+    ) -> None:
+        """
+        Copies *sources* to *export_destination*, see
+        :meth:`~accounts.models.export_destination.ExportDestination.put`.
+        Each file reserves its size (at least :data:`MIN_RESERVATION` bytes)
+        from the in-flight byte budget before its transfer is scheduled, and
+        returns it once transferred.
+
+        Parameters
+        ----------
+        export_destination : ExportDestination
+            Export destination
+        sources : Iterable[Union[Path, str]]
+            Local files to copy
+        destinations : Iterable[Union[Path, str]], optional
+            Destinations in the host file system
+        callback : Callable, optional
+            Per-file transfer state callback
+        exist_ok : bool, optional
+            Whether to forgive trying to put an existing file, default is True
+        force : bool, optional
+            Whether to override the file if it already exists in the host,
+            default is False
+        skip_same_size : bool, optional
+            Whether to skip existing files of the same size even if *force* is
+            True, default is False
+        verify : str, optional
+            :class:`~accounts.models.choices.ChecksumMode` name
+        compress : bool, optional
+            Whether to gzip-compress compressible files while they are
+            uploaded, default is False
+
+        Raises
+        ------
+        OSError
+            The first transfer error encountered, raised once all other files
+            have been processed
+        """
+        host = export_destination
+        sources = list(sources)
+        destinations = (
+            list(destinations) if destinations else [None] * len(sources)
+        )
+        destinations = [
+            host.resolve_destination(source, destination)
+            for source, destination in zip(sources, destinations)
+        ]
+        if compress:
+            destinations = [
+                get_compressed_destination(source, destination)
+                for source, destination in zip(sources, destinations)
+            ]
+        remote_files = await self._call(host.list_remote_files, destinations)
+        await self._call(host.make_parents, destinations)
+        opened = await self._open_channels(host)
+        channels = asyncio.Queue()
+        for sftp_client in opened:
+            channels.put_nowait(sftp_client)
+        compressor = self.compressor if compress else None
+        # When verifying, completed transfers are only reported once their
+        # checksums have been compared.
+        checksums, transferred = ({}, []) if verify else (None, None)
+        errors, scheduled = [], set()
+
+        def report(path: str, dest: Path, state: ExportState) -> None:
+            if transferred is not None and state is ExportState.DONE:
+                transferred.append((path, dest))
+            elif callback is not None:
+                callback(path, dest, state)
+
+        async def transfer(source, destination, reserved: int) -> None:
+            sftp_client = await channels.get()
+            try:
+                await self._call(
+                    host._put_file,
+                    source,
+                    destination,
+                    exist_ok=exist_ok,
+                    force=force,
+                    skip_same_size=skip_same_size,
+                    sftp_client=sftp_client,
+                    remote_files=remote_files,
+                    callback=report,
+                    checksums=checksums,
+                    compressor=compressor,
+                )
+            except (OSError, SSHException) as e:
+                # Failures are logged per file by _put(), keep going.
+                errors.append(e)
+            finally:
+                channels.put_nowait(sftp_client)
+                await self.budget.release(reserved)
+
+        try:
+            for source, destination in zip(sources, destinations):
+                try:
+                    size = os.stat(source).st_size
+                except OSError:
+                    size = 0
+                # Backpressure: wait for the budget before scheduling.
+                reserved = await self.budget.acquire(
+                    max(size, MIN_RESERVATION)
+                )
+                task = asyncio.ensure_future(
+                    transfer(source, destination, reserved)
+                )
+                scheduled.add(task)
+                task.add_done_callback(scheduled.discard)
+            if scheduled:
+                await asyncio.gather(*scheduled)
+        except (OSError, SSHException):
+            if verify:
+                await self._call(
+                    host.verify_checksums_after_failure,
+                    checksums,
+                    transferred,
+                    verify,
+                    callback=callback,
+                )
+            raise
+        finally:
+            # Close the additional channels, the first one stays pooled.
+            for sftp_client in opened[1:]:
+                sftp_client.close()
+        if verify and errors:
+            await self._call(
+                host.verify_checksums_after_failure,
+                checksums,
+                transferred,
+                verify,
+                callback=callback,
+            )
+        elif verify:
+            await self._call(
+                host.verify_checksums,
+                checksums,
+                transferred,
+                mode=ChecksumMode[verify.upper()],
+                callback=callback,
+            )
+        if errors:
+            summary_log = logs.SFTP_PUT_PARALLEL_FAILURES.format(
+                export_destination=host, n_failed=len(errors), n=len(sources)
+            )
+            self._logger.warning(summary_log)
+            raise errors[0]
+
+    async def export(self, jobs: Iterable[ExportJob], **kwargs) -> None:
+        """
+        Runs all *jobs* concurrently, see :meth:`put`.
+
+        Parameters
+        ----------
+        jobs : Iterable[ExportJob]
+            Export jobs
+        **kwargs
+            Keyword arguments passed to :meth:`put` for every job
+
+        Raises
+        ------
+        OSError
+            The first job error encountered, raised once all jobs are done
+        """
+        results = await asyncio.gather(
+            *[
+                self.put(
+                    host,
+                    sources,
+                    destinations=destinations,
+                    callback=callback,
+                    **kwargs,
+                )
+                for host, sources, destinations, callback in jobs
+            ],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def run(self, jobs: Iterable[ExportJob], **kwargs) -> None:
+        """
+        Runs all *jobs* in a new event loop, see :meth:`export`.
+
+        Parameters
+        ----------
+        jobs : Iterable[ExportJob]
+            Export jobs
+        **kwargs
+            Keyword arguments passed to :meth:`put` for every job
+        """
+        # The budget's condition belongs to the event loop it was created in.
+        self._budget = None
+        try:
+            asyncio.run(self.export(jobs, **kwargs))
+        finally:
+            self._budget = None
@@ -0,0 +1,82 @@
+"""
+Utilities used to estimate the duration of export jobs without transferring
+any files (dry runs).
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from accounts.models.utils.export_plan import ExportItem
+
+
+def estimate_duration(
+    n_files: int,
+    n_bytes: int,
+    throughput: Optional[float],
+    latency: Optional[float] = None,
+    n_parallel: int = 1,
+) -> Optional[float]:
+    """
+    Estimates the duration of transferring *n_files* files totalling
+    *n_bytes* bytes. Per-file latency is assumed to overlap between the
+    *n_parallel* work units, whereas throughput is assumed to be shared by
+    them (i.e. bound by the link).
+
+    Parameters
+    ----------
+    n_files : int
+        Number of files
+    n_bytes : int
+        Number of bytes
+    throughput : Optional[float]
+        Throughput in bytes per second
+    latency : Optional[float], optional
+        Per-file latency in seconds
+    n_parallel : int, optional
+        Number of concurrent work units
+
+    Returns
+    -------
+    Optional[float]
+        Estimated duration in seconds, or None if *throughput* is unknown
+    """
+    if not n_bytes and not n_files:
+        return 0.0
+    if not throughput:
+        return None
+    duration = n_bytes / throughput
+    if latency:
+        duration += n_files * latency / max(n_parallel, 1)
+    return duration
+
+
+def split_existing(
+    items: Iterable[ExportItem],
+    destinations: Iterable[str],
+    remote_files: Dict[Path, Tuple[int, int]],
+) -> Tuple[List[ExportItem], List[ExportItem]]:
+    """
+    Splits *items* into the ones already existing in the host (and therefore
+    skipped by default) and the ones pending transfer.
+
+    Parameters
+    ----------
+    items : Iterable[ExportItem]
+        Export items
+    destinations : Iterable[str]
+        Absolute destinations of *items* in the host
+    remote_files : Dict[Path, Tuple[int, int]]
+        Existing destinations, see
+        :meth:`~accounts.models.export_destination.ExportDestination.list_remote_files`
+
+    Returns
+    -------
+    Tuple[List[ExportItem], List[ExportItem]]
+        Existing and pending export items
+    """
+    existing, pending = [], []
+    for item, destination in zip(items, destinations):
+        if Path(destination) in remote_files:
+            existing.append(item)
+        else:
+            pending.append(item)
+    return existing, pending
@@ -0,0 +1,172 @@
+"""
+Utilities used to split export jobs into work units of roughly equal size.
+"""
+import hashlib
+import heapq
+import json
+import math
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+#: A planned file transfer: source, destination (or None) and size in bytes.
+ExportItem = Tuple[str, Optional[str], int]
+
+#: Fixed per-file cost (in bytes) added to file sizes when balancing work
+#: units, accounting for the per-file round trips of SFTP transfers.
+PER_FILE_OVERHEAD: int = 64 * 1024
+
+
+def get_weight(items: Iterable[ExportItem]) -> int:
+    """
+    Returns the balancing weight of *items*.
+
+    Parameters
+    ----------
+    items : Iterable[ExportItem]
+        Export items
+
+    Returns
+    -------
+    int
+        Total size in bytes plus :data:`PER_FILE_OVERHEAD` per file
+    """
+    return sum(size + PER_FILE_OVERHEAD for _, _, size in items)
+
+
+def get_export_items(
+    files: Iterable[Tuple[str, Optional[str]]],
+    sizes: Dict[str, int] = None,
+) -> List[ExportItem]:
+    """
+    Returns export items for the given source and destination pairs, dropping
+    duplicates and missing files.
+
+    Parameters
+    ----------
+    files : Iterable[Tuple[str, Optional[str]]]
+        Local file paths and their destinations in the host (or None)
+    sizes : Dict[str, int], optional
+        Known file sizes by local file path, used instead of querying the file
+        system
+
+    Returns
+    -------
+    List[ExportItem]
+        Export items
+    """
+    sizes = sizes or {}
+    items, seen = [], set()
+    for source, destination in files:
+        if (source, destination) in seen:
+            continue
+        seen.add((source, destination))
+        size = sizes.get(source)
+        if size is None:
+            try:
+                size = os.stat(source).st_size
+            except FileNotFoundError:
+                continue
+        items.append((source, destination, size))
+    return items
+
+
+def split_by_directory(
+    items: List[ExportItem], max_weight: float
+) -> List[List[ExportItem]]:
+    """
+    Groups *items* by source directory, splitting groups heavier than
+    *max_weight* (see :func:`get_weight`) into consecutive pieces. Keeping the
+    files of a directory together preserves the locality of remote directory
+    creation and listing.
+
+    Parameters
+    ----------
+    items : List[ExportItem]
+        Export items
+    max_weight : float
+        Maximal group weight
+
+    Returns
+    -------
+    List[List[ExportItem]]
+        Export item groups
+    """
+    by_directory = defaultdict(list)
+    for item in items:
+        by_directory[str(Path(item[0]).parent)].append(item)
+    groups = []
+    for directory in sorted(by_directory):
+        group, group_weight = [], 0
+        for item in sorted(by_directory[directory]):
+            weight = get_weight([item])
+            if group and group_weight + weight > max_weight:
+                groups.append(group)
+                group, group_weight = [], 0
+            group.append(item)
+            group_weight += weight
+        groups.append(group)
+    return groups
+
+
+def pack_by_size(
+    items: List[ExportItem], n_chunks: int
+) -> List[List[ExportItem]]:
+    """
+    Bin-packs *items* into at most *n_chunks* work units of roughly equal
+    weight (see :func:`get_weight`), assigning the heaviest directory groups
+    first to the currently lightest work unit.
+
+    Parameters
+    ----------
+    items : List[ExportItem]
+        Export items
+    n_chunks : int
+        Number of work units
+
+    Returns
+    -------
+    List[List[ExportItem]]
+        Non-empty work units
+    """
+    if not items:
+        return []
+    n_chunks = max(1, min(n_chunks, len(items)))
+    max_weight = math.ceil(get_weight(items) / n_chunks)
+    groups = split_by_directory(items, max_weight)
+    groups.sort(key=get_weight, reverse=True)
+    chunks = [[] for _ in range(n_chunks)]
+    # Heap of (total weight, chunk index).
+    heap = [(0, index) for index in range(n_chunks)]
+    for group in groups:
+        weight, index = heapq.heappop(heap)
+        chunks[index].extend(group)
+        heapq.heappush(heap, (weight + get_weight(group), index))
+    return [chunk for chunk in chunks if chunk]
+
+
+def get_idempotency_key(
+    export_destination_id: int, items: List[ExportItem], file_format: str
+) -> str:
+    """
+    Returns a key identifying an export request by its content.
+
+    Parameters
+    ----------
+    export_destination_id : int
+        Export destination ID
+    items : List[ExportItem]
+        Resolved export items
+    file_format : str
+        Requested file format(s)
+
+    Returns
+    -------
+    str
+        SHA-256 hex digest
+    """
+    items = sorted(items, key=lambda item: (item[0], item[1] or "", item[2]))
+    content = [export_destination_id, str(file_format), items]
+    digest = hashlib.sha256(json.dumps(content).encode())
+    return digest.hexdigest()
@@ -0,0 +1,537 @@
+"""
+Definition of the :class:`FanOutExporter` class, exporting the same files to
+multiple export destinations while reading each of them from local storage
+only once.
+"""
+import hashlib
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import paramiko
+from accounts.models import logs
+from accounts.models.choices import ChecksumMode, ExportState
+from accounts.models.utils.checksum import CHECKSUM_ALGORITHM
+from django.conf import settings
+from paramiko import SSHException
+
+if TYPE_CHECKING:
+    from accounts.models.export_destination import ExportDestination
+
+#
+# Django settings keys.
+#
+#: Setting key for the number of bytes read per chunk.
+CHUNK_SIZE_SETTING: str = "EXPORT_FAN_OUT_CHUNK_SIZE"
+#: Setting key for the number of chunks buffered per export destination.
+MAX_LAG_SETTING: str = "EXPORT_FAN_OUT_MAX_LAG"
+#: Setting key for the number of seconds a destination may hold back the
+#: others before it is detached.
+LAG_TIMEOUT_SETTING: str = "EXPORT_FAN_OUT_LAG_TIMEOUT"
+
+#
+# Default fan-out settings.
+#
+#: Default number of bytes read per chunk.
+DEFAULT_CHUNK_SIZE: int = 1024 * 1024
+#: Default number of chunks buffered per export destination, i.e. how far
+#: the fastest destination may run ahead of the slowest one.
+DEFAULT_MAX_LAG: int = 32
+#: Default number of seconds a destination may hold back the others before
+#: it is detached.
+DEFAULT_LAG_TIMEOUT: int = 30
+#: Seconds between checks of a full lane.
+POLL_INTERVAL: float = 0.1
+
+#: A fan-out job: export destination, local file paths, their absolute
+#: destinations in the host and a per-file transfer state callback (or
+#: None).
+FanOutJob = Tuple[
+    "ExportDestination",
+    List[Union[Path, str]],
+    List[Union[Path, str]],
+    Optional[Callable],
+]
+
+
+class FanOutLane:
+    """
+    Writes the chunks read by a :class:`FanOutExporter` to a single export
+    destination from a dedicated thread, buffering up to *max_lag* chunks.
+    Files already existing in the host are skipped. A lane stops receiving
+    data once it fails or is detached, leaving its remaining files pending.
+    """
+
+    _logger = logging.getLogger("accounts.export_destination")
+
+    def __init__(
+        self,
+        export_destination,
+        sources: List[Union[Path, str]],
+        destinations: List[Union[Path, str]],
+        callback: Callable = None,
+        max_lag: int = DEFAULT_MAX_LAG,
+    ):
+        """
+        Parameters
+        ----------
+        export_destination : ExportDestination
+            Export destination
+        sources : List[Union[Path, str]]
+            Local file paths
+        destinations : List[Union[Path, str]]
+            Absolute destinations in the host
+        callback : Callable, optional
+            Per-file transfer state callback, see
+            :meth:`~accounts.models.export_destination.ExportDestination.put`
+        max_lag : int, optional
+            Number of buffered chunks
+        """
+        self.export_destination = export_destination
+        self.callback = callback
+        #: Destinations of the files still to be transferred, by source.
+        self.pending: Dict[str, Path] = {
+            str(source): Path(destination)
+            for source, destination in zip(sources, destinations)
+        }
+        #: Chunks read for this lane and not written yet.
+        self.queue = queue.Queue(maxsize=max_lag)
+        #: Set once existing files were skipped and directories created.
+        self.ready = threading.Event()
+        #: Whether the lane was detached for holding back the others.
+        self.detached: bool = False
+        #: Exception the lane failed with, if any.
+        self.error: Exception = None
+        #: Seconds this lane held back the others.
+        self.stalled: float = 0.0
+        #: Pending sources the exporter did not read yet.
+        self.unread: set = set()
+        #: Digests of transferred files by destination.
+        self.checksums: Dict[Path, str] = {}
+        #: Transferred files awaiting verification.
+        self.transferred: List[Tuple[str, Path]] = []
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._sftp_client: paramiko.SFTPClient = None
+        self._remote = None
+        self._current: Tuple[str, Path, float] = None
+        self._written: int = 0
+        self._throttle: Callable = None
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def join(self) -> None:
+        self._thread.join()
+
+    @property
+    def is_active(self) -> bool:
+        """
+        Whether this lane still receives data.
+
+        Returns
+        -------
+        bool
+            True if neither failed nor detached
+        """
+        return not self.detached and self.error is None
+
+    def report(self, source: str, destination: Path, state: ExportState):
+        if self.callback is not None:
+            self.callback(source, destination, state)
+
+    def prepare(self) -> None:
+        """
+        Skips pending files that already exist in the host and creates the
+        remaining files' parent directories.
+        """
+        host = self.export_destination
+        self._sftp_client = host.sftp_client
+        remote_files = host.list_remote_files(list(self.pending.values()))
+        for source, destination in list(self.pending.items()):
+            if destination in remote_files:
+                del self.pending[source]
+                host.statistics.record_skipped()
+                self.report(source, destination, ExportState.SKIPPED)
+        host.make_parents(list(self.pending.values()))
+
+    def fail(self, exception: Exception) -> None:
+        """
+        Marks this lane as failed, reporting the file in transfer (if any)
+        as :attr:`~accounts.models.choices.ExportState.FAILED`.
+
+        Parameters
+        ----------
+        exception : Exception
+            Raised exception
+        """
+        self.error = exception
+        failure_log = logs.FAN_OUT_LANE_FAILURE.format(
+            export_destination=self.export_destination, exception=exception
+        )
+        self._logger.warning(failure_log)
+        if self._current is not None:
+            source, destination, _ = self._current
+            self.abort()
+            self.export_destination.statistics.record_failed()
+            self.report(source, destination, ExportState.FAILED)
+
+    def abort(self) -> None:
+        """
+        Closes and removes the partially written file in transfer (if any),
+        so that it is not mistaken for an exported file later on.
+        """
+        if self._current is None:
+            return
+        _, destination, _ = self._current
+        remote, self._remote, self._current = self._remote, None, None
+        if remote is not None:
+            try:
+                remote.close()
+            except (OSError, SSHException):
+                pass
+        try:
+            self._sftp_client.remove(str(destination))
+        except (OSError, SSHException):
+            pass
+
+    def open(self, source: str) -> None:
+        destination = self.pending[source]
+        self._current = (source, destination, time.perf_counter())
+        self._remote = self._sftp_client.open(str(destination), "wb")
+        block_size = self.export_destination.block_size
+        if block_size and not self.export_destination.is_local:
+            self._remote.MAX_REQUEST_SIZE = block_size
+        set_pipelined = getattr(self._remote, "set_pipelined", None)
+        if set_pipelined is not None:
+            set_pipelined(True)
+        self._written = 0
+        self._throttle = self.export_destination._get_throttle_callback()
+
+    def write(self, data: bytes) -> None:
+        self._remote.write(data)
+        self._written += len(data)
+        if self._throttle is not None:
+            self._throttle(self._written, 0)
+
+    def close(self, size: int, digest: Optional[str]) -> None:
+        source, destination, start = self._current
+        remote, self._remote = self._remote, None
+        remote.close()
+        attributes = self._sftp_client.stat(str(destination))
+        if attributes.st_size != size:
+            raise OSError(
+                logs.FAN_OUT_SIZE_MISMATCH.format(
+                    export_destination=self.export_destination,
+                    destination=destination,
+                    expected=size,
+                    found=attributes.st_size,
+                )
+            )
+        self._current = None
+        del self.pending[source]
+        latency = time.perf_counter() - start
+        self.export_destination.statistics.record_file(size, latency)
+        if digest is None:
+            self.report(source, destination, ExportState.DONE)
+        else:
+            # Reported once verified, see FanOutExporter.run().
+            self.checksums[destination] = digest
+            self.transferred.append((source, destination))
+
+    def skip_unreadable(self, source: str) -> None:
+        """
+        Reports a file that could not be read locally as
+        :attr:`~accounts.models.choices.ExportState.FAILED`, leaving it
+        pending.
+
+        Parameters
+        ----------
+        source : str
+            Local file path
+        """
+        destination = self.pending[source]
+        if self._current is not None:
+            self.abort()
+        self.export_destination.statistics.record_failed()
+        self.report(source, destination, ExportState.FAILED)
+
+    def _run(self) -> None:
+        try:
+            self.prepare()
+        except (OSError, SSHException) as e:
+            self.fail(e)
+        finally:
+            self.ready.set()
+        handlers = {
+            "open": self.open,
+            "data": self.write,
+            "close": self.close,
+            "unreadable": self.skip_unreadable,
+        }
+        while self.is_active:
+            try:
+                message = self.queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if message is None or not self.is_active:
+                break
+            kind, *args = message
+            try:
+                handlers[kind](*args)
+            except (OSError, SSHException) as e:
+                self.fail(e)
+        # Detached lanes drop the file in transfer, it is left pending.
+        self.abort()
+
+
+class FanOutExporter:
+    """
+    Exports files to multiple export destinations while reading each file
+    from local storage only once: files are read in chunks, which are handed
+    to a :class:`FanOutLane` per destination and written concurrently.
+
+    Each lane buffers a bounded number of chunks, so that faster destinations
+    may run ahead of slower ones while memory use stays bounded. A lane that
+    held back the others (its buffer full while theirs are empty) for more
+    than *lag_timeout* seconds in total is detached, and its remaining files
+    are left pending to be exported separately (see
+    :func:`~accounts.tasks.export_fan_out`).
+
+    Examples
+    --------
+    >>> exporter = FanOutExporter()
+    >>> unfinished = exporter.run([
+    ...     (destination_1, sources, destinations_1, None),
+    ...     (destination_2, sources, destinations_2, None),
+    ... ])
+    """
+
+    _logger = logging.getLogger("accounts.export_destination")
+
+    def __init__(
+        self,
+        chunk_size: int = None,
+        max_lag: int = None,
+        lag_timeout: float = None,
+    ):
+        """
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of bytes read per chunk
+        max_lag : int, optional
+            Number of chunks buffered per export destination
+        lag_timeout : float, optional
+            Number of seconds a destination may hold back the others before
+            it is detached
+        """
+        self.chunk_size = chunk_size or getattr(
+            settings, CHUNK_SIZE_SETTING, DEFAULT_CHUNK_SIZE
+        )
+        self.max_lag = max_lag or getattr(
+            settings, MAX_LAG_SETTING, DEFAULT_MAX_LAG
+        )
+        self.lag_timeout = lag_timeout or getattr(
+            settings, LAG_TIMEOUT_SETTING, DEFAULT_LAG_TIMEOUT
+        )
+        self._lanes: List[FanOutLane] = []
+
+    def _is_holding_back(self, lane: FanOutLane) -> bool:
+        """
+        Whether other active lanes are starving while *lane* is full, i.e.
+        have nothing left to write but files left to read.
+
+        Parameters
+        ----------
+        lane : FanOutLane
+            Full lane
+
+        Returns
+        -------
+        bool
+            True if *lane* holds back any other lane
+        """
+        return any(
+            other is not lane
+            and other.is_active
+            and other.unread
+            and other.queue.empty()
+            for other in self._lanes
+        )
+
+    def _detach(self, lane: FanOutLane) -> None:
+        """
+        Stops handing data to *lane*, leaving its remaining files pending.
+
+        Parameters
+        ----------
+        lane : FanOutLane
+            Lagging lane
+        """
+        lane.detached = True
+        detach_log = logs.FAN_OUT_LANE_DETACHED.format(
+            export_destination=lane.export_destination,
+            stalled=lane.stalled,
+            n_pending=len(lane.pending),
+        )
+        self._logger.warning(detach_log)
+
+    def _offer(self, lane: FanOutLane, message: Optional[tuple]) -> bool:
+        """
+        Hands *message* to *lane*, waiting while its buffer is full. The time
+        spent waiting while other lanes starve is accumulated, and the lane
+        is detached once it exceeds :attr:`lag_timeout`.
+
+        Parameters
+        ----------
+        lane : FanOutLane
+            Target lane
+        message : Optional[tuple]
+            Message, or None to stop the lane
+
+        Returns
+        -------
+        bool
+            Whether the message was queued
+        """
+        while lane.is_active:
+            try:
+                lane.queue.put_nowait(message)
+                return True
+            except queue.Full:
+                pass
+            start = time.perf_counter()
+            try:
+                lane.queue.put(message, timeout=POLL_INTERVAL)
+            except queue.Full:
+                queued = False
+            else:
+                queued = True
+            if self._is_holding_back(lane):
+                lane.stalled += time.perf_counter() - start
+                if lane.stalled >= self.lag_timeout:
+                    self._detach(lane)
+            if queued:
+                return True
+        return False
+
+    def _fan_out(
+        self, source: str, lanes: List[FanOutLane], verify: bool
+    ) -> None:
+        """
+        Reads *source* once and hands its chunks to *lanes*.
+
+        Parameters
+        ----------
+        source : str
+            Local file path
+        lanes : List[FanOutLane]
+            Lanes the file is pending in
+        verify : bool
+            Whether to compute the file's checksum while it is read
+        """
+        digest = hashlib.new(CHECKSUM_ALGORITHM) if verify else None
+        n_bytes = 0
+        with open(source, "rb") as local_file:
+            message = ("open", source)
+            lanes = [lane for lane in lanes if self._offer(lane, message)]
+            while lanes:
+                data = local_file.read(self.chunk_size)
+                if not data:
+                    break
+                if digest is not None:
+                    digest.update(data)
+                n_bytes += len(data)
+                lanes = [
+                    lane for lane in lanes if self._offer(lane, ("data", data))
+                ]
+        hexdigest = None if digest is None else digest.hexdigest()
+        for lane in lanes:
+            self._offer(lane, ("close", n_bytes, hexdigest))
+
+    def run(
+        self, jobs: Iterable[FanOutJob], verify: str = None
+    ) -> List["ExportDestination"]:
+        """
+        Runs the given fan-out jobs (one per export destination) to
+        completion.
+
+        Parameters
+        ----------
+        jobs : Iterable[FanOutJob]
+            Fan-out jobs
+        verify : str, optional
+            :class:`~accounts.models.choices.ChecksumMode` name, if provided,
+            files are hashed once while they are read and verified in each
+            destination, see
+            :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+
+        Returns
+        -------
+        List[ExportDestination]
+            Export destinations left with pending files (failed, detached or
+            with mismatched checksums)
+        """
+        self._lanes = [
+            FanOutLane(host, sources, destinations, callback, self.max_lag)
+            for host, sources, destinations, callback in jobs
+        ]
+        for lane in self._lanes:
+            lane.start()
+        for lane in self._lanes:
+            lane.ready.wait()
+            lane.unread = set(lane.pending)
+        sources = dict.fromkeys(
+            source for lane in self._lanes for source in lane.pending
+        )
+        for source in sources:
+            lanes = [
+                lane
+                for lane in self._lanes
+                if lane.is_active and source in lane.pending
+            ]
+            if not lanes:
+                continue
+            try:
+                self._fan_out(source, lanes, verify=bool(verify))
+            except OSError as e:
+                read_log = logs.FAN_OUT_READ_FAILURE.format(
+                    source=source, exception=e
+                )
+                self._logger.warning(read_log)
+                for lane in lanes:
+                    self._offer(lane, ("unreadable", source))
+            for lane in lanes:
+                lane.unread.discard(source)
+        for lane in self._lanes:
+            self._offer(lane, None)
+        for lane in self._lanes:
+            lane.join()
+        if verify:
+            for lane in self._lanes:
+                try:
+                    lane.export_destination.verify_checksums(
+                        lane.checksums,
+                        lane.transferred,
+                        mode=ChecksumMode[verify.upper()],
+                        callback=lane.callback,
+                    )
+                except (OSError, SSHException) as e:
+                    lane.error = e
+        return [
+            lane.export_destination
+            for lane in self._lanes
+            if lane.pending or lane.error is not None
+        ]
@@ -0,0 +1,156 @@
+"""
+Utilities used to list large directory trees (e.g. analysis run outputs on
+network storage) by scanning directories in parallel.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from django.conf import settings
+
+#
+# Django settings keys.
+#
+#: Setting key for the number of threads scanning directories.
+WALK_WORKERS_SETTING: str = "EXPORT_WALK_WORKERS"
+
+#: Default number of threads scanning directories. Scanning is bound by
+#: storage latency rather than CPU, so that many threads pay off on network
+#: storage.
+DEFAULT_WALK_WORKERS: int = 16
+#: Relative path of the tree root.
+ROOT: str = "."
+
+#: A listed file: path relative to the tree root, size in bytes and
+#: modification time.
+FileRecord = Tuple[str, int, float]
+
+
+def get_walk_workers() -> int:
+    """
+    Returns the configured number of directory scanning threads.
+
+    Returns
+    -------
+    int
+        Number of threads
+    """
+    return getattr(settings, WALK_WORKERS_SETTING, DEFAULT_WALK_WORKERS)
+
+
+def scan_directory(
+    root: Path, relative: str
+) -> Tuple[float, List[FileRecord], List[str]]:
+    """
+    Lists a single directory using :func:`os.scandir`, which avoids a
+    separate *stat* call per entry to tell files from directories.
+
+    Parameters
+    ----------
+    root : Path
+        Tree root
+    relative : str
+        Directory path relative to *root*
+
+    Returns
+    -------
+    Tuple[float, List[FileRecord], List[str]]
+        Directory modification time, files and subdirectories (relative to
+        *root*)
+    """
+    path = root if relative == ROOT else root / relative
+    # Read before listing, so that concurrent changes invalidate the result.
+    mtime = os.stat(path).st_mtime
+    files, subdirectories = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            name = entry.name
+            if relative != ROOT:
+                name = f"{relative}/{name}"
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(name)
+            elif entry.is_file():
+                stat = entry.stat()
+                files.append((name, stat.st_size, stat.st_mtime))
+    return mtime, files, subdirectories
+
+
+def walk(
+    root: Union[Path, str], workers: int = None
+) -> Tuple[List[FileRecord], Dict[str, float]]:
+    """
+    Lists all files under *root*, scanning directories in parallel.
+
+    Parameters
+    ----------
+    root : Union[Path, str]
+        Tree root
+    workers : int, optional
+        Number of scanning threads, see :func:`get_walk_workers`
+
+    Returns
+    -------
+    Tuple[List[FileRecord], Dict[str, float]]
+        Files sorted by relative path, and directory modification times by
+        relative path
+    """
+    root = Path(root)
+    files, directories = [], {}
+    with ThreadPoolExecutor(max_workers=workers or get_walk_workers()) as pool:
+        pending = {pool.submit(scan_directory, root, ROOT): ROOT}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                relative = pending.pop(future)
+                mtime, directory_files, subdirectories = future.result()
+                directories[relative] = mtime
+                files += directory_files
+                for subdirectory in subdirectories:
+                    future = pool.submit(scan_directory, root, subdirectory)
+                    pending[future] = subdirectory
+    files.sort()
+    return files, directories
+
+
+def get_changed_directories(
+    root: Union[Path, str],
+    directories: Dict[str, float],
+    workers: int = None,
+) -> List[str]:
+    """
+    Returns which of *directories* were modified (files or subdirectories
+    added, removed or renamed) or removed since listed by :func:`walk`.
+    Modifications of existing files' contents are not detected.
+
+    Parameters
+    ----------
+    root : Union[Path, str]
+        Tree root
+    directories : Dict[str, float]
+        Directory modification times by relative path
+    workers : int, optional
+        Number of threads, see :func:`get_walk_workers`
+
+    Returns
+    -------
+    List[str]
+        Changed directories (relative to *root*)
+    """
+    root = Path(root)
+
+    def get_mtime(relative: str) -> Optional[float]:
+        path = root if relative == ROOT else root / relative
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    relatives = list(directories)
+    with ThreadPoolExecutor(max_workers=workers or get_walk_workers()) as pool:
+        mtimes = pool.map(get_mtime, relatives)
+        return [
+            relative
+            for relative, mtime in zip(relatives, mtimes)
+            if mtime != directories[relative]
+        ]
@@ -0,0 +1,309 @@
+"""
+Local filesystem stand-ins for the paramiko transport and SFTP client, used
+by :class:`~accounts.models.export_destination.ExportDestination` instances
+with the :attr:`~accounts.models.choices.ExportBackend.LOCAL` backend to
+export to local or mounted (e.g. NFS) paths without encryption and SFTP
+protocol overhead. Files are copied by the kernel whenever possible, see
+:func:`copy_file`.
+"""
+import errno
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Callable, List, Union
+
+import paramiko
+from django.conf import settings
+
+#
+# Django settings keys.
+#
+#: Setting key for whether to hardlink files within the same filesystem.
+HARDLINKS_SETTING: str = "EXPORT_LOCAL_HARDLINKS"
+
+#: Default hardlinking setting. Hardlinked exports share their inode with the
+#: source, so that changes to either are reflected in both.
+DEFAULT_HARDLINKS: bool = False
+#: Number of bytes copied per kernel copy call.
+COPY_CHUNK_SIZE: int = 8 * 1024 * 1024
+#: *ioctl* request cloning a file's extents (copy-on-write filesystems).
+FICLONE: int = 0x40049409
+#: Errors indicating a copy method is not supported for the given files.
+UNSUPPORTED_ERRORS = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+def reflink(source: int, destination: int) -> None:
+    """
+    Clones the extents of *source* into *destination*.
+
+    Parameters
+    ----------
+    source : int
+        Source file descriptor
+    destination : int
+        Destination file descriptor
+
+    Raises
+    ------
+    OSError
+        If cloning is not supported
+    """
+    if fcntl is None:
+        raise OSError(errno.ENOSYS, "reflink")
+    fcntl.ioctl(destination, FICLONE, source)
+
+
+def kernel_copy(
+    source: int, destination: int, size: int, callback: Callable = None
+) -> None:
+    """
+    Copies *size* bytes from *source* to *destination* without passing the
+    data through user space, using :func:`os.copy_file_range` if available
+    and :func:`os.sendfile` otherwise.
+
+    Parameters
+    ----------
+    source : int
+        Source file descriptor
+    destination : int
+        Destination file descriptor
+    size : int
+        Number of bytes to copy
+    callback : Callable, optional
+        Called with the number of bytes copied so far and *size*
+
+    Raises
+    ------
+    OSError
+        If neither method is supported for the given files
+    """
+    copy = getattr(os, "copy_file_range", None)
+    copied = 0
+    while copied < size:
+        count = min(COPY_CHUNK_SIZE, size - copied)
+        if copy is not None:
+            try:
+                sent = copy(source, destination, count)
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRORS or copied:
+                    raise
+                copy = None
+                continue
+        else:
+            sent = os.sendfile(destination, source, copied, count)
+        if not sent:
+            break
+        copied += sent
+        if callback is not None:
+            callback(copied, size)
+
+
+def copy_file(
+    source: Union[Path, str],
+    destination: Union[Path, str],
+    callback: Callable = None,
+    hardlink: bool = None,
+) -> str:
+    """
+    Copies *source* to *destination*, overriding it if it exists, using the
+    cheapest method available: a hardlink (if enabled and on the same
+    filesystem), a reflink (on copy-on-write filesystems), an in-kernel copy,
+    and finally a regular buffered copy.
+
+    Parameters
+    ----------
+    source : Union[Path, str]
+        Source file path
+    destination : Union[Path, str]
+        Destination file path
+    callback : Callable, optional
+        Called with the number of bytes copied so far and the file size
+    hardlink : bool, optional
+        Whether hardlinks may be used, defaults to the EXPORT_LOCAL_HARDLINKS
+        setting
+
+    Returns
+    -------
+    str
+        Method used, one of "hardlink", "reflink", "kernel" or "buffered"
+    """
+    if hardlink is None:
+        hardlink = getattr(settings, HARDLINKS_SETTING, DEFAULT_HARDLINKS)
+    size = os.stat(source).st_size
+    if hardlink:
+        temporary = f"{destination}.{os.getpid()}.link"
+        try:
+            os.link(source, temporary)
+        except OSError as e:
+            if e.errno not in UNSUPPORTED_ERRORS:
+                raise
+        else:
+            os.replace(temporary, destination)
+            if callback is not None:
+                callback(size, size)
+            return "hardlink"
+    with open(source, "rb") as source_file:
+        with open(destination, "wb") as destination_file:
+            source_fd = source_file.fileno()
+            destination_fd = destination_file.fileno()
+            try:
+                reflink(source_fd, destination_fd)
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRORS:
+                    raise
+            else:
+                if callback is not None:
+                    callback(size, size)
+                return "reflink"
+            try:
+                kernel_copy(source_fd, destination_fd, size, callback)
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRORS:
+                    raise
+                destination_file.truncate(0)
+            else:
+                return "kernel"
+            source_file.seek(0)
+            destination_file.seek(0)
+            shutil.copyfileobj(source_file, destination_file)
+    if callback is not None:
+        callback(size, size)
+    return "buffered"
+
+
+class LocalSFTPClient:
+    """
+    Implements the subset of :class:`paramiko.SFTPClient` used for exports
+    over the local filesystem.
+    """
+
+    def stat(self, path: str) -> paramiko.SFTPAttributes:
+        return paramiko.SFTPAttributes.from_stat(os.stat(path))
+
+    def mkdir(self, path: str, mode: int = 0o777) -> None:
+        os.mkdir(path, mode)
+
+    def listdir_attr(self, path: str = ".") -> List[paramiko.SFTPAttributes]:
+        listing = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                attributes = paramiko.SFTPAttributes.from_stat(
+                    entry.stat(), filename=entry.name
+                )
+                listing.append(attributes)
+        return listing
+
+    def put(
+        self,
+        localpath: str,
+        remotepath: str,
+        callback: Callable = None,
+        confirm: bool = True,
+    ) -> paramiko.SFTPAttributes:
+        copy_file(localpath, remotepath, callback=callback)
+        return self.stat(remotepath)
+
+    def putfo(
+        self,
+        fl,
+        remotepath: str,
+        file_size: int = 0,
+        callback: Callable = None,
+        confirm: bool = True,
+    ) -> paramiko.SFTPAttributes:
+        n_bytes = 0
+        with open(remotepath, "wb") as destination_file:
+            while True:
+                data = fl.read(COPY_CHUNK_SIZE)
+                if not data:
+                    break
+                destination_file.write(data)
+                n_bytes += len(data)
+                if callback is not None:
+                    callback(n_bytes, file_size)
+        return self.stat(remotepath)
+
+    def remove(self, path: str) -> None:
+        os.remove(path)
+
+    def posix_rename(self, oldpath: str, newpath: str) -> None:
+        os.replace(oldpath, newpath)
+
+    def open(self, filename: str, mode: str = "r", bufsize: int = -1):
+        return open(filename, mode, bufsize)
+
+    def chdir(self, path: str = None) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class LocalChannel:
+    """
+    Implements the subset of :class:`paramiko.Channel` used to run commands,
+    running them as local subprocesses.
+    """
+
+    process: subprocess.Popen = None
+
+    def exec_command(self, command: str) -> None:
+        self.process = subprocess.Popen(
+            command,
+            shell=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def makefile(self, mode: str = "r"):
+        if "w" in mode:
+            return self.process.stdin
+        return self.process.stdout
+
+    def makefile_stderr(self, mode: str = "r"):
+        return self.process.stderr
+
+    def shutdown_write(self) -> None:
+        if not self.process.stdin.closed:
+            self.process.stdin.close()
+
+    def recv_exit_status(self) -> int:
+        return self.process.wait()
+
+    def close(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+
+class LocalTransport:
+    """
+    Implements the subset of :class:`paramiko.Transport` used for exports,
+    always active and authenticated.
+    """
+
+    active: bool = True
+
+    def is_authenticated(self) -> bool:
+        return True
+
+    def open_session(self) -> LocalChannel:
+        return LocalChannel()
+
+    def close(self) -> None:
+        pass
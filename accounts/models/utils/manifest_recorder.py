@@ -0,0 +1,149 @@
+"""
+Definition of the :class:`ManifestRecorder` class.
+"""
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Union
+
+from accounts.models.choices import ExportState
+from accounts.models.export_manifest_entry import ExportManifestEntry
+from accounts.models.export_progress import ExportProgress
+from django.db import connection
+from django.utils import timezone
+
+#: Default number of buffered state changes written at once.
+DEFAULT_BATCH_SIZE: int = 100
+#: Default maximal number of seconds between writes.
+DEFAULT_FLUSH_INTERVAL: int = 5
+#: States of files that are present in the export destination.
+COMPLETE_STATES = ExportState.DONE, ExportState.SKIPPED
+#: States of files that failed to export.
+FAILED_STATES = ExportState.FAILED, ExportState.MISMATCH
+
+
+class ManifestRecorder:
+    """
+    Buffers transfer state changes reported by
+    :meth:`~accounts.models.export_destination.ExportDestination.put` and
+    writes them to the manifest in batches. May be used as a context manager,
+    flushing any remaining changes on exit.
+
+    If the manifest is part of a fanned-out export, the aggregated
+    :class:`~accounts.models.export_progress.ExportProgress` is updated
+    along with each batch.
+    """
+
+    def __init__(
+        self,
+        manifest,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: int = DEFAULT_FLUSH_INTERVAL,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.progress_id = manifest.progress_id
+        self._entry_ids, self._sizes, self._states = {}, {}, {}
+        entries = manifest.entry_set.values_list(
+            "destination", "id", "size", "state"
+        )
+        for destination, entry_id, size, state in entries:
+            self._entry_ids[destination] = entry_id
+            self._sizes[entry_id] = size
+            self._states[entry_id] = ExportState[state]
+        self._buffer = defaultdict(list)
+        self._n_buffered = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ManifestRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    def __call__(
+        self,
+        source: Union[Path, str],
+        destination: Union[Path, str],
+        state: ExportState,
+    ) -> None:
+        """
+        Records the state of a single file transfer.
+
+        Parameters
+        ----------
+        source : Union[Path, str]
+            Local file path
+        destination : Union[Path, str]
+            Absolute destination path in the host
+        state : ExportState
+            Transfer state
+        """
+        entry_id = self._entry_ids.get(str(destination))
+        if entry_id is None:
+            return
+        with self._lock:
+            self._buffer[state].append(entry_id)
+            self._n_buffered += 1
+            elapsed = time.monotonic() - self._last_flush
+            if (
+                self._n_buffered >= self.batch_size
+                or elapsed >= self.flush_interval
+            ):
+                self._flush()
+
+    def flush(self) -> None:
+        """
+        Writes all buffered state changes.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        """
+        Writes all buffered state changes, expects the caller to hold the
+        recorder's lock.
+        """
+        now = timezone.now()
+        for state, entry_ids in self._buffer.items():
+            ExportManifestEntry.objects.filter(id__in=entry_ids).update(
+                state=state.name, modified=now
+            )
+        if self.progress_id is not None and self._buffer:
+            self._update_progress()
+        self._buffer.clear()
+        self._n_buffered = 0
+        self._last_flush = time.monotonic()
+        # Parallel transfers report from worker threads, which would otherwise
+        # leave their own database connections open.
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+
+    def _update_progress(self) -> None:
+        """
+        Adds the buffered state changes to the aggregated export progress,
+        counting only transitions so that retried files are not counted
+        twice.
+        """
+        n_files = n_bytes = n_failed = 0
+        for state, entry_ids in self._buffer.items():
+            for entry_id in entry_ids:
+                previous = self._states[entry_id]
+                self._states[entry_id] = state
+                completed = state in COMPLETE_STATES
+                if completed != (previous in COMPLETE_STATES):
+                    sign = 1 if completed else -1
+                    n_files += sign
+                    n_bytes += sign * self._sizes[entry_id]
+                failed = state in FAILED_STATES
+                if failed != (previous in FAILED_STATES):
+                    n_failed += 1 if failed else -1
+        if n_files or n_failed:
+            ExportProgress.objects.add_progress(
+                self.progress_id,
+                n_files=n_files,
+                n_bytes=n_bytes,
+                n_failed=n_failed,
+            )
@@ -22,6 +22,9 @@ KNOWN_HOSTS_SETTINGS: str = "SSH_KNOWN_HOSTS"
 #: Default known hosts file path.
 DEFAULT_KNOWN_HOSTS_PATH = os.path.expanduser("~/.ssh/known_hosts")
 
+# Parsed known hosts cache, keyed by file path and modification time.
+_KNOWN_HOSTS_CACHE: dict = {}
+
 
 # def get_rsa_key() -> paramiko.rsakey.RSAKey:
 #     """
@@ -38,7 +41,8 @@ DEFAULT_KNOWN_HOSTS_PATH = os.path.expanduser("~/.ssh/known_hosts")
 
 def get_known_hosts() -> paramiko.hostkeys.HostKeys:
     """
-    Returns the server's known hosts configuration.
+    Returns the server's known hosts configuration. The parsed file is
+    cached until its modification time changes.
 
     Returns
     -------
@@ -48,4 +52,14 @@ def get_known_hosts() -> paramiko.hostkeys.HostKeys:
     known_hosts_path = getattr(
         settings, KNOWN_HOSTS_SETTINGS, DEFAULT_KNOWN_HOSTS_PATH
     )
-    return paramiko.util.load_host_keys(known_hosts_path)
+    try:
+        mtime = os.stat(known_hosts_path).st_mtime
+    except OSError:
+        mtime = None
+    cache_key = (known_hosts_path, mtime)
+    if cache_key not in _KNOWN_HOSTS_CACHE:
+        _KNOWN_HOSTS_CACHE.clear()
+        _KNOWN_HOSTS_CACHE[cache_key] = paramiko.util.load_host_keys(
+            known_hosts_path
+        )
+    return _KNOWN_HOSTS_CACHE[cache_key]
@@ -0,0 +1,128 @@
+"""
+Definition of the :class:`TransferStatistics` class.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List
+
+#: Upper bounds (in seconds) of the per-file latency histogram buckets, an
+#: additional last bucket counts anything slower.
+LATENCY_BUCKETS: List[float] = [2 ** i / 1000 for i in range(17)]
+
+
+def get_latency_bucket(latency: float) -> int:
+    """
+    Returns the index of the histogram bucket of *latency*.
+
+    Parameters
+    ----------
+    latency : float
+        Latency in seconds
+
+    Returns
+    -------
+    int
+        Histogram bucket index
+    """
+    return bisect_left(LATENCY_BUCKETS, latency)
+
+
+def get_latency_percentile(histogram: List[int], percentile: float) -> float:
+    """
+    Returns the estimated latency percentile from a latency histogram (the
+    upper bound of the bucket the percentile falls in).
+
+    Parameters
+    ----------
+    histogram : List[int]
+        Counts per :data:`LATENCY_BUCKETS` bucket
+    percentile : float
+        Percentile (0-100)
+
+    Returns
+    -------
+    float
+        Latency in seconds, or None if the histogram is empty
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    threshold = total * percentile / 100
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= threshold:
+            break
+    if index < len(LATENCY_BUCKETS):
+        return LATENCY_BUCKETS[index]
+    return float("inf")
+
+
+class TransferStatistics:
+    """
+    Thread-safe accumulator of file transfer metrics collected by
+    :class:`~accounts.models.export_destination.ExportDestination`.
+    """
+
+    def __init__(self):
+        self.n_files: int = 0
+        self.n_skipped: int = 0
+        self.n_failed: int = 0
+        self.n_bytes: int = 0
+        #: Accumulated durations (seconds) keyed by operation name.
+        self.durations: Dict[str, float] = defaultdict(float)
+        #: Per-file transfer latency counts per :data:`LATENCY_BUCKETS` bucket.
+        self.latency_histogram: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, operation: str):
+        """
+        Context manager adding the duration of its body to *operation*.
+
+        Parameters
+        ----------
+        operation : str
+            Operation name, e.g. "handshake", "mkdir", "stat" or "transfer"
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.durations[operation] += elapsed
+
+    def record_file(self, n_bytes: int, latency: float = None) -> None:
+        """
+        Records a successfully transferred file.
+
+        Parameters
+        ----------
+        n_bytes : int
+            File size in bytes
+        latency : float, optional
+            Transfer duration in seconds
+        """
+        with self._lock:
+            self.n_files += 1
+            self.n_bytes += n_bytes
+            if latency is not None:
+                self.latency_histogram[get_latency_bucket(latency)] += 1
+
+    def record_skipped(self) -> None:
+        """
+        Records a skipped file.
+        """
+        with self._lock:
+            self.n_skipped += 1
+
+    def record_failed(self) -> None:
+        """
+        Records a failed file transfer.
+        """
+        with self._lock:
+            self.n_failed += 1
@@ -32,6 +32,7 @@ class ExportDestinationSerializer(serializers.HyperlinkedModelSerializer):
             "id",
             "title",
             "description",
+            "backend",
             "ip",
             "username",
             "password",
@@ -42,4 +43,11 @@ class ExportDestinationSerializer(serializers.HyperlinkedModelSerializer):
             "socket_timeout",
             "negotiation_timeout",
             "banner_timeout",
+            "max_connections",
+            "max_bandwidth",
+            "ciphers",
+            "ssh_compression",
+            "window_size",
+            "max_packet_size",
+            "block_size",
         )
@@ -0,0 +1,33 @@
+"""
+Definition of the :class:`ExportDestinationHealthSerializer` class.
+"""
+from accounts.models.export_destination_health import ExportDestinationHealth
+from rest_framework import serializers
+
+
+class ExportDestinationHealthSerializer(serializers.ModelSerializer):
+    """
+    Serializer class for the
+    :class:`~accounts.models.export_destination_health.ExportDestinationHealth`
+    model.
+    """
+
+    is_healthy = serializers.BooleanField(read_only=True)
+    is_stale = serializers.BooleanField(read_only=True)
+    is_circuit_open = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = ExportDestinationHealth
+        fields = (
+            "export_destination",
+            "reachable",
+            "authenticated",
+            "handshake_latency",
+            "error",
+            "consecutive_failures",
+            "last_checked",
+            "last_success",
+            "is_healthy",
+            "is_stale",
+            "is_circuit_open",
+        )
@@ -0,0 +1,43 @@
+"""
+Definition of the :class:`ExportProgressSerializer` class.
+"""
+from accounts.models.export_progress import ExportProgress
+from rest_framework import serializers
+
+
+class ExportProgressSerializer(serializers.ModelSerializer):
+    """
+    Serializer class for the
+    :class:`~accounts.models.export_progress.ExportProgress` model.
+    """
+
+    fraction_done = serializers.FloatField(read_only=True)
+    throughput = serializers.FloatField(read_only=True)
+    is_finished = serializers.BooleanField(read_only=True)
+    duration = serializers.FloatField(read_only=True)
+    coalesced_into = serializers.SlugRelatedField(
+        slug_field="job_id", read_only=True
+    )
+
+    class Meta:
+        model = ExportProgress
+        fields = (
+            "id",
+            "job_id",
+            "n_files_total",
+            "n_bytes_total",
+            "n_files_done",
+            "n_bytes_done",
+            "n_files_failed",
+            "fraction_done",
+            "throughput",
+            "is_finished",
+            "n_tasks_total",
+            "n_tasks_done",
+            "n_tasks_failed",
+            "created",
+            "last_progress",
+            "finished",
+            "duration",
+            "coalesced_into",
+        )
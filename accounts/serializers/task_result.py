@@ -17,6 +17,7 @@ class TaskResultSerializer(serializers.HyperlinkedModelSerializer):
     task_kwargs = serializers.SerializerMethodField()
     meta = serializers.SerializerMethodField()
     parent = serializers.CharField()
+    root = serializers.CharField()
 
     class Meta:
         model = TaskResult
@@ -34,6 +35,7 @@ class TaskResultSerializer(serializers.HyperlinkedModelSerializer):
             "traceback",
             "meta",
             "parent",
+            "root",
         )
 
     def get_task_args(self, task):
@@ -1,4 +1,10 @@
-from accounts.models import Profile
+from accounts.models import Profile, TaskLineage
+from accounts.models.utils.connection_pool import CONNECTION_POOL
+from celery.signals import (
+    before_task_publish,
+    task_prerun,
+    worker_process_shutdown,
+)
 from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -43,3 +49,58 @@ def create_auth_token(sender, instance=None, created=False, **kwargs):
 
     if created:
         Token.objects.create(user=instance)
+
+
+@worker_process_shutdown.connect
+def close_pooled_connections(*args, **kwargs):
+    """
+    Closes any SSH connections pooled by the exiting Celery worker process.
+    """
+    CONNECTION_POOL.close_all()
+
+
+@before_task_publish.connect
+def record_published_task_lineage(sender=None, headers=None, **kwargs):
+    """
+    Records the lineage of a published task (see
+    :class:`~accounts.models.task_lineage.TaskLineage`).
+
+    Parameters
+    ----------
+    sender : str, optional
+        Published task name
+    headers : dict, optional
+        Task message headers
+    """
+    headers = headers or {}
+    task_id = headers.get("id")
+    if task_id is not None:
+        TaskLineage.objects.record(
+            task_id,
+            task_name=sender,
+            parent_id=headers.get("parent_id"),
+            root_id=headers.get("root_id"),
+        )
+
+
+@task_prerun.connect
+def record_started_task_lineage(task_id=None, task=None, **kwargs):
+    """
+    Records the lineage of a starting task, in case its publication was not
+    recorded (e.g. published by another client, or within a transaction that
+    was rolled back).
+
+    Parameters
+    ----------
+    task_id : str, optional
+        Task ID
+    task : celery.Task, optional
+        Task instance
+    """
+    if task_id is not None and task is not None:
+        TaskLineage.objects.record(
+            task_id,
+            task_name=task.name,
+            parent_id=task.request.parent_id,
+            root_id=task.request.root_id,
+        )
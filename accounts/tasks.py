@@ -1,339 +1,1535 @@
 """
 Celery tasks exposed by the :mod:`pylabber.accounts` app.
 """
-import math
+import inspect
+import random
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import timedelta
 from pathlib import Path
-from typing import Iterable, List, Union
+from typing import Iterable, List, Optional, Union
 
-from celery import group, shared_task
+from celery import Task, current_task, group, shared_task
+from celery.exceptions import Retry
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
 from django_analyses.models.run import Run
-from django_mri.models import Scan, Session
+from django_mri.models import Scan
 from paramiko.ssh_exception import SSHException
-from research.models.subject import Subject
+from research.filters.subject_filter import filter_subjects
 
+from accounts.models import User, logs
+from accounts.models.choices import TransferMode
 from accounts.models.export_destination import ExportDestination
+from accounts.models.export_destination_health import ExportDestinationHealth
+from accounts.models.export_manifest import FAILED_STATES, ExportManifest
+from accounts.models.export_progress import ExportProgress
+from accounts.models.export_request import ExportRequest
+from accounts.models.export_task_failure import ExportTaskFailure
+from accounts.models.export_transfer_metrics import ExportTransferMetrics
+from accounts.models.managers.export_request import get_deduplication_window
+from accounts.models.run_file_manifest import RunFileManifest
+from accounts.models.task_lineage import TaskLineage
+from accounts.models.utils.circuit_breaker import (
+    DestinationUnavailable,
+    get_health_interval,
+    get_health_workers,
+)
+from accounts.models.utils.compression import get_compressed_destinations
+from accounts.models.utils.destination_limiter import (
+    DestinationBusy,
+    DestinationLimiter,
+)
+from accounts.models.utils.export_engine import ExportEngine
+from accounts.models.utils.export_estimate import (
+    estimate_duration,
+    split_existing,
+)
+from accounts.models.utils.export_plan import (
+    ExportItem,
+    get_export_items,
+    get_idempotency_key,
+    pack_by_size,
+)
+from accounts.models.utils.fan_out import FanOutExporter
+from accounts.models.utils.transport_tuning import DEFAULT_BENCHMARK_SIZE
 
 RUN_EXPORT_MUTATIONS = getattr(settings, "EXPORT_MUTATORS", {})
+PUT_WORKERS = getattr(settings, "EXPORT_PUT_WORKERS", 1)
+EXPORT_CHUNKS = getattr(settings, "EXPORT_CHUNKS", 3)
+BUSY_COUNTDOWN = getattr(settings, "EXPORT_BUSY_COUNTDOWN", 60)
+ESTIMATE_HISTORY_DAYS = getattr(settings, "EXPORT_ESTIMATE_HISTORY_DAYS", 7)
+SUMMARY_RESULTS = getattr(settings, "EXPORT_SUMMARY_RESULTS", False)
+LINEAGE_RETENTION_DAYS = getattr(settings, "TASK_LINEAGE_RETENTION_DAYS", 30)
+#: Export task arguments set from the requesting user only, never from
+#: request data.
+SERVER_EXPORT_ARGUMENTS = "subject_filters", "user_id"
+
+
+def hold_back(task: Task, host: ExportDestination) -> None:
+    """
+    Requeues *task* until the next health probe of *host*, whose circuit
+    breaker is open, rather than letting it fail and use up its retries.
+
+    Parameters
+    ----------
+    task : Task
+        Bound task currently executing
+    host : ExportDestination
+        Unavailable export destination
+
+    Raises
+    ------
+    DestinationUnavailable
+        If *task* was called directly
+    Retry
+        Marks the current execution as retried
+    """
+    circuit_log = logs.EXPORT_CIRCUIT_OPEN.format(
+        export_destination=host,
+        n_failures=host.health.consecutive_failures,
+    )
+    if task.request.called_directly:
+        raise DestinationUnavailable(circuit_log)
+    host._logger.info(circuit_log)
+    requeue(task, countdown=get_health_interval() * random.uniform(1, 2))
+
+
+def requeue(task: Task, countdown: float = None) -> None:
+    """
+    Re-sends *task* with the same ID and arguments after *countdown* seconds
+    (jittered by default), without counting towards its retries.
+
+    Parameters
+    ----------
+    task : Task
+        Bound task currently executing
+    countdown : float, optional
+        Delay in seconds
+
+    Raises
+    ------
+    Retry
+        Marks the current execution as retried
+    """
+    if countdown is None:
+        countdown = BUSY_COUNTDOWN * random.uniform(1, 2)
+    task.signature_from_request(countdown=countdown).apply_async()
+    raise Retry(when=countdown)
+
+
+def discard_failed(host: ExportDestination, entries: QuerySet) -> None:
+    """
+    Removes the files of *entries* that previously failed to transfer or
+    verify from *host*, so that they are re-uploaded rather than skipped as
+    existing (e.g. partial uploads or checksum mismatches).
+
+    Parameters
+    ----------
+    host : ExportDestination
+        Export destination, its connection is expected to be open
+    entries : QuerySet
+        Pending export manifest entries
+    """
+    failed = entries.filter(state__in=FAILED_STATES)
+    host.remove_files(failed.values_list("destination", flat=True))
+
+
+class ExportUnit(Task):
+    """
+    Base class of the tasks an export job fans out to (work units and
+    intermediate dispatch tasks). Once done, each of them counts its outcome
+    in the job's :class:`~accounts.models.export_progress.ExportProgress`
+    summary, and failures are recorded along with their traceback (see
+    :class:`~accounts.models.export_task_failure.ExportTaskFailure`).
+
+    If the EXPORT_SUMMARY_RESULTS setting is True, these tasks do not store
+    their individual results (nor their started and retried states), so that
+    large exports write a single summary record rather than hundreds of
+    task results.
+    """
+
+    ignore_result = SUMMARY_RESULTS
+    store_errors_even_if_ignored = False
+
+    def get_progress_id(self, args: tuple, kwargs: dict) -> Optional[int]:
+        """
+        Returns the export progress ID of an execution of this task, given
+        either directly or by the manifest(s) it exports.
+
+        Parameters
+        ----------
+        args : tuple
+            Task positional arguments
+        kwargs : dict
+            Task keyword arguments
+
+        Returns
+        -------
+        Optional[int]
+            Export progress ID, if any
+        """
+        try:
+            arguments = (
+                inspect.signature(self.run).bind(*args, **kwargs).arguments
+            )
+        except TypeError:
+            return None
+        progress_id = arguments.get("progress_id")
+        if progress_id is not None:
+            return progress_id
+        manifest_ids = as_id_list(arguments.get("manifest_id"))
+        manifest_ids += as_id_list(arguments.get("manifest_ids"))
+        if not manifest_ids:
+            return None
+        return (
+            ExportManifest.objects.filter(
+                id__in=manifest_ids, progress__isnull=False
+            )
+            .values_list("progress_id", flat=True)
+            .first()
+        )
+
+    def on_success(self, retval, task_id: str, args: tuple, kwargs: dict):
+        progress_id = self.get_progress_id(args, kwargs)
+        if progress_id is not None:
+            ExportProgress.objects.add_task_result(progress_id)
+
+    def on_failure(
+        self, exc, task_id: str, args: tuple, kwargs: dict, einfo
+    ):
+        progress_id = self.get_progress_id(args, kwargs)
+        if progress_id is not None:
+            ExportTaskFailure.objects.create(
+                progress_id=progress_id,
+                task_id=task_id,
+                task_name=self.name,
+                exception=repr(exc),
+                traceback=str(einfo or ""),
+            )
+            ExportProgress.objects.add_task_result(progress_id, failed=True)
 
 
 @shared_task(
+    bind=True,
+    base=ExportUnit,
     name="accounts.export-files",
     autoretry_for=(OSError, SSHException),
     retry_backoff=True,
 )
 def export_files(
+    self,
     export_destination_id: int,
-    files: List[str],
+    files: List[str] = None,
     destinations: List[str] = None,
+    workers: int = PUT_WORKERS,
+    use_history: bool = True,
+    transfer_mode: str = TransferMode.SFTP.name,
+    compression: str = None,
+    verify: str = None,
+    compress: bool = False,
+    manifest_id: int = None,
 ):
-    host = ExportDestination.objects.get(id=export_destination_id)
-    host.put(files, destinations)
+    """
+    Exports files to the specified export destination. Transfer states are
+    checkpointed in an export manifest, so that retries resume where the
+    previous attempt stopped. Planned exports pass the ID of a manifest
+    created at dispatch (see :func:`dispatch_export`) rather than the file
+    lists themselves, keeping broker messages and stored task arguments
+    small regardless of the number of files. Transfer metrics are recorded
+    for each attempt, see
+    :class:`~accounts.models.export_transfer_metrics.ExportTransferMetrics`.
 
+    The destination's connection and bandwidth limits are enforced across
+    workers, see
+    :class:`~accounts.models.utils.destination_limiter.DestinationLimiter`.
+    If no connection slot is available, or the destination's circuit breaker
+    is open (see :func:`probe_export_destinations`), the task is requeued
+    rather than retried.
 
-@shared_task(name="accounts.export-run-results")
-def export_run(export_destination_id: int, run_id: int, max_parallel: int = 3):
-    # Split in case of multiple runs.
-    if isinstance(run_id, Iterable):
+    Parameters
+    ----------
+    export_destination_id : int
+        Export destination ID
+    files : List[str], optional
+        Local file paths, ignored if *manifest_id* is provided
+    destinations : List[str], optional
+        Destinations in the host, ignored if *manifest_id* is provided
+    workers : int
+        Number of parallel SFTP channels, in "ASYNC" mode the
+        EXPORT_ENGINE_CHANNELS setting is used instead
+    use_history : bool
+        Whether to skip files previously exported to this destination
+        unchanged, without querying the host
+    transfer_mode : str
+        One of "SFTP" (per-file transfers), "TAR" (a single tar stream) or
+        "ASYNC" (per-file transfers multiplexed by a single task, see
+        :class:`~accounts.models.utils.export_engine.ExportEngine`)
+    compression : str
+        Tar stream compression ("gz", "bz2" or "xz"), only applicable if
+        *transfer_mode* is "TAR"
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+    compress : bool
+        Whether to gzip-compress NIfTI files (*.nii* to *.nii.gz*) while they
+        are uploaded, only applicable if *transfer_mode* is "SFTP"
+    manifest_id : int
+        ID of an existing manifest of *export_destination_id* listing the
+        files to export (e.g. the manifest of a fan-out export, see
+        :func:`export_fan_out`), its job ID is used
+    """
+    host = ExportDestination.objects.select_related("health").get(
+        id=export_destination_id
+    )
+    mode = TransferMode[transfer_mode.upper()]
+    compress = compress and mode is not TransferMode.TAR
+    if manifest_id is not None:
+        manifest = ExportManifest.objects.get(
+            id=manifest_id, export_destination=host
+        )
+        job_id = manifest.job_id
+    else:
+        job_id = self.request.id or str(uuid.uuid4())
+        if compress:
+            destinations = get_compressed_destinations(
+                host, files, destinations
+            )
+        manifest = ExportManifest.objects.for_job(
+            host, job_id, files, destinations
+        )
+    entries = manifest.get_pending_entries(use_history=use_history)
+    sources, destinations = [], []
+    for source, destination in entries.values_list("source", "destination"):
+        sources.append(source)
+        destinations.append(destination)
+    if not sources:
+        return
+    if not host.is_available:
+        hold_back(self, host)
+    limiter = DestinationLimiter(host, job_id)
+    try:
+        limiter.acquire()
+    except DestinationBusy:
+        if self.request.called_directly:
+            raise
+        requeue(self)
+    statistics = host.statistics
+    try:
+        with limiter, host, manifest.recorder() as recorder:
+            discard_failed(host, entries)
+            with statistics.measure("transfer"):
+                if mode is TransferMode.TAR:
+                    host.put_tar(
+                        sources,
+                        destinations,
+                        compression=compression,
+                        callback=recorder,
+                        verify=verify,
+                    )
+                elif mode is TransferMode.ASYNC:
+                    with ExportEngine() as engine:
+                        engine.run(
+                            [(host, sources, destinations, recorder)],
+                            verify=verify,
+                            compress=compress,
+                        )
+                else:
+                    host.put(
+                        sources,
+                        destinations,
+                        workers=workers,
+                        callback=recorder,
+                        verify=verify,
+                        compress=compress,
+                    )
+    except (OSError, SSHException):
+        # Wait for the destination to recover if it was found down meanwhile.
+        if not self.request.called_directly:
+            host.refresh_from_db()
+            if not host.is_available:
+                hold_back(self, host)
+        raise
+    finally:
+        ExportTransferMetrics.objects.from_statistics(
+            host, statistics, task_id=job_id, retries=self.request.retries
+        )
+
+
+@shared_task(bind=True, base=ExportUnit, name="accounts.export-fan-out")
+def export_fan_out(
+    self,
+    manifest_ids: List[int],
+    use_history: bool = True,
+    verify: str = None,
+) -> List[str]:
+    """
+    Exports files to multiple export destinations, reading each file only
+    once, see :class:`~accounts.models.utils.fan_out.FanOutExporter`. Each
+    destination has its own manifest (created at dispatch, see
+    :func:`dispatch_fan_out`), so that files are skipped and resumed per
+    destination.
+
+    Destinations are left out if they are busy (see
+    :class:`~accounts.models.utils.destination_limiter.DestinationLimiter`)
+    or unavailable (see :func:`probe_export_destinations`), if they fail, or
+    if they are detached for holding back the others. The remaining files of
+    each destination left out are exported by a separate
+    :func:`export_files` task, resuming its manifest with the same options.
+
+    Parameters
+    ----------
+    manifest_ids : List[int]
+        Export manifest IDs, one per export destination
+    use_history : bool
+        Whether to skip files previously exported to a destination
+        unchanged, without querying the host
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+
+    Returns
+    -------
+    List[str]
+        Task IDs of the :func:`export_files` tasks left-out destinations
+        were deferred to
+    """
+    job_id = self.request.id or str(uuid.uuid4())
+    manifests = (
+        ExportManifest.objects.filter(id__in=manifest_ids)
+        .select_related("export_destination__health")
+        .order_by("export_destination")
+    )
+    jobs, deferred = [], []
+    with ExitStack() as stack:
+        for manifest in manifests:
+            host = manifest.export_destination
+            entries = manifest.get_pending_entries(use_history=use_history)
+            pending = list(entries.values_list("source", "destination"))
+            if not pending:
+                continue
+            if not host.is_available:
+                deferred.append(manifest)
+                continue
+            limiter = DestinationLimiter(host, job_id)
+            try:
+                limiter.acquire()
+            except DestinationBusy:
+                deferred.append(manifest)
+                continue
+            stack.enter_context(limiter)
+            stack.enter_context(host)
+            discard_failed(host, entries)
+            recorder = stack.enter_context(manifest.recorder())
+            sources = [source for source, _ in pending]
+            targets = [destination for _, destination in pending]
+            jobs.append((host, sources, targets, recorder))
         try:
-            n_chunks = math.ceil(len(run_id) / max_parallel)
-        except ZeroDivisionError:
-            # If `max_parallel` is set to 0, run all in parallel.
-            signatures = [
-                export_run.s(export_destination_id, pk) for pk in run_id
-            ]
-            group(signatures)()
-        else:
-            # Create the inputs for each separate execution and run in chunks.
-            inputs = ((export_destination_id, pk) for pk in run_id)
-            chunks = export_run.chunks(inputs, n_chunks)
-            chunks.group().skew()()
+            unfinished = FanOutExporter().run(jobs, verify=verify)
         finally:
-            return
-    # Split in case of multiple export destinations.
-    if isinstance(export_destination_id, Iterable):
-        signatures = [export_run.s(pk, run_id) for pk in export_destination_id]
-        group(signatures)()
-        return
-    run = Run.objects.get(id=run_id)
-    files = [str(path) for path in run.path.rglob("*") if path.is_file()]
-    destinations = None
-    path_fixer = RUN_EXPORT_MUTATIONS.get(run.analysis_version.analysis.title)
-    if path_fixer:
-        destinations = [str(path_fixer(run, path)) for path in files]
-    export_files.delay(export_destination_id, files, destinations)
+            for host, *_ in jobs:
+                ExportTransferMetrics.objects.from_statistics(
+                    host,
+                    host.statistics,
+                    task_id=job_id,
+                    retries=self.request.retries,
+                )
+    deferred += [
+        manifest
+        for manifest in manifests
+        if manifest.export_destination in unfinished
+    ]
+    signatures = [
+        export_files.s(
+            manifest.export_destination_id,
+            manifest_id=manifest.id,
+            use_history=use_history,
+            verify=verify,
+        ).set(task_id=str(uuid.uuid4()))
+        for manifest in deferred
+    ]
+    if signatures:
+        # Counted before this task's own outcome, see ExportUnit.
+        progress_id = deferred[0].progress_id
+        if progress_id is not None:
+            ExportProgress.objects.add_totals(
+                progress_id, n_tasks=len(signatures)
+            )
+        group(signatures).apply_async()
+    return [signature.id for signature in signatures]
 
 
-@shared_task(name="accounts.export-mri-scan",)
-def export_mri_scan(
+def get_file_formats(file_format: Union[str, List[str]]) -> List[str]:
+    """
+    Normalizes the requested file formats.
+
+    Parameters
+    ----------
+    file_format : Union[str, List[str]]
+        File format name, comma-separated names, or a list of either
+
+    Returns
+    -------
+    List[str]
+        Lowercase file format names
+    """
+    if isinstance(file_format, str):
+        file_format = [file_format]
+    file_formats = []
+    for value in file_format:
+        for name in value.split(","):
+            name = name.strip().lower()
+            if name and name not in file_formats:
+                file_formats.append(name)
+    return file_formats
+
+
+def as_id_list(value: Union[int, Iterable[int], None]) -> List[int]:
+    """
+    Returns *value* as a list of primary keys.
+
+    Parameters
+    ----------
+    value : Union[int, Iterable[int], None]
+        Primary key(s)
+
+    Returns
+    -------
+    List[int]
+        Primary keys
+    """
+    if value is None:
+        return []
+    if isinstance(value, Iterable) and not isinstance(value, str):
+        return list(value)
+    return [value]
+
+
+def get_export_scans(
+    scan_ids: Iterable[int] = (),
+    session_ids: Iterable[int] = (),
+    subject_ids: Iterable[int] = (),
+) -> QuerySet:
+    """
+    Returns the scans exported for any mix of MRI scans, sessions and
+    subjects.
+
+    Parameters
+    ----------
+    scan_ids : Iterable[int]
+        Scan IDs
+    session_ids : Iterable[int]
+        MRI session IDs
+    subject_ids : Iterable[int]
+        Subject IDs (exports all of their MRI sessions)
+
+    Returns
+    -------
+    QuerySet
+        Exported scans
+    """
+    return Scan.objects.filter(
+        Q(id__in=list(scan_ids))
+        | Q(session__id__in=list(session_ids))
+        | Q(session__subject__id__in=list(subject_ids))
+    ).distinct()
+
+
+def resolve_export_items(
+    scan_ids: Iterable[int] = (),
+    session_ids: Iterable[int] = (),
+    subject_ids: Iterable[int] = (),
+    run_ids: Iterable[int] = (),
+    file_format: Union[str, List[str]] = "DICOM",
+    convert: bool = True,
+) -> List[ExportItem]:
+    """
+    Resolves the files to export for any mix of MRI scans, sessions, subjects
+    and analysis runs using a constant number of bulk queries. Analysis run
+    outputs are listed using their cached file manifests, see
+    :class:`~accounts.models.run_file_manifest.RunFileManifest`.
+
+    Parameters
+    ----------
+    scan_ids : Iterable[int]
+        Scan IDs
+    session_ids : Iterable[int]
+        MRI session IDs
+    subject_ids : Iterable[int]
+        Subject IDs (exports all of their MRI sessions)
+    run_ids : Iterable[int]
+        Analysis run IDs
+    file_format : Union[str, List[str]]
+        Either DICOM or NIfTI or both, applies to MRI data only
+    convert : bool
+        Whether to convert scans missing NIfTI files, if False their NIfTI
+        files are left out
+
+    Returns
+    -------
+    List[ExportItem]
+        Export items, see
+        :func:`~accounts.models.utils.export_plan.get_export_items`
+    """
+    files, sizes = [], {}
+    scan_ids, session_ids = list(scan_ids), list(session_ids)
+    subject_ids = list(subject_ids)
+    if scan_ids or session_ids or subject_ids:
+        file_formats = get_file_formats(file_format)
+        scans = get_export_scans(scan_ids, session_ids, subject_ids)
+        if convert and "nifti" in file_formats:
+            missing_nifti = scans.filter(_nifti__isnull=True)
+            if missing_nifti.exists():
+                missing_nifti.convert_to_nifti(
+                    force=False, persistent=True, progressbar=False
+                )
+        for scan in scans.select_related("_nifti"):
+            for name in file_formats:
+                if name == "nifti" and scan._nifti is None:
+                    continue
+                paths = scan.get_file_paths(file_format=name)
+                files += [(str(path), None) for path in paths]
+    runs = Run.objects.filter(id__in=list(run_ids)).select_related(
+        "analysis_version__analysis"
+    )
+    for run in runs:
+        path_fixer = RUN_EXPORT_MUTATIONS.get(
+            run.analysis_version.analysis.title
+        )
+        manifest = RunFileManifest.objects.for_run(run)
+        for path in manifest.get_paths():
+            path = str(path)
+            destination = path_fixer(run, path) if path_fixer else None
+            files.append((path, destination and str(destination)))
+        sizes.update(manifest.get_sizes())
+    return get_export_items(files, sizes=sizes)
+
+
+def dispatch_export(
     export_destination_id: int,
-    scan_id: int,
+    items: List[ExportItem],
     file_format: Union[str, List[str]] = "DICOM",
-    max_parallel: int = 3,
-):
+    n_chunks: int = EXPORT_CHUNKS,
+    transfer_mode: str = TransferMode.SFTP.name,
+    compression: str = None,
+    verify: str = None,
+    compress: bool = False,
+    progress_id: int = None,
+) -> List[str]:
+    """
+    Dispatches the export of *items* to an export destination as a group of
+    :func:`export_files` work units of roughly equal size.
+
+    Requests are deduplicated: an identical request (same destination, file
+    format and file set) made within the deduplication window coalesces onto
+    the tasks already dispatched, and files already queued, in transfer or
+    recently exported by other requests are left out. Planning is serialized
+    per destination, and the manifests of the work units are created before
+    dispatch so that they are immediately visible to concurrent requests.
+
+    Parameters
+    ----------
+    export_destination_id : int
+        Export destination ID
+    items : List[ExportItem]
+        Export items, see
+        :func:`~accounts.models.utils.export_plan.get_export_items`
+    file_format : Union[str, List[str]]
+        Requested file format(s)
+    n_chunks : int
+        Number of work units
+    transfer_mode : str
+        One of "SFTP" (per-file transfers), "TAR" (a single tar stream) or
+        "ASYNC" (per-file transfers multiplexed by a single task, see
+        :class:`~accounts.models.utils.export_engine.ExportEngine`)
+    compression : str
+        Tar stream compression ("gz", "bz2" or "xz")
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+    compress : bool
+        Whether to gzip-compress NIfTI files (*.nii* to *.nii.gz*) while they
+        are uploaded, only applicable if *transfer_mode* is "SFTP"
+    progress_id : int
+        :class:`~accounts.models.export_progress.ExportProgress` ID the
+        dispatched work units report to (coalesced requests keep reporting
+        to their original progress record, which the given one is pointed
+        at, see
+        :attr:`~accounts.models.export_progress.ExportProgress.coalesced_into`)
+
+    Returns
+    -------
+    List[str]
+        Work unit task IDs (of an existing identical request if coalesced)
+    """
+    file_formats = ",".join(get_file_formats(file_format))
+    mode = TransferMode[transfer_mode.upper()]
+    compress = compress and mode is not TransferMode.TAR
+    if mode is TransferMode.ASYNC:
+        # A single task multiplexes all transfers to the destination.
+        n_chunks = 1
+    with transaction.atomic():
+        host = ExportDestination.objects.select_for_update().get(
+            id=export_destination_id
+        )
+        if compress:
+            # Plan with the compressed destinations, so that deduplication
+            # and manifests refer to the files that will exist in the host.
+            sources = [source for source, _, _ in items]
+            destinations = get_compressed_destinations(
+                host, sources, [destination for _, destination, _ in items]
+            )
+            items = [
+                (source, destination, size)
+                for (source, _, size), destination in zip(items, destinations)
+            ]
+        key = get_idempotency_key(export_destination_id, items, file_formats)
+        existing = (
+            ExportRequest.objects.recent()
+            .filter(export_destination=host, key=key)
+            .first()
+        )
+        if existing is not None and not existing.has_failures():
+            # Report the progress of the job coalesced onto.
+            existing_progress_id = (
+                ExportManifest.objects.filter(
+                    export_destination=host,
+                    job_id__in=existing.task_ids,
+                    progress__isnull=False,
+                )
+                .exclude(progress=progress_id)
+                .values_list("progress", flat=True)
+                .first()
+            )
+            if progress_id is not None and existing_progress_id is not None:
+                ExportProgress.objects.filter(
+                    id=progress_id, coalesced_into__isnull=True
+                ).update(coalesced_into=existing_progress_id)
+            return existing.task_ids
+        since = timezone.now() - get_deduplication_window()
+        items = ExportManifest.objects.exclude_in_flight(host, items, since)
+        signatures, task_ids = [], []
+        for chunk in pack_by_size(items, n_chunks):
+            sources = [source for source, _, _ in chunk]
+            destinations = [destination for _, destination, _ in chunk]
+            if not any(destinations):
+                destinations = None
+            task_id = str(uuid.uuid4())
+            manifest = ExportManifest.objects.for_job(
+                host, task_id, sources, destinations, progress_id=progress_id
+            )
+            # The file lists are passed by manifest reference.
+            signature = export_files.s(
+                export_destination_id,
+                manifest_id=manifest.id,
+                transfer_mode=transfer_mode,
+                compression=compression,
+                verify=verify,
+                compress=compress,
+            ).set(task_id=task_id)
+            signatures.append(signature)
+            task_ids.append(task_id)
+        ExportRequest.objects.create(
+            export_destination=host,
+            key=key,
+            task_ids=task_ids,
+            n_files=len(items),
+        )
+        if progress_id is not None:
+            ExportProgress.objects.add_totals(
+                progress_id,
+                n_files=len(items),
+                n_bytes=sum(size for _, _, size in items),
+                n_tasks=len(signatures),
+            )
+        if signatures:
+            transaction.on_commit(group(signatures))
+    return task_ids
+
+
+def dispatch_fan_out(
+    export_destination_ids: List[int],
+    items: List[ExportItem],
+    file_format: Union[str, List[str]] = "DICOM",
+    n_chunks: int = EXPORT_CHUNKS,
+    verify: str = None,
+    progress_id: int = None,
+) -> List[str]:
+    """
+    Dispatches the export of *items* to multiple export destinations as a
+    group of :func:`export_fan_out` work units of roughly equal size, each
+    reading its files once and writing them to all destinations.
+
+    Requests are deduplicated per destination as by :func:`dispatch_export`:
+    destinations with an identical recent request coalesce onto its tasks,
+    and files in flight to a destination are left out of that destination's
+    manifests only.
+
+    Parameters
+    ----------
+    export_destination_ids : List[int]
+        Export destination IDs
+    items : List[ExportItem]
+        Export items, see
+        :func:`~accounts.models.utils.export_plan.get_export_items`
+    file_format : Union[str, List[str]]
+        Requested file format(s)
+    n_chunks : int
+        Number of work units
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+    progress_id : int
+        :class:`~accounts.models.export_progress.ExportProgress` ID the
+        dispatched work units report to
+
+    Returns
+    -------
+    List[str]
+        Work unit task IDs (including those of coalesced requests)
+    """
+    file_formats = ",".join(get_file_formats(file_format))
+    since = timezone.now() - get_deduplication_window()
+    task_ids = []
+    with transaction.atomic():
+        hosts = (
+            ExportDestination.objects.select_for_update()
+            .filter(id__in=list(export_destination_ids))
+            .order_by("id")
+        )
+        planned = {}
+        for host in hosts:
+            key = get_idempotency_key(host.id, items, file_formats)
+            existing = (
+                ExportRequest.objects.recent()
+                .filter(export_destination=host, key=key)
+                .first()
+            )
+            if existing is not None and not existing.has_failures():
+                task_ids += existing.task_ids
+                continue
+            planned[host] = (
+                key,
+                ExportManifest.objects.exclude_in_flight(host, items, since),
+            )
+        host_items = {
+            host: set(pending) for host, (_, pending) in planned.items()
+        }
+        union = list(
+            dict.fromkeys(
+                item for _, pending in planned.values() for item in pending
+            )
+        )
+        signatures, host_task_ids = [], defaultdict(list)
+        for chunk in pack_by_size(union, n_chunks):
+            task_id = str(uuid.uuid4())
+            manifest_ids = []
+            for host, pending in host_items.items():
+                subset = [item for item in chunk if item in pending]
+                if not subset:
+                    continue
+                subset_sources = [source for source, _, _ in subset]
+                subset_destinations = [
+                    destination for _, destination, _ in subset
+                ]
+                manifest = ExportManifest.objects.for_job(
+                    host,
+                    task_id,
+                    subset_sources,
+                    subset_destinations if any(subset_destinations) else None,
+                    progress_id=progress_id,
+                )
+                manifest_ids.append(manifest.id)
+                host_task_ids[host].append(task_id)
+            signature = export_fan_out.s(manifest_ids, verify=verify).set(
+                task_id=task_id
+            )
+            signatures.append(signature)
+            task_ids.append(task_id)
+        for host, (key, pending) in planned.items():
+            ExportRequest.objects.create(
+                export_destination=host,
+                key=key,
+                task_ids=host_task_ids[host],
+                n_files=len(pending),
+            )
+            if progress_id is not None:
+                ExportProgress.objects.add_totals(
+                    progress_id,
+                    n_files=len(pending),
+                    n_bytes=sum(size for _, _, size in pending),
+                )
+        if progress_id is not None:
+            ExportProgress.objects.add_totals(
+                progress_id, n_tasks=len(signatures)
+            )
+        if signatures:
+            transaction.on_commit(group(signatures))
+    return task_ids
+
+
+def estimate_export(
+    export_destination_id: int,
+    items: List[ExportItem],
+    unconverted: List[ExportItem] = (),
+    n_parallel: int = EXPORT_CHUNKS,
+    compress: bool = False,
+    probe: bool = True,
+) -> dict:
     """
-    Exports a single MRI scan to the specified export destination.
+    Estimates the export of *items* to an export destination without
+    transferring any of them. Existing files are found using a single
+    directory listing per destination directory, and the duration of the
+    remaining transfers is estimated both from a short probe transfer (see
+    :meth:`~accounts.models.export_destination.ExportDestination.probe`)
+    and from the throughput of the destination's recent exports (see
+    :class:`~accounts.models.export_transfer_metrics.ExportTransferMetrics`).
 
     Parameters
     ----------
     export_destination_id : int
         Export destination ID
+    items : List[ExportItem]
+        Export items, see
+        :func:`~accounts.models.utils.export_plan.get_export_items`
+    unconverted : List[ExportItem]
+        DICOM export items of scans that would be converted to NIfTI on
+        export, used to approximate the size of the missing NIfTI files
+    n_parallel : int
+        Number of work units
+    compress : bool
+        Whether NIfTI files would be gzip-compressed on export
+    probe : bool
+        Whether to run a probe transfer
+
+    Returns
+    -------
+    dict
+        File and byte counts (total, existing, pending and unconverted),
+        probe and historical throughput, and estimated durations in seconds
+        (None if unknown)
+    """
+    host = ExportDestination.objects.get(id=export_destination_id)
+    sources = [source for source, _, _ in items]
+    destinations = [destination for _, destination, _ in items]
+    if compress:
+        destinations = get_compressed_destinations(host, sources, destinations)
+    else:
+        destinations = [
+            str(host.resolve_destination(source, destination))
+            for source, destination in zip(sources, destinations)
+        ]
+    latency = throughput = None
+    with host:
+        remote_files = host.list_remote_files(destinations)
+        if probe:
+            latency, throughput = host.probe()
+    existing, pending = split_existing(items, destinations, remote_files)
+    unconverted = list(unconverted)
+    n_files = len(pending) + len(unconverted)
+    n_bytes = sum(size for _, _, size in pending + unconverted)
+    since = timezone.now() - timedelta(days=ESTIMATE_HISTORY_DAYS)
+    history = ExportTransferMetrics.objects.filter(
+        export_destination=host, created__gte=since
+    ).summarize()
+    return {
+        "export_destination_id": export_destination_id,
+        "n_files": len(items),
+        "n_bytes": sum(size for _, _, size in items),
+        "n_existing": len(existing),
+        "existing_bytes": sum(size for _, _, size in existing),
+        "n_pending": len(pending),
+        "pending_bytes": sum(size for _, _, size in pending),
+        "n_unconverted": len(unconverted),
+        "unconverted_bytes": sum(size for _, _, size in unconverted),
+        "probe": {"latency": latency, "throughput": throughput},
+        "history": {
+            "n_transfers": history["n_transfers"],
+            "throughput": history["throughput"],
+        },
+        "estimated_duration": estimate_duration(
+            n_files, n_bytes, throughput, latency, n_parallel
+        ),
+        "historical_duration": estimate_duration(
+            n_files, n_bytes, history["throughput"]
+        ),
+    }
+
+
+@shared_task(base=ExportUnit, name="accounts.convert-and-export-scan")
+def convert_and_export_scan(
+    export_destination_ids: List[int],
+    scan_id: int,
+    transfer_mode: str = TransferMode.SFTP.name,
+    compression: str = None,
+    verify: str = None,
+    compress: bool = False,
+    progress_id: int = None,
+) -> List[str]:
+    """
+    Converts a single scan to NIfTI and dispatches the export of the result,
+    see :func:`export_plan`. Each scan is converted by its own task, so that
+    conversions run in parallel across the worker pool, exports start as
+    soon as each scan is ready, and a failing conversion fails only its own
+    task.
+
+    Parameters
+    ----------
+    export_destination_ids : List[int]
+        Export destination IDs
     scan_id : int
         Scan ID
+    transfer_mode : str
+        One of "SFTP" (per-file transfers), "TAR" (a single tar stream),
+        "ASYNC" (per-file transfers multiplexed by a single task, see
+        :class:`~accounts.models.utils.export_engine.ExportEngine`) or
+        "FAN_OUT" (each file read once and written to all export
+        destinations, see :func:`dispatch_fan_out`)
+    compression : str
+        Tar stream compression ("gz", "bz2" or "xz")
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+    compress : bool
+        Whether to gzip-compress NIfTI files (*.nii* to *.nii.gz*) while they
+        are uploaded, only applicable if *transfer_mode* is "SFTP"
+    progress_id : int
+        :class:`~accounts.models.export_progress.ExportProgress` ID of the
+        export job
+
+    Returns
+    -------
+    List[str]
+        Work unit task IDs, see :func:`dispatch_export`
+    """
+    items = resolve_export_items(scan_ids=[scan_id], file_format="NIfTI")
+    if TransferMode[transfer_mode.upper()] is TransferMode.FAN_OUT:
+        return dispatch_fan_out(
+            export_destination_ids,
+            items,
+            file_format="NIfTI",
+            n_chunks=1,
+            verify=verify,
+            progress_id=progress_id,
+        )
+    task_ids = []
+    for pk in export_destination_ids:
+        task_ids += dispatch_export(
+            pk,
+            items,
+            file_format="NIfTI",
+            n_chunks=1,
+            transfer_mode=transfer_mode,
+            compression=compression,
+            verify=verify,
+            compress=compress,
+            progress_id=progress_id,
+        )
+    return task_ids
+
+
+@shared_task(name="accounts.export-plan")
+def export_plan(
+    export_destination_id: Union[int, List[int]],
+    scan_ids: List[int] = None,
+    session_ids: List[int] = None,
+    subject_ids: List[int] = None,
+    run_ids: List[int] = None,
+    file_format: Union[str, List[str]] = "DICOM",
+    n_chunks: int = EXPORT_CHUNKS,
+    transfer_mode: str = TransferMode.SFTP.name,
+    compression: str = None,
+    verify: str = None,
+    compress: bool = False,
+    dry_run: bool = False,
+    job_id: str = None,
+) -> Union[List[str], List[dict]]:
+    """
+    Plans the export of any mix of MRI scans, sessions, subjects and analysis
+    runs in a single pass, and dispatches the transfers as one group of
+    :func:`export_files` work units of roughly equal size per export
+    destination (or, in "FAN_OUT" mode, as one group of
+    :func:`export_fan_out` work units reading each file once for all
+    destinations). Scans requiring conversion to NIfTI do not hold back the
+    rest: their DICOM files are exported right away, and each of them is
+    converted and exported by a separate :func:`convert_and_export_scan`
+    task.
+
+    All work units report to a single
+    :class:`~accounts.models.export_progress.ExportProgress` record,
+    identified by the ID of the Celery task the export was requested by.
+
+    Parameters
+    ----------
+    export_destination_id : Union[int, List[int]]
+        Export destination ID(s)
+    scan_ids : List[int]
+        Scan IDs
+    session_ids : List[int]
+        MRI session IDs
+    subject_ids : List[int]
+        Subject IDs
+    run_ids : List[int]
+        Analysis run IDs
     file_format : Union[str, List[str]]
         Either DICOM or NIfTI or both
-    max_parallel : int
-        Maximal number of parallel processes
+    n_chunks : int
+        Number of work units per export destination
+    transfer_mode : str
+        One of "SFTP" (per-file transfers), "TAR" (a single tar stream),
+        "ASYNC" (per-file transfers multiplexed by a single task, see
+        :class:`~accounts.models.utils.export_engine.ExportEngine`) or
+        "FAN_OUT" (each file read once and written to all export
+        destinations, see :func:`dispatch_fan_out`)
+    compression : str
+        Tar stream compression ("gz", "bz2" or "xz")
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+    compress : bool
+        Whether to gzip-compress NIfTI files (*.nii* to *.nii.gz*) while they
+        are uploaded, only applicable if *transfer_mode* is "SFTP"
+    dry_run : bool
+        Whether to only estimate the export (see :func:`estimate_export`)
+        without transferring any files or converting scans to NIfTI
+    job_id : str
+        Export job identifier, defaults to this task's ID (tasks wrapping
+        this one, e.g. :func:`export_run`, pass their own ID)
+
+    Returns
+    -------
+    Union[List[str], List[dict]]
+        Work unit and conversion task IDs (see :func:`dispatch_export` and
+        :func:`convert_and_export_scan`), or an estimate per export
+        destination if *dry_run* is True
     """
-    # Split in case of multiple scans.
-    if isinstance(scan_id, Iterable):
-        try:
-            n_chunks = math.ceil(len(scan_id) / max_parallel)
-        except ZeroDivisionError:
-            # If `max_parallel` is set to 0, run all in parallel.
-            signatures = [
-                export_mri_scan.s(export_destination_id, pk, file_format)
-                for pk in scan_id
-            ]
-            group(signatures)()
-        else:
-            # Create the inputs for each separate execution and run in chunks.
-            inputs = (
-                (export_destination_id, pk, file_format) for pk in scan_id
+    scan_ids, session_ids = as_id_list(scan_ids), as_id_list(session_ids)
+    subject_ids = as_id_list(subject_ids)
+    items = resolve_export_items(
+        scan_ids=scan_ids,
+        session_ids=session_ids,
+        subject_ids=subject_ids,
+        run_ids=as_id_list(run_ids),
+        file_format=file_format,
+        convert=False,
+    )
+    unconverted_scans = Scan.objects.none()
+    if "nifti" in get_file_formats(file_format):
+        unconverted_scans = get_export_scans(
+            scan_ids, session_ids, subject_ids
+        ).filter(_nifti__isnull=True)
+    if dry_run:
+        unconverted = []
+        # Missing NIfTI files are approximated by the scans' DICOM files.
+        for scan in unconverted_scans:
+            paths = scan.get_file_paths(file_format="dicom")
+            unconverted += get_export_items(
+                (str(path), None) for path in paths
             )
-            chunks = export_mri_scan.chunks(inputs, n_chunks)
-            chunks.group().skew()()
-        finally:
-            return
-    # Split in case of multiple export destinations.
-    if isinstance(export_destination_id, Iterable):
-        signatures = [
-            export_mri_scan.s(pk, scan_id, file_format)
-            for pk in export_destination_id
-        ]
-        group(signatures)()
-        return
-    # Split in case of multiple file formats.
-    if isinstance(file_format, list):
-        # Fix list passed as a single string.
-        if len(file_format) == 1:
-            file_format = file_format.pop().split(",")
-        signatures = [
-            export_mri_scan.s(export_destination_id, scan_id, f)
-            for f in file_format
+        mode = TransferMode[transfer_mode.upper()]
+        return [
+            estimate_export(
+                pk,
+                items,
+                unconverted=unconverted,
+                n_parallel=n_chunks or EXPORT_CHUNKS,
+                compress=compress and mode is not TransferMode.TAR,
+            )
+            for pk in as_id_list(export_destination_id)
         ]
-        group(signatures)()
-        return
-    elif isinstance(file_format, str):
-        file_format = file_format.split(",")
-        if len(file_format) > 1:
-            export_mri_scan.delay(export_destination_id, scan_id, file_format)
-            return
-        else:
-            file_format = file_format.pop()
-    file_format = file_format.lower()
-    # Create an iterable of file paths.
-    scan = Scan.objects.get(id=scan_id)
-    files = [
-        str(path) for path in scan.get_file_paths(file_format=file_format)
+    # Called directly by a wrapping task, this task's request has no ID.
+    if job_id is None and current_task:
+        job_id = current_task.request.id
+    progress, _ = ExportProgress.objects.get_or_create(
+        job_id=job_id or str(uuid.uuid4())
+    )
+    # Conversions are counted first, so that the job is not considered
+    # finished once the other work units are.
+    unconverted_ids = list(unconverted_scans.values_list("id", flat=True))
+    ExportProgress.objects.add_totals(
+        progress.id, n_tasks=len(unconverted_ids)
+    )
+    task_ids = []
+    if TransferMode[transfer_mode.upper()] is TransferMode.FAN_OUT:
+        task_ids += dispatch_fan_out(
+            as_id_list(export_destination_id),
+            items,
+            file_format=file_format,
+            n_chunks=n_chunks or EXPORT_CHUNKS,
+            verify=verify,
+            progress_id=progress.id,
+        )
+    else:
+        for pk in as_id_list(export_destination_id):
+            task_ids += dispatch_export(
+                pk,
+                items,
+                file_format=file_format,
+                n_chunks=n_chunks or EXPORT_CHUNKS,
+                transfer_mode=transfer_mode,
+                compression=compression,
+                verify=verify,
+                compress=compress,
+                progress_id=progress.id,
+            )
+    # Scans lacking NIfTI files are converted in parallel, each exported as
+    # soon as it is ready.
+    signatures = [
+        convert_and_export_scan.s(
+            as_id_list(export_destination_id),
+            scan_id,
+            transfer_mode=transfer_mode,
+            compression=compression,
+            verify=verify,
+            compress=compress,
+            progress_id=progress.id,
+        ).set(task_id=str(uuid.uuid4()))
+        for scan_id in unconverted_ids
     ]
-    export_files.delay(export_destination_id, files)
+    if signatures:
+        group(signatures).apply_async()
+        task_ids += [signature.id for signature in signatures]
+    # Nothing may have been dispatched (e.g. all files are in flight).
+    ExportProgress.objects.finish_if_done(progress.id)
+    return task_ids
+
+
+@shared_task(bind=True, name="accounts.export-run-results")
+def export_run(
+    self,
+    export_destination_id: int,
+    run_id: int,
+    max_parallel: int = 3,
+    transfer_mode: str = TransferMode.SFTP.name,
+    compression: str = None,
+    verify: str = None,
+    compress: bool = False,
+    dry_run: bool = False,
+):
+    """
+    Exports analysis run results to the specified export destination(s), see
+    :func:`export_plan`.
+
+    Parameters
+    ----------
+    export_destination_id : int
+        Export destination ID(s)
+    run_id : int
+        Run ID(s)
+    max_parallel : int
+        Number of work units per export destination
+    transfer_mode : str
+        One of "SFTP" (per-file transfers), "TAR" (a single tar stream),
+        "ASYNC" (per-file transfers multiplexed by a single task, see
+        :class:`~accounts.models.utils.export_engine.ExportEngine`) or
+        "FAN_OUT" (each file read once and written to all export
+        destinations, see :func:`dispatch_fan_out`)
+    compression : str
+        Tar stream compression ("gz", "bz2" or "xz")
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+    compress : bool
+        Whether to gzip-compress NIfTI files (*.nii* to *.nii.gz*) while they
+        are uploaded, only applicable if *transfer_mode* is "SFTP"
+    dry_run : bool
+        Whether to only estimate the export, see :func:`export_plan`
+    """
+    return export_plan(
+        export_destination_id,
+        run_ids=as_id_list(run_id),
+        n_chunks=max_parallel,
+        transfer_mode=transfer_mode,
+        compression=compression,
+        verify=verify,
+        compress=compress,
+        dry_run=dry_run,
+        job_id=self.request.id,
+    )
+
+
+@shared_task(bind=True, name="accounts.export-mri-scan")
+def export_mri_scan(
+    self,
+    export_destination_id: int,
+    scan_id: int,
+    file_format: Union[str, List[str]] = "DICOM",
+    max_parallel: int = 3,
+    transfer_mode: str = TransferMode.SFTP.name,
+    compression: str = None,
+    verify: str = None,
+    compress: bool = False,
+    dry_run: bool = False,
+):
+    """
+    Exports MRI scans to the specified export destination(s), see
+    :func:`export_plan`.
+
+    Parameters
+    ----------
+    export_destination_id : int
+        Export destination ID(s)
+    scan_id : int
+        Scan ID(s)
+    file_format : Union[str, List[str]]
+        Either DICOM or NIfTI or both
+    max_parallel : int
+        Number of work units per export destination
+    transfer_mode : str
+        One of "SFTP" (per-file transfers), "TAR" (a single tar stream),
+        "ASYNC" (per-file transfers multiplexed by a single task, see
+        :class:`~accounts.models.utils.export_engine.ExportEngine`) or
+        "FAN_OUT" (each file read once and written to all export
+        destinations, see :func:`dispatch_fan_out`)
+    compression : str
+        Tar stream compression ("gz", "bz2" or "xz")
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+    compress : bool
+        Whether to gzip-compress NIfTI files (*.nii* to *.nii.gz*) while they
+        are uploaded, only applicable if *transfer_mode* is "SFTP"
+    dry_run : bool
+        Whether to only estimate the export, see :func:`export_plan`
+    """
+    return export_plan(
+        export_destination_id,
+        scan_ids=as_id_list(scan_id),
+        file_format=file_format,
+        n_chunks=max_parallel,
+        transfer_mode=transfer_mode,
+        compression=compression,
+        verify=verify,
+        compress=compress,
+        dry_run=dry_run,
+        job_id=self.request.id,
+    )
 
 
-@shared_task(name="accounts.export-mri-session")
+@shared_task(bind=True, name="accounts.export-mri-session")
 def export_mri_session(
+    self,
     export_destination_id: int,
     session_id: int,
     file_format: Union[str, List[str]] = "DICOM",
     max_parallel: int = 3,
     max_parallel_scans: int = 3,
     skew: bool = True,
+    transfer_mode: str = TransferMode.SFTP.name,
+    compression: str = None,
+    verify: str = None,
+    compress: bool = False,
+    dry_run: bool = False,
 ):
     """
-    Export a single session's DICOM images to some remote location.
+    Export MRI sessions to the specified export destination(s), see
+    :func:`export_plan`.
 
     Parameters
     ----------
     export_destination_id : int
-        Export destination ID
+        Export destination ID(s)
     session_id : int
-        Session ID
+        Session ID(s)
     file_format : Union[str, List[str]]
         Either DICOM or NIfTI or both
     max_parallel : int
-        Maximal number of parallel processes
+        Number of work units per export destination
+    max_parallel_scans : int
+        Ignored, kept for backwards compatibility
+    skew : bool
+        Ignored, kept for backwards compatibility
+    transfer_mode : str
+        One of "SFTP" (per-file transfers), "TAR" (a single tar stream),
+        "ASYNC" (per-file transfers multiplexed by a single task, see
+        :class:`~accounts.models.utils.export_engine.ExportEngine`) or
+        "FAN_OUT" (each file read once and written to all export
+        destinations, see :func:`dispatch_fan_out`)
+    compression : str
+        Tar stream compression ("gz", "bz2" or "xz")
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+    compress : bool
+        Whether to gzip-compress NIfTI files (*.nii* to *.nii.gz*) while they
+        are uploaded, only applicable if *transfer_mode* is "SFTP"
+    dry_run : bool
+        Whether to only estimate the export, see :func:`export_plan`
     """
-    # Split in case of multiple sessions.
-    if isinstance(session_id, Iterable):
-        try:
-            n_chunks = math.ceil(len(session_id) / max_parallel)
-        except ZeroDivisionError:
-            # If `max_parallel` is set to 0, run all in parallel.
-            signatures = [
-                export_mri_session.s(
-                    export_destination_id,
-                    pk,
-                    file_format=file_format,
-                    max_parallel_scans=max_parallel_scans,
-                )
-                for pk in session_id
-            ]
-            group(signatures)()
-        else:
-            # Create the inputs for each separate execution and run in chunks.
-            inputs = (
-                (
-                    export_destination_id,
-                    pk,
-                    file_format,
-                    max_parallel,
-                    max_parallel_scans,
-                )
-                for pk in session_id
-            )
-            chunks = export_mri_session.chunks(inputs, n_chunks)
-            grouped = chunks.group()
-            if skew:
-                grouped.skew()()
-            else:
-                grouped()
-        finally:
-            return
-    # Split in case of multiple export destinations.
-    if isinstance(export_destination_id, Iterable):
-        signatures = [
-            export_mri_session.s(
-                pk,
-                session_id,
-                file_format=file_format,
-                max_parallel=max_parallel,
-                max_parallel_scans=max_parallel_scans,
-                skew=skew,
-            )
-            for pk in export_destination_id
-        ]
-        group(signatures)()
-        return
-    # Split in case of multiple file formats.
-    if isinstance(file_format, list):
-        # Fix list passed as a single string.
-        if len(file_format) == 1:
-            file_format = file_format.pop().split(",")
-        signatures = [
-            export_mri_session.s(
-                export_destination_id,
-                session_id,
-                file_format=f,
-                max_parallel=max_parallel,
-                max_parallel_scans=max_parallel_scans,
-                skew=skew,
-            )
-            for f in file_format
-        ]
-        group(signatures)()
-        return
-    elif isinstance(file_format, str):
-        file_format = file_format.split(",")
-        if len(file_format) > 1:
-            export_mri_session.delay(
-                export_destination_id,
-                session_id,
-                file_format=file_format,
-                max_parallel=max_parallel,
-                max_parallel_scans=max_parallel_scans,
-                skew=skew,
-            )
-            return
-        else:
-            file_format = file_format.pop()
-    file_format = file_format.lower()
-    # Create an iterable of file paths.
-    session = Session.objects.get(id=session_id)
-    if file_format == "nifti":
-        missing_nifti = session.scan_set.filter(_nifti__isnull=True)
-        if missing_nifti.exists():
-            session.scan_set.convert_to_nifti(
-                force=False, persistent=True, progressbar=False
-            )
-    scan_ids = session.scan_set.values_list("id", flat=True)
-    export_mri_scan.delay(
+    return export_plan(
         export_destination_id,
-        list(scan_ids),
+        session_ids=as_id_list(session_id),
         file_format=file_format,
-        max_parallel=max_parallel_scans,
+        n_chunks=max_parallel,
+        transfer_mode=transfer_mode,
+        compression=compression,
+        verify=verify,
+        compress=compress,
+        dry_run=dry_run,
+        job_id=self.request.id,
     )
 
 
-@shared_task(name="accounts.export-subject-mri-data")
+@shared_task(bind=True, name="accounts.export-subject-mri-data")
 def export_subject_mri_data(
+    self,
     export_destination_id: int,
-    subject_id: int,
+    subject_id: int = None,
     file_format: Union[str, List[str]] = "DICOM",
     max_parallel: int = 3,
     max_parallel_sessions: int = 3,
     max_parallel_scans: int = 3,
     skew: bool = True,
+    transfer_mode: str = TransferMode.SFTP.name,
+    compression: str = None,
+    verify: str = None,
+    compress: bool = False,
+    dry_run: bool = False,
+    subject_filters: dict = None,
+    user_id: int = None,
 ):
     """
-    Export a single subject's MRI data to some remote location.
+    Export subjects' MRI data to the specified export destination(s), see
+    :func:`export_plan`. Cohorts may be given by *subject_filters* rather
+    than by listing their subject IDs, and are then resolved with a single
+    query when the task runs.
 
     Parameters
     ----------
     export_destination_id : int
-        Export destination ID
+        Export destination ID(s)
     subject_id : int
-        Subject ID
+        Subject ID(s), optional if *subject_filters* is provided
     file_format : Union[str, List[str]]
         Either DICOM or NIfTI or both
     max_parallel : int
-        Maximal number of parallel processes
+        Number of work units per export destination
+    max_parallel_sessions : int
+        Ignored, kept for backwards compatibility
+    max_parallel_scans : int
+        Ignored, kept for backwards compatibility
+    skew : bool
+        Ignored, kept for backwards compatibility
+    transfer_mode : str
+        One of "SFTP" (per-file transfers), "TAR" (a single tar stream),
+        "ASYNC" (per-file transfers multiplexed by a single task, see
+        :class:`~accounts.models.utils.export_engine.ExportEngine`) or
+        "FAN_OUT" (each file read once and written to all export
+        destinations, see :func:`dispatch_fan_out`)
+    compression : str
+        Tar stream compression ("gz", "bz2" or "xz")
+    verify : str
+        Checksum verification mode ("REMOTE" or "FILE"), see
+        :meth:`~accounts.models.export_destination.ExportDestination.verify_checksums`
+    compress : bool
+        Whether to gzip-compress NIfTI files (*.nii* to *.nii.gz*) while they
+        are uploaded, only applicable if *transfer_mode* is "SFTP"
+    dry_run : bool
+        Whether to only estimate the export, see :func:`export_plan`
+    subject_filters : dict
+        :class:`~research.filters.subject_filter.SubjectFilter` query
+        parameters selecting (additional) subjects to export
+    user_id : int
+        ID of the requesting user, restricting *subject_filters* to the
+        subjects the user collaborates on (no subjects match if None)
     """
-    if isinstance(subject_id, Iterable):
-        try:
-            n_chunks = math.ceil(len(subject_id) / max_parallel)
-        except ZeroDivisionError:
-            # If `max_parallel` is set to 0, run all in parallel.
-            signatures = [
-                export_subject_mri_data.s(
-                    export_destination_id,
-                    pk,
-                    file_format=file_format,
-                    max_parallel_sessions=max_parallel_sessions,
-                    max_parallel_scans=max_parallel_scans,
-                    skew=skew,
-                )
-                for pk in subject_id
-            ]
-            group(signatures)()
-        else:
-            # Create the inputs for each separate execution and run in chunks.
-            inputs = (
-                (
-                    export_destination_id,
-                    pk,
-                    file_format,
-                    max_parallel,
-                    max_parallel_sessions,
-                    max_parallel_scans,
-                    skew,
-                )
-                for pk in subject_id
-            )
-            chunks = export_subject_mri_data.chunks(inputs, n_chunks)
-            grouped = chunks.group()
-            if skew:
-                grouped.skew()()
-            grouped()
-    else:
-        subject = Subject.objects.get(id=subject_id)
-        sessions_ids = list(
-            subject.mri_session_set.values_list("id", flat=True)
-        )
-        export_mri_session.delay(
-            export_destination_id,
-            sessions_ids,
-            file_format=file_format,
-            max_parallel=max_parallel_sessions,
-            max_parallel_scans=max_parallel_scans,
-            skew=skew,
+    subject_ids = as_id_list(subject_id)
+    if subject_filters is not None:
+        user = User.objects.filter(id=user_id).first() if user_id else None
+        subjects = filter_subjects(subject_filters, user=user)
+        subject_ids += subjects.order_by().values_list("id", flat=True)
+    return export_plan(
+        export_destination_id,
+        subject_ids=list(set(subject_ids)),
+        file_format=file_format,
+        n_chunks=max_parallel,
+        transfer_mode=transfer_mode,
+        compression=compression,
+        verify=verify,
+        compress=compress,
+        dry_run=dry_run,
+        job_id=self.request.id,
+    )
+
+
+@shared_task(name="accounts.benchmark-export-destination")
+def benchmark_export_destination(
+    export_destination_id: int, size: int = DEFAULT_BENCHMARK_SIZE
+) -> List[dict]:
+    """
+    Benchmarks the candidate transport profiles against an export destination
+    and stores the fastest one, see
+    :meth:`~accounts.models.export_destination.ExportDestination.benchmark_transport`.
+
+    Parameters
+    ----------
+    export_destination_id : int
+        Export destination ID
+    size : int
+        Probe file size in bytes
+
+    Returns
+    -------
+    List[dict]
+        Benchmarked profiles with their throughput in bytes per second
+    """
+    export_destination = ExportDestination.objects.get(
+        id=export_destination_id
+    )
+    return export_destination.benchmark_transport(size=size)
+
+
+@shared_task(name="accounts.probe-export-destinations")
+def probe_export_destinations() -> dict:
+    """
+    Probes the health of all export destinations in parallel and records the
+    results (see
+    :class:`~accounts.models.export_destination_health.ExportDestinationHealth`),
+    which are served by the API without connecting to the destinations and
+    consulted by export tasks before they start. Scheduled periodically by
+    Celery beat, see the EXPORT_HEALTH_INTERVAL setting.
+
+    Returns
+    -------
+    dict
+        Whether each destination is healthy by ID
+    """
+    export_destinations = list(ExportDestination.objects.order_by("id"))
+    if not export_destinations:
+        return {}
+    with ThreadPoolExecutor(max_workers=get_health_workers()) as pool:
+        results = pool.map(
+            ExportDestination.check_health, export_destinations
         )
+        healthy = {}
+        for export_destination, result in zip(export_destinations, results):
+            health = ExportDestinationHealth.objects.record(
+                export_destination.id, **result
+            )
+            healthy[export_destination.id] = health.is_healthy
+    return healthy
+
+
+@shared_task(name="accounts.prune-task-lineage")
+def prune_task_lineage(days: int = LINEAGE_RETENTION_DAYS) -> int:
+    """
+    Deletes the lineage of tasks published more than *days* days ago, see
+    :class:`~accounts.models.task_lineage.TaskLineage`. Scheduled daily by
+    Celery beat.
+
+    Parameters
+    ----------
+    days : int
+        Retention period in days
+
+    Returns
+    -------
+    int
+        Number of deleted records
+    """
+    before = timezone.now() - timedelta(days=days)
+    return TaskLineage.objects.prune(before)
@@ -0,0 +1,36 @@
+import gzip
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from accounts.models.utils.compression import (
+    CompressingReader,
+    get_compressed_destination,
+)
+from django.test import SimpleTestCase
+
+
+class CompressionTestCase(SimpleTestCase):
+    def test_compressed_destination(self):
+        cases = [
+            ("a.nii", "/export/a.nii", "/export/a.nii.gz"),
+            ("a.nii", "/export/a.nii.gz", "/export/a.nii.gz"),
+            ("a.dcm", "/export/a.dcm", "/export/a.dcm"),
+        ]
+        for source, destination, expected in cases:
+            result = get_compressed_destination(source, Path(destination))
+            self.assertEqual(result, Path(expected))
+
+    def test_compressing_reader(self):
+        data = bytes(range(256)) * 1000
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            reader = CompressingReader(
+                io.BytesIO(data), executor, block_size=10000, max_pending=3
+            )
+            chunks = []
+            while True:
+                chunk = reader.read(3000)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        self.assertEqual(gzip.decompress(b"".join(chunks)), data)
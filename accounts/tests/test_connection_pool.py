@@ -0,0 +1,54 @@
+from unittest import mock
+
+from accounts.models.utils.connection_pool import ConnectionPool
+from django.test import SimpleTestCase
+
+
+class MockExportDestination:
+    def __init__(self, pk: int = 1):
+        self.id = pk
+
+    def create_transport(self):
+        transport = mock.MagicMock()
+        transport.active = True
+        transport.is_authenticated.return_value = True
+        return transport
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(
+            idle_timeout=60, max_connections=2, acquire_timeout=0
+        )
+        self.destination = MockExportDestination()
+
+    def test_healthy_connection_is_reused(self):
+        connection = self.pool.acquire(self.destination)
+        self.pool.release(connection)
+        self.assertIs(self.pool.acquire(self.destination), connection)
+
+    def test_inactive_connection_is_not_reused(self):
+        connection = self.pool.acquire(self.destination)
+        connection.transport.active = False
+        self.pool.release(connection)
+        self.assertIsNot(self.pool.acquire(self.destination), connection)
+
+    def test_max_connections(self):
+        self.pool.acquire(self.destination)
+        self.pool.acquire(self.destination)
+        with self.assertRaises(RuntimeError):
+            self.pool.acquire(self.destination)
+
+    def test_max_connections_is_per_destination(self):
+        self.pool.acquire(self.destination)
+        self.pool.acquire(self.destination)
+        other = self.pool.acquire(MockExportDestination(pk=2))
+        self.assertEqual(other.destination_id, 2)
+
+    def test_idle_connection_is_evicted(self):
+        self.pool._idle_timeout = -1
+        connection = self.pool.acquire(self.destination)
+        transport = connection.transport
+        self.pool.release(connection)
+        transport.close.assert_called_once()
+        self.assertIsNot(self.pool.acquire(self.destination), connection)
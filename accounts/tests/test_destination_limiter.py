@@ -0,0 +1,66 @@
+import time
+
+from accounts.models import ExportDestination, ExportLease
+from accounts.models.utils.bandwidth_limiter import BandwidthLimiter
+from accounts.models.utils.destination_limiter import (
+    DestinationBusy,
+    DestinationLimiter,
+)
+from django.test import SimpleTestCase, TestCase
+
+
+class BandwidthLimiterTestCase(SimpleTestCase):
+    def test_unlimited(self):
+        limiter = BandwidthLimiter()
+        start = time.monotonic()
+        limiter.consume(10 ** 9)
+        self.assertLess(time.monotonic() - start, 0.05)
+
+    def test_rate(self):
+        limiter = BandwidthLimiter(rate=1000, burst=100)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.consume(100)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+
+class DestinationLimiterTestCase(TestCase):
+    def setUp(self):
+        self.export_destination = ExportDestination.objects.create(
+            title="Test",
+            ip="127.0.0.1",
+            username="user",
+            password="password",
+            destination="/export",
+            max_connections=2,
+            max_bandwidth=1000,
+        )
+
+    def create_limiter(self, task_id: str) -> DestinationLimiter:
+        return DestinationLimiter(
+            self.export_destination, task_id, ttl=600, wait=0
+        )
+
+    def test_max_connections(self):
+        with self.create_limiter("a"), self.create_limiter("b"):
+            with self.assertRaises(DestinationBusy):
+                self.create_limiter("c").acquire()
+        self.assertFalse(ExportLease.objects.exists())
+
+    def test_same_task_reacquires(self):
+        with self.create_limiter("a"), self.create_limiter("b"):
+            self.assertIsNotNone(self.create_limiter("a").acquire())
+
+    def test_expired_leases_are_ignored(self):
+        ExportLease.objects.acquire(self.export_destination, "a", ttl=-1)
+        with self.create_limiter("b"), self.create_limiter("c"):
+            self.assertEqual(ExportLease.objects.count(), 2)
+
+    def test_bandwidth_is_shared(self):
+        first = self.create_limiter("a")
+        with first:
+            self.assertEqual(first.bandwidth_limiter.rate, 1000)
+            with self.create_limiter("b") as second:
+                self.assertEqual(second.bandwidth_limiter.rate, 500)
+                limiter = self.export_destination.bandwidth_limiter
+                self.assertIs(limiter, second.bandwidth_limiter)
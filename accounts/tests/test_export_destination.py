@@ -0,0 +1,363 @@
+import gzip
+import hashlib
+import io
+import stat
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import paramiko
+from accounts.models.choices import ExportState
+from accounts.models.export_destination import ExportDestination
+from accounts.models.utils.connection_pool import CONNECTION_POOL
+from django.test import SimpleTestCase
+
+
+class MockSFTPClient:
+    """
+    Minimal in-memory stand-in for :class:`paramiko.SFTPClient`.
+    """
+
+    def __init__(self, directories: set, files: dict):
+        self.directories = directories
+        self.files = files
+        self.calls = []
+
+    def stat(self, path: str) -> paramiko.SFTPAttributes:
+        self.calls.append(("stat", path))
+        attributes = paramiko.SFTPAttributes()
+        if path in self.directories:
+            attributes.st_mode = stat.S_IFDIR
+        elif path in self.files:
+            attributes.st_mode = stat.S_IFREG
+            attributes.st_size = len(self.files[path])
+        else:
+            raise FileNotFoundError(path)
+        return attributes
+
+    def mkdir(self, path: str) -> None:
+        self.calls.append(("mkdir", path))
+        if path in self.directories:
+            raise OSError(path)
+        if str(Path(path).parent) not in self.directories:
+            raise FileNotFoundError(path)
+        self.directories.add(path)
+
+    def put(
+        self,
+        source: str,
+        destination: str,
+        callback=None,
+        confirm: bool = True,
+    ):
+        self.calls.append(("put", destination))
+        if str(Path(destination).parent) not in self.directories:
+            raise FileNotFoundError(destination)
+        self.files[destination] = Path(source).read_bytes()
+        if callback is not None:
+            size = len(self.files[destination])
+            callback(size, size)
+
+    def putfo(
+        self,
+        fileobj,
+        destination: str,
+        file_size: int = 0,
+        callback=None,
+        confirm: bool = True,
+    ):
+        self.calls.append(("put", destination))
+        if str(Path(destination).parent) not in self.directories:
+            raise FileNotFoundError(destination)
+        content = b""
+        while True:
+            data = fileobj.read(4)
+            if not data:
+                break
+            content += data
+        self.files[destination] = content
+
+    def open(self, path: str, mode: str = "r"):
+        files = self.files
+        if "r" in mode:
+            if path not in files:
+                raise FileNotFoundError(path)
+            return io.BytesIO(files[path])
+
+        class RemoteFile(io.BytesIO):
+            def __exit__(self, *exc_info):
+                previous = files.get(path, b"") if "a" in mode else b""
+                files[path] = previous + self.getvalue()
+
+            def write(self, data):
+                if isinstance(data, str):
+                    data = data.encode()
+                return super().write(data)
+
+        return RemoteFile()
+
+    def posix_rename(self, oldpath: str, newpath: str) -> None:
+        self.files[newpath] = self.files.pop(oldpath)
+
+    def listdir_attr(self, path: str) -> list:
+        self.calls.append(("listdir_attr", path))
+        if path not in self.directories:
+            raise FileNotFoundError(path)
+        listing = []
+        for file_path, content in self.files.items():
+            if str(Path(file_path).parent) == path:
+                attributes = paramiko.SFTPAttributes()
+                attributes.filename = Path(file_path).name
+                attributes.st_mode = stat.S_IFREG
+                attributes.st_size = len(content)
+                attributes.st_mtime = 0
+                listing.append(attributes)
+        return listing
+
+    def close(self) -> None:
+        pass
+
+    def count(self, name: str) -> int:
+        return sum(1 for call in self.calls if call[0] == name)
+
+
+class MockExecChannel:
+    """
+    Stand-in for :class:`paramiko.Channel` running exec requests locally.
+    """
+
+    def exec_command(self, command: str) -> None:
+        self.process = subprocess.Popen(
+            command,
+            shell=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def makefile(self, mode: str):
+        if "w" in mode:
+            return self.process.stdin
+        return self.process.stdout
+
+    def makefile_stderr(self, mode: str):
+        return self.process.stderr
+
+    def shutdown_write(self) -> None:
+        if not self.process.stdin.closed:
+            self.process.stdin.close()
+
+    def recv_exit_status(self) -> int:
+        return self.process.wait()
+
+    def close(self) -> None:
+        pass
+
+
+class ExportDestinationPutTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directories = {"/"}
+        self.files = {}
+        self.channels = []
+        self.export_destination = ExportDestination(
+            id=1,
+            ip="127.0.0.1",
+            username="user",
+            password="password",
+            destination="/export",
+        )
+        transport = mock.MagicMock()
+        transport.active = True
+        transport.is_authenticated.return_value = True
+        transport.open_session.side_effect = MockExecChannel
+        self.export_destination.create_transport = lambda: transport
+        self.export_destination.start_sftp_client = self.open_channel
+        self.local_directory = tempfile.TemporaryDirectory()
+        self.sources = []
+        for i in range(12):
+            path = Path(self.local_directory.name) / f"{i}.dcm"
+            path.write_bytes(b"0" * i)
+            self.sources.append(str(path))
+        self.destinations = [
+            f"/export/series_{i % 3}/{i}.dcm" for i in range(12)
+        ]
+
+    def tearDown(self):
+        self.export_destination.release_connection()
+        CONNECTION_POOL.close_all()
+        self.local_directory.cleanup()
+
+    def open_channel(self) -> MockSFTPClient:
+        channel = MockSFTPClient(self.directories, self.files)
+        self.channels.append(channel)
+        return channel
+
+    def test_put_iterable(self):
+        self.export_destination.put(self.sources, self.destinations)
+        self.assertEqual(set(self.files), set(self.destinations))
+
+    def test_put_parallel(self):
+        self.export_destination.put(
+            self.sources, self.destinations, workers=4
+        )
+        self.assertEqual(set(self.files), set(self.destinations))
+        self.assertEqual(len(self.channels), 4)
+
+    def test_put_parallel_skips_existing(self):
+        self.directories.update({"/export", "/export/series_0"})
+        self.files[self.destinations[0]] = b"existing"
+        self.export_destination.put(
+            self.sources, self.destinations, workers=4
+        )
+        self.assertEqual(self.files[self.destinations[0]], b"existing")
+        self.assertEqual(set(self.files), set(self.destinations))
+
+    def test_directories_are_created_once(self):
+        self.export_destination.put(self.sources, self.destinations)
+        channel = self.channels[0]
+        directory_stats = [
+            path
+            for name, path in channel.calls
+            if name == "stat" and path not in self.destinations
+        ]
+        self.assertEqual(len(directory_stats), len(set(directory_stats)))
+        self.assertEqual(channel.count("mkdir"), 4)
+
+    def test_directory_cache_is_invalidated_on_failure(self):
+        self.export_destination.put(self.sources[:1], self.destinations[:1])
+        self.assertTrue(self.export_destination.connection.directories)
+        self.directories.discard("/export/series_0")
+        with self.assertRaises(FileNotFoundError):
+            self.export_destination.put(
+                self.sources[3], self.destinations[3]
+            )
+        self.assertFalse(self.export_destination.connection.directories)
+
+    def test_existing_files_are_listed_per_directory(self):
+        self.directories.update({"/export", "/export/series_0"})
+        self.export_destination.put(self.sources, self.destinations)
+        channel = self.channels[0]
+        self.assertEqual(channel.count("listdir_attr"), 3)
+        file_stats = [
+            path
+            for name, path in channel.calls
+            if name == "stat" and path in self.destinations
+        ]
+        self.assertFalse(file_stats)
+
+    def test_skip_same_size(self):
+        self.directories.update({"/export", "/export/series_1"})
+        self.files[self.destinations[1]] = b"1"
+        self.files[self.destinations[4]] = b"x"
+        self.export_destination.put(
+            self.sources, self.destinations, force=True, skip_same_size=True
+        )
+        self.assertEqual(self.files[self.destinations[1]], b"1")
+        self.assertEqual(self.files[self.destinations[4]], b"0" * 4)
+
+    def test_put_tar(self):
+        with tempfile.TemporaryDirectory() as remote:
+            destinations = [
+                f"{remote}/series_{i % 3}/{i}.dcm" for i in range(12)
+            ]
+            self.export_destination.put_tar(
+                self.sources, destinations, compression="gz"
+            )
+            for source, destination in zip(self.sources, destinations):
+                content = Path(destination).read_bytes()
+                self.assertEqual(content, Path(source).read_bytes())
+
+    def test_put_tar_skips_existing(self):
+        with tempfile.TemporaryDirectory() as remote:
+            self.directories.add(remote)
+            self.files[f"{remote}/0.dcm"] = b"existing"
+            destinations = [f"{remote}/{i}.dcm" for i in range(12)]
+            callback = mock.MagicMock()
+            self.export_destination.put_tar(
+                self.sources, destinations, callback=callback
+            )
+            self.assertFalse(Path(destinations[0]).exists())
+            self.assertTrue(Path(destinations[1]).exists())
+            self.assertEqual(callback.call_count, 12)
+
+    def test_put_collects_statistics(self):
+        self.directories.update({"/export", "/export/series_0"})
+        self.files[self.destinations[0]] = b"existing"
+        self.export_destination.put(self.sources, self.destinations)
+        statistics = self.export_destination.statistics
+        self.assertEqual(statistics.n_files, 11)
+        self.assertEqual(statistics.n_skipped, 1)
+        self.assertEqual(statistics.n_bytes, sum(range(1, 12)))
+        self.assertEqual(sum(statistics.latency_histogram), 11)
+        self.assertIn("mkdir", statistics.durations)
+        self.assertIn("stat", statistics.durations)
+
+    def test_put_verify_writes_checksum_file(self):
+        callback = mock.MagicMock()
+        self.export_destination.put(
+            self.sources, self.destinations, callback=callback, verify="FILE"
+        )
+        content = self.files["/export/SHA256SUMS"].decode()
+        for source, destination in zip(self.sources, self.destinations):
+            digest = hashlib.sha256(Path(source).read_bytes()).hexdigest()
+            relative = Path(destination).relative_to("/export")
+            self.assertIn(f"{digest}  {relative}", content)
+        states = {call.args[2] for call in callback.call_args_list}
+        self.assertEqual(states, {ExportState.DONE})
+        self.assertEqual(callback.call_count, 12)
+
+    def test_write_checksum_file_replaces_entries(self):
+        first, second = Path("/export/a.dcm"), Path("/export/b/c.dcm")
+        self.export_destination.write_checksum_file({first: "1", second: "2"})
+        self.export_destination.write_checksum_file({first: "3"})
+        self.assertEqual(
+            self.files["/export/SHA256SUMS"].decode(), "3  a.dcm\n2  b/c.dcm\n"
+        )
+        self.assertEqual(list(self.files), ["/export/SHA256SUMS"])
+
+    def test_put_verify_reports_mismatches(self):
+        callback = mock.MagicMock()
+        remote = {Path(destination): "0" for destination in self.destinations}
+        with mock.patch.object(
+            self.export_destination, "remote_checksums", return_value=remote
+        ):
+            with self.assertRaises(OSError):
+                self.export_destination.put(
+                    self.sources,
+                    self.destinations,
+                    callback=callback,
+                    verify="REMOTE",
+                )
+        states = {call.args[2] for call in callback.call_args_list}
+        self.assertEqual(states, {ExportState.MISMATCH})
+
+    def test_put_tar_verify_remote(self):
+        with tempfile.TemporaryDirectory() as remote:
+            destinations = [f"{remote}/{i}.dcm" for i in range(12)]
+            callback = mock.MagicMock()
+            self.export_destination.put_tar(
+                self.sources, destinations, callback=callback, verify="REMOTE"
+            )
+            states = [call.args[2] for call in callback.call_args_list]
+            self.assertEqual(states, [ExportState.DONE] * 12)
+
+    def test_put_compress(self):
+        sources = []
+        for i in range(3):
+            path = Path(self.local_directory.name) / f"{i}.nii"
+            path.write_bytes(b"0" * 1000 * (i + 1))
+            sources.append(str(path))
+        sources.append(self.sources[1])
+        destinations = [f"/export/{Path(source).name}" for source in sources]
+        callback = mock.MagicMock()
+        self.export_destination.put(
+            sources, destinations, callback=callback, compress=True
+        )
+        for source in sources[:3]:
+            content = self.files[f"/export/{Path(source).name}.gz"]
+            expected = Path(source).read_bytes()
+            self.assertEqual(gzip.decompress(content), expected)
+        self.assertEqual(self.files["/export/1.dcm"], b"0")
+        reported = {call.args[1] for call in callback.call_args_list}
+        self.assertIn(Path("/export/0.nii.gz"), reported)
@@ -0,0 +1,131 @@
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from accounts.models import (
+    ExportDestination,
+    ExportDestinationHealth,
+    ExportManifest,
+)
+from accounts.models.choices import ExportBackend
+from accounts.models.utils.circuit_breaker import is_circuit_open
+from accounts.tasks import export_fan_out
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+
+@override_settings(
+    EXPORT_HEALTH_INTERVAL=60, EXPORT_CIRCUIT_FAILURE_THRESHOLD=3
+)
+class CircuitBreakerTestCase(SimpleTestCase):
+    def test_closed_below_threshold(self):
+        self.assertFalse(is_circuit_open(2, timezone.now()))
+
+    def test_open_at_threshold(self):
+        self.assertTrue(is_circuit_open(3, timezone.now()))
+
+    def test_closed_if_stale(self):
+        last_checked = timezone.now() - timedelta(minutes=10)
+        self.assertFalse(is_circuit_open(5, last_checked))
+        self.assertFalse(is_circuit_open(5, None))
+
+
+class CheckHealthTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_export_destination(self, path: str) -> ExportDestination:
+        return ExportDestination(
+            ip="127.0.0.1",
+            destination=path,
+            backend=ExportBackend.LOCAL.name,
+        )
+
+    def test_local_missing_destination(self):
+        path = os.path.join(self.directory.name, "a", "b")
+        result = self.get_export_destination(path).check_health()
+        self.assertTrue(result["reachable"])
+        self.assertTrue(result["authenticated"])
+        self.assertIsNotNone(result["handshake_latency"])
+
+    def test_local_not_writable(self):
+        os.chmod(self.directory.name, 0o500)
+        try:
+            export_destination = self.get_export_destination(
+                self.directory.name
+            )
+            result = export_destination.check_health()
+        finally:
+            os.chmod(self.directory.name, 0o700)
+        if os.geteuid() == 0:
+            self.skipTest("Permissions are not enforced for root.")
+        self.assertFalse(result["authenticated"])
+        self.assertTrue(result["error"])
+
+    def test_unreachable_host(self):
+        export_destination = ExportDestination(
+            id=1,
+            ip="127.0.0.1",
+            port=1,
+            username="user",
+            password="password",
+            destination="/export",
+        )
+        result = export_destination.check_health()
+        self.assertFalse(result["reachable"])
+        self.assertFalse(result["authenticated"])
+        self.assertTrue(result["error"])
+
+
+@override_settings(EXPORT_CIRCUIT_FAILURE_THRESHOLD=2)
+class ExportDestinationHealthTestCase(TestCase):
+    def setUp(self):
+        self.export_destination = ExportDestination.objects.create(
+            title="Test",
+            ip="127.0.0.1",
+            username="user",
+            password="password",
+            destination="/export",
+        )
+
+    def record(self, healthy: bool) -> ExportDestinationHealth:
+        return ExportDestinationHealth.objects.record(
+            self.export_destination.id,
+            reachable=healthy,
+            authenticated=healthy,
+            handshake_latency=0.1 if healthy else None,
+        )
+
+    def get_export_destination(self) -> ExportDestination:
+        return ExportDestination.objects.get(id=self.export_destination.id)
+
+    def test_never_probed_is_available(self):
+        self.assertTrue(self.get_export_destination().is_available)
+
+    def test_circuit_opens_and_closes(self):
+        self.record(False)
+        self.assertTrue(self.get_export_destination().is_available)
+        health = self.record(False)
+        self.assertEqual(health.consecutive_failures, 2)
+        self.assertFalse(self.get_export_destination().is_available)
+        health = self.record(True)
+        self.assertEqual(health.consecutive_failures, 0)
+        self.assertIsNotNone(health.last_success)
+        self.assertTrue(self.get_export_destination().is_available)
+
+    def test_fan_out_defers_unavailable_destination(self):
+        self.record(False)
+        self.record(False)
+        manifest = ExportManifest.objects.for_job(
+            self.export_destination, "a", [__file__], ["a.py"]
+        )
+        with mock.patch("accounts.tasks.group") as group:
+            task_ids = export_fan_out([manifest.id], use_history=False)
+        (signatures,), _ = group.call_args
+        self.assertEqual([signature.id for signature in signatures], task_ids)
+        self.assertEqual(signatures[0].kwargs["manifest_id"], manifest.id)
+        self.assertFalse(signatures[0].kwargs["use_history"])
@@ -0,0 +1,108 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from accounts.models.choices import ExportState
+from accounts.models.export_destination import ExportDestination
+from accounts.models.utils.connection_pool import CONNECTION_POOL
+from accounts.models.utils.export_engine import ByteBudget, ExportEngine
+from accounts.tests.test_export_destination import MockSFTPClient
+from django.test import SimpleTestCase
+
+
+class ByteBudgetTestCase(SimpleTestCase):
+    def test_budget(self):
+        async def scenario():
+            budget = ByteBudget(100)
+            first = await budget.acquire(60)
+            second = asyncio.ensure_future(budget.acquire(60))
+            await asyncio.sleep(0.01)
+            self.assertFalse(second.done())
+            await budget.release(first)
+            self.assertEqual(await second, 60)
+            # Reservations are capped by the budget's capacity.
+            await budget.release(60)
+            self.assertEqual(await budget.acquire(1000), 100)
+
+        asyncio.run(scenario())
+
+
+class ExportEngineTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directories = {"/"}
+        self.files = {}
+        self.channels = []
+        self.local_directory = tempfile.TemporaryDirectory()
+        self.sources = []
+        for i in range(12):
+            path = Path(self.local_directory.name) / f"{i}.dcm"
+            path.write_bytes(b"0" * i)
+            self.sources.append(str(path))
+        self.export_destinations = [
+            self.create_export_destination(pk, f"/export_{pk}")
+            for pk in (1, 2)
+        ]
+
+    def tearDown(self):
+        for export_destination in self.export_destinations:
+            export_destination.release_connection()
+        CONNECTION_POOL.close_all()
+        self.local_directory.cleanup()
+
+    def create_export_destination(
+        self, pk: int, destination: str
+    ) -> ExportDestination:
+        export_destination = ExportDestination(
+            id=pk,
+            ip="127.0.0.1",
+            username="user",
+            password="password",
+            destination=destination,
+        )
+        transport = mock.MagicMock()
+        transport.active = True
+        transport.is_authenticated.return_value = True
+        export_destination.create_transport = lambda: transport
+        export_destination.start_sftp_client = self.open_channel
+        return export_destination
+
+    def open_channel(self) -> MockSFTPClient:
+        channel = MockSFTPClient(self.directories, self.files)
+        self.channels.append(channel)
+        return channel
+
+    def test_run_multiple_destinations(self):
+        callback = mock.MagicMock()
+        destinations = [f"series/{i}.dcm" for i in range(12)]
+        jobs = [
+            (export_destination, self.sources, destinations, callback)
+            for export_destination in self.export_destinations
+        ]
+        with ExportEngine(max_in_flight_bytes=1, channels=3) as engine:
+            engine.run(jobs)
+        expected = {
+            f"/export_{pk}/{destination}"
+            for pk in (1, 2)
+            for destination in destinations
+        }
+        self.assertEqual(set(self.files), expected)
+        states = {call.args[2] for call in callback.call_args_list}
+        self.assertEqual(states, {ExportState.DONE})
+        self.assertEqual(callback.call_count, 24)
+        self.assertEqual(len(self.channels), 6)
+
+    def test_run_raises_after_all_files(self):
+        self.directories.update({"/export_1", "/export_1/series"})
+        callback = mock.MagicMock()
+        destinations = [f"series/{i}.dcm" for i in range(12)]
+        export_destination = self.export_destinations[0]
+        jobs = [(export_destination, self.sources, destinations, callback)]
+        with mock.patch.object(
+            MockSFTPClient, "put", side_effect=OSError("failed")
+        ):
+            with ExportEngine() as engine:
+                with self.assertRaises(OSError):
+                    engine.run(jobs)
+        states = [call.args[2] for call in callback.call_args_list]
+        self.assertEqual(states, [ExportState.FAILED] * 12)
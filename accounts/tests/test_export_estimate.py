@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from accounts.models.utils.export_estimate import (
+    estimate_duration,
+    split_existing,
+)
+from django.test import SimpleTestCase
+
+
+class ExportEstimateTestCase(SimpleTestCase):
+    def test_estimate_duration(self):
+        self.assertEqual(estimate_duration(10, 1000, 100), 10)
+        self.assertEqual(estimate_duration(10, 1000, 100, latency=1), 20)
+        self.assertEqual(
+            estimate_duration(10, 1000, 100, latency=1, n_parallel=5), 12
+        )
+
+    def test_estimate_duration_unknown_throughput(self):
+        self.assertIsNone(estimate_duration(10, 1000, None))
+        self.assertEqual(estimate_duration(0, 0, None), 0)
+
+    def test_split_existing(self):
+        items = [(f"/local/{i}.dcm", None, i) for i in range(4)]
+        destinations = [f"/remote/{i}.dcm" for i in range(4)]
+        remote_files = {
+            Path("/remote/1.dcm"): (1, 0),
+            Path("/remote/3.dcm"): (3, 0),
+        }
+        existing, pending = split_existing(items, destinations, remote_files)
+        self.assertEqual(existing, [items[1], items[3]])
+        self.assertEqual(pending, [items[0], items[2]])
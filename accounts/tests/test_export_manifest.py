@@ -0,0 +1,291 @@
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from accounts.models import (
+    ExportDestination,
+    ExportLease,
+    ExportManifest,
+    ExportProgress,
+    ExportRequest,
+    ExportTaskFailure,
+)
+from accounts.models.choices import ExportBackend, ExportState
+from accounts.models.utils.connection_pool import CONNECTION_POOL
+from accounts.tasks import export_files
+from django.test import TestCase
+from django.utils import timezone
+
+
+class ExportManifestTestCase(TestCase):
+    def setUp(self):
+        self.export_destination = ExportDestination.objects.create(
+            title="Test",
+            ip="127.0.0.1",
+            username="user",
+            password="password",
+            destination="/export",
+        )
+        self.local_directory = tempfile.TemporaryDirectory()
+        self.sources = []
+        for i in range(5):
+            path = Path(self.local_directory.name) / f"{i}.dcm"
+            path.write_bytes(b"0" * i)
+            self.sources.append(str(path))
+        self.destinations = [f"{i}.dcm" for i in range(5)]
+
+    def tearDown(self):
+        self.local_directory.cleanup()
+
+    def create_manifest(self, job_id: str) -> ExportManifest:
+        return ExportManifest.objects.for_job(
+            self.export_destination, job_id, self.sources, self.destinations
+        )
+
+    def test_for_job_creates_entries(self):
+        manifest = self.create_manifest("a")
+        self.assertEqual(manifest.entry_set.count(), 5)
+        destinations = set(
+            manifest.entry_set.values_list("destination", flat=True)
+        )
+        expected = {f"/export/{i}.dcm" for i in range(5)}
+        self.assertEqual(destinations, expected)
+
+    def test_for_job_reuses_existing_manifest(self):
+        manifest = self.create_manifest("a")
+        self.assertEqual(self.create_manifest("a"), manifest)
+        self.assertEqual(manifest.entry_set.count(), 5)
+
+    def test_recorder_checkpoints_states(self):
+        manifest = self.create_manifest("a")
+        with manifest.recorder(batch_size=2) as recorder:
+            recorder(self.sources[0], "/export/0.dcm", ExportState.DONE)
+            recorder(self.sources[1], "/export/1.dcm", ExportState.FAILED)
+            recorder(self.sources[2], "/export/2.dcm", ExportState.DONE)
+        pending = manifest.get_pending_entries(use_history=False)
+        self.assertEqual(pending.count(), 3)
+        destinations = pending.values_list("destination", flat=True)
+        self.assertIn("/export/1.dcm", destinations)
+
+    def test_recorder_updates_progress(self):
+        progress = ExportProgress.objects.create(job_id="job")
+        ExportProgress.objects.add_totals(progress.id, n_files=5, n_bytes=10)
+        manifest = ExportManifest.objects.for_job(
+            self.export_destination,
+            "a",
+            self.sources,
+            self.destinations,
+            progress_id=progress.id,
+        )
+        with manifest.recorder(batch_size=2) as recorder:
+            recorder(self.sources[1], "/export/1.dcm", ExportState.DONE)
+            recorder(self.sources[2], "/export/2.dcm", ExportState.FAILED)
+            recorder(self.sources[3], "/export/3.dcm", ExportState.SKIPPED)
+        progress.refresh_from_db()
+        self.assertEqual(progress.n_files_done, 2)
+        self.assertEqual(progress.n_bytes_done, 4)
+        self.assertEqual(progress.n_files_failed, 1)
+        self.assertAlmostEqual(progress.fraction_done, 0.4)
+        self.assertFalse(progress.is_finished)
+        # A retry resuming from the manifest does not count files twice.
+        with manifest.recorder() as recorder:
+            recorder(self.sources[2], "/export/2.dcm", ExportState.DONE)
+            recorder(self.sources[4], "/export/4.dcm", ExportState.DONE)
+            recorder(self.sources[0], "/export/0.dcm", ExportState.DONE)
+        progress.refresh_from_db()
+        self.assertEqual(progress.n_files_done, 5)
+        self.assertEqual(progress.n_bytes_done, 10)
+        self.assertEqual(progress.n_files_failed, 0)
+        self.assertTrue(progress.is_finished)
+
+    def test_task_outcomes_summarize_job(self):
+        progress = ExportProgress.objects.create(job_id="job")
+        ExportProgress.objects.add_totals(progress.id, n_tasks=2)
+        manifest = ExportManifest.objects.for_job(
+            self.export_destination,
+            "a",
+            self.sources,
+            self.destinations,
+            progress_id=progress.id,
+        )
+        kwargs = {
+            "export_destination_id": self.export_destination.id,
+            "manifest_id": manifest.id,
+        }
+        export_files.on_success(None, "a", (), kwargs)
+        progress.refresh_from_db()
+        self.assertEqual(progress.n_tasks_done, 1)
+        self.assertIsNone(progress.finished)
+        export_files.on_failure(OSError("Failed"), "b", (), kwargs, None)
+        progress.refresh_from_db()
+        self.assertEqual(progress.n_tasks_failed, 1)
+        self.assertIsNotNone(progress.finished)
+        failure = ExportTaskFailure.objects.get(progress=progress)
+        self.assertEqual(failure.task_id, "b")
+        self.assertEqual(failure.task_name, export_files.name)
+        self.assertIn("Failed", failure.exception)
+
+    def test_unchanged_files_are_skipped_by_history(self):
+        manifest = self.create_manifest("a")
+        with manifest.recorder() as recorder:
+            for i, source in enumerate(self.sources):
+                recorder(source, f"/export/{i}.dcm", ExportState.DONE)
+        Path(self.sources[0]).write_bytes(b"changed")
+        pending = self.create_manifest("b").get_pending_entries()
+        self.assertEqual(
+            list(pending.values_list("destination", flat=True)),
+            ["/export/0.dcm"],
+        )
+
+    def test_history_skips_update_progress(self):
+        manifest = self.create_manifest("a")
+        with manifest.recorder() as recorder:
+            for i, source in enumerate(self.sources):
+                recorder(source, f"/export/{i}.dcm", ExportState.DONE)
+        progress = ExportProgress.objects.create(job_id="job")
+        ExportProgress.objects.add_totals(progress.id, n_files=5, n_bytes=10)
+        manifest = ExportManifest.objects.for_job(
+            self.export_destination,
+            "b",
+            self.sources,
+            self.destinations,
+            progress_id=progress.id,
+        )
+        self.assertFalse(manifest.get_pending_entries().exists())
+        progress.refresh_from_db()
+        self.assertEqual(progress.n_files_done, 5)
+        self.assertEqual(progress.n_bytes_done, 10)
+        self.assertTrue(progress.is_finished)
+
+    def test_exclude_in_flight(self):
+        manifest = self.create_manifest("a")
+        with manifest.recorder() as recorder:
+            recorder(self.sources[1], "/export/1.dcm", ExportState.FAILED)
+        items = [
+            (source, f"other/{i}.dcm" if i == 2 else destination, i)
+            for i, (source, destination) in enumerate(
+                zip(self.sources, self.destinations)
+            )
+        ]
+        since = timezone.now() - timedelta(hours=1)
+        # Pending files of a job that holds no connection slot are taken
+        # over (e.g. if its worker crashed).
+        remaining = ExportManifest.objects.exclude_in_flight(
+            self.export_destination, items, since
+        )
+        self.assertEqual(remaining, items)
+        ExportLease.objects.acquire(self.export_destination, "a", ttl=60)
+        remaining = ExportManifest.objects.exclude_in_flight(
+            self.export_destination, items, since
+        )
+        self.assertEqual(remaining, [items[1], items[2]])
+        since = timezone.now() + timedelta(hours=1)
+        remaining = ExportManifest.objects.exclude_in_flight(
+            self.export_destination, items, since
+        )
+        self.assertEqual(remaining, items)
+
+    def test_request_with_failures(self):
+        manifest = self.create_manifest("a")
+        request = ExportRequest.objects.create(
+            export_destination=self.export_destination,
+            key="key",
+            task_ids=["a"],
+        )
+        self.assertEqual(ExportRequest.objects.recent().get(), request)
+        self.assertFalse(request.has_failures())
+        with manifest.recorder() as recorder:
+            recorder(self.sources[1], "/export/1.dcm", ExportState.FAILED)
+        self.assertTrue(request.has_failures())
+
+    def test_mismatched_files_are_requested_again(self):
+        manifest = self.create_manifest("a")
+        request = ExportRequest.objects.create(
+            export_destination=self.export_destination,
+            key="key",
+            task_ids=["a"],
+        )
+        with manifest.recorder() as recorder:
+            for i, source in enumerate(self.sources):
+                state = ExportState.MISMATCH if i == 1 else ExportState.DONE
+                recorder(source, f"/export/{i}.dcm", state)
+        self.assertTrue(request.has_failures())
+        items = [
+            (source, destination, i)
+            for i, (source, destination) in enumerate(
+                zip(self.sources, self.destinations)
+            )
+        ]
+        since = timezone.now() - timedelta(hours=1)
+        remaining = ExportManifest.objects.exclude_in_flight(
+            self.export_destination, items, since
+        )
+        self.assertEqual(remaining, [items[1]])
+
+
+class ExportRetryTestCase(TestCase):
+    def setUp(self):
+        self.local_directory = tempfile.TemporaryDirectory()
+        self.remote_directory = tempfile.TemporaryDirectory()
+        self.export_destination = ExportDestination.objects.create(
+            title="Local",
+            ip="127.0.0.1",
+            username="user",
+            password="password",
+            destination=self.remote_directory.name,
+            backend=ExportBackend.LOCAL.name,
+        )
+        self.sources = []
+        for i in range(3):
+            path = Path(self.local_directory.name) / f"{i}.dcm"
+            path.write_bytes(bytes([i]) * 100)
+            self.sources.append(str(path))
+        self.manifest = ExportManifest.objects.for_job(
+            self.export_destination,
+            "a",
+            self.sources,
+            [f"{i}.dcm" for i in range(3)],
+        )
+
+    def tearDown(self):
+        self.export_destination.release_connection()
+        CONNECTION_POOL.close_all()
+        self.local_directory.cleanup()
+        self.remote_directory.cleanup()
+
+    def export(self):
+        export_files(
+            self.export_destination.id,
+            manifest_id=self.manifest.id,
+            verify="REMOTE",
+        )
+
+    def get_states(self) -> set:
+        return set(self.manifest.entry_set.values_list("state", flat=True))
+
+    def test_mismatched_files_are_reuploaded(self):
+        remote_checksums = ExportDestination.remote_checksums
+
+        def corrupt(host, paths):
+            # Corrupt the uploaded files (keeping their size) before hashing.
+            for path in paths:
+                Path(path).write_bytes(b"x" * Path(path).stat().st_size)
+            return remote_checksums(host, paths)
+
+        with mock.patch.object(
+            ExportDestination,
+            "remote_checksums",
+            autospec=True,
+            side_effect=corrupt,
+        ):
+            with self.assertRaises(OSError):
+                self.export()
+        self.assertEqual(self.get_states(), {ExportState.MISMATCH.name})
+        self.export()
+        self.assertEqual(self.get_states(), {ExportState.DONE.name})
+        for i, source in enumerate(self.sources):
+            destination = Path(self.remote_directory.name) / f"{i}.dcm"
+            self.assertEqual(
+                destination.read_bytes(), Path(source).read_bytes()
+            )
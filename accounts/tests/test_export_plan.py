@@ -0,0 +1,83 @@
+import tempfile
+from pathlib import Path
+
+from accounts.models.utils.export_plan import (
+    PER_FILE_OVERHEAD,
+    get_export_items,
+    get_idempotency_key,
+    get_weight,
+    pack_by_size,
+)
+from django.test import SimpleTestCase
+
+
+class ExportPlanTestCase(SimpleTestCase):
+    def setUp(self):
+        self.local_directory = tempfile.TemporaryDirectory()
+        root = Path(self.local_directory.name)
+        self.files = []
+        # One large series and many small ones.
+        for i in range(40):
+            path = root / "large" / f"{i}.dcm"
+            path.parent.mkdir(exist_ok=True)
+            with open(path, "wb") as f:
+                f.truncate(100 * PER_FILE_OVERHEAD)
+            self.files.append((str(path), None))
+        for series in range(20):
+            for i in range(2):
+                path = root / f"small_{series}" / f"{i}.dcm"
+                path.parent.mkdir(exist_ok=True)
+                path.write_bytes(b"0")
+                self.files.append((str(path), f"small/{series}/{i}.dcm"))
+
+    def tearDown(self):
+        self.local_directory.cleanup()
+
+    def test_get_export_items(self):
+        files = self.files + self.files[:3] + [("/missing.dcm", None)]
+        items = get_export_items(files)
+        self.assertEqual(len(items), len(self.files))
+        self.assertEqual(items[0][2], 100 * PER_FILE_OVERHEAD)
+
+    def test_get_export_items_known_sizes(self):
+        sizes = {self.files[0][0]: 7, "/missing.dcm": 3}
+        items = get_export_items(
+            self.files[:2] + [("/missing.dcm", None)], sizes=sizes
+        )
+        sizes = [size for _, _, size in items]
+        self.assertEqual(sizes, [7, 100 * PER_FILE_OVERHEAD, 3])
+
+    def test_pack_by_size_is_balanced(self):
+        items = get_export_items(self.files)
+        chunks = pack_by_size(items, 4)
+        self.assertEqual(len(chunks), 4)
+        self.assertCountEqual(sum(chunks, []), items)
+        weights = [get_weight(chunk) for chunk in chunks]
+        self.assertLess(max(weights) / min(weights), 1.1)
+
+    def test_pack_by_size_keeps_small_directories_together(self):
+        items = get_export_items(self.files)
+        chunks = pack_by_size(items, 4)
+        for chunk in chunks:
+            directories = {Path(source).parent for source, _, _ in chunk}
+            for directory in directories:
+                if directory.name.startswith("small"):
+                    in_chunk = [
+                        item
+                        for item in chunk
+                        if Path(item[0]).parent == directory
+                    ]
+                    self.assertEqual(len(in_chunk), 2)
+
+    def test_pack_by_size_limits_chunks_to_items(self):
+        items = get_export_items(self.files[:2])
+        self.assertEqual(len(pack_by_size(items, 8)), 2)
+        self.assertEqual(pack_by_size([], 8), [])
+
+    def test_idempotency_key(self):
+        items = get_export_items(self.files)
+        key = get_idempotency_key(1, items, "dicom")
+        self.assertEqual(key, get_idempotency_key(1, items[::-1], "dicom"))
+        self.assertNotEqual(key, get_idempotency_key(2, items, "dicom"))
+        self.assertNotEqual(key, get_idempotency_key(1, items, "nifti"))
+        self.assertNotEqual(key, get_idempotency_key(1, items[1:], "dicom"))
@@ -0,0 +1,74 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from accounts.models import ExportDestination, ExportProgress
+from accounts.models.utils.export_plan import get_export_items
+from accounts.tasks import export_run
+from accounts.tests.utils import LoggedInTestCase
+from django.urls import reverse
+from rest_framework import status
+
+
+class ExportProgressTestCase(LoggedInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.export_destination = ExportDestination.objects.create(
+            title="Test",
+            ip="127.0.0.1",
+            username="user",
+            password="password",
+            destination="/export",
+        )
+        self.export_destination.users.add(self.user)
+        self.local_directory = tempfile.TemporaryDirectory()
+        files = []
+        for i in range(3):
+            path = Path(self.local_directory.name) / f"{i}.dcm"
+            path.write_bytes(b"0" * (i + 1))
+            files.append((str(path), None))
+        self.items = get_export_items(files)
+
+    def tearDown(self):
+        self.local_directory.cleanup()
+
+    def export(self):
+        # Work units are dispatched on commit, which never happens here.
+        with mock.patch(
+            "accounts.tasks.resolve_export_items", return_value=self.items
+        ):
+            return export_run.apply(args=(self.export_destination.id, 1))
+
+    def get_progress(self, job_id: str):
+        url = reverse("accounts:exportprogress-detail", args=(job_id,))
+        return self.client.get(url)
+
+    def test_progress_is_polled_by_request_id(self):
+        result = self.export()
+        response = self.get_progress(result.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["job_id"], result.id)
+        self.assertEqual(response.data["n_files_total"], 3)
+        self.assertEqual(response.data["n_bytes_total"], 6)
+        self.assertEqual(ExportProgress.objects.count(), 1)
+
+    def test_coalesced_request_reports_existing_job(self):
+        first = self.export()
+        second = self.export()
+        self.assertEqual(second.result, first.result)
+        progress = ExportProgress.objects.get(job_id=second.id)
+        self.assertEqual(progress.coalesced_into.job_id, first.id)
+        response = self.get_progress(second.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["job_id"], first.id)
+        self.assertEqual(response.data["n_files_total"], 3)
+        self.assertEqual(response.data["n_bytes_total"], 6)
+
+    def test_progress_of_other_destinations_is_hidden(self):
+        result = self.export()
+        self.export_destination.users.remove(self.user)
+        response = self.get_progress(result.id)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        url = reverse("accounts:exportprogress-failures", args=(result.id,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
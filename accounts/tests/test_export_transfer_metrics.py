@@ -0,0 +1,55 @@
+from accounts.models import ExportDestination, ExportTransferMetrics
+from accounts.models.utils.transfer_statistics import (
+    LATENCY_BUCKETS,
+    TransferStatistics,
+    get_latency_percentile,
+)
+from django.test import TestCase
+
+
+class ExportTransferMetricsTestCase(TestCase):
+    def setUp(self):
+        self.export_destination = ExportDestination.objects.create(
+            title="Test",
+            ip="127.0.0.1",
+            username="user",
+            password="password",
+            destination="/export",
+        )
+
+    def create_metrics(self, task_id: str, latencies: list):
+        statistics = TransferStatistics()
+        for latency in latencies:
+            statistics.record_file(100, latency)
+        statistics.record_skipped()
+        statistics.durations["transfer"] = 2
+        return ExportTransferMetrics.objects.from_statistics(
+            self.export_destination, statistics, task_id=task_id
+        )
+
+    def test_latency_percentile(self):
+        histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        histogram[0] = 9
+        histogram[10] = 1
+        self.assertEqual(get_latency_percentile(histogram, 50), 0.001)
+        self.assertEqual(
+            get_latency_percentile(histogram, 99), LATENCY_BUCKETS[10]
+        )
+        self.assertIsNone(get_latency_percentile([0, 0], 50))
+
+    def test_summarize(self):
+        self.create_metrics("a", [0.0005] * 4)
+        self.create_metrics("b", [0.003] * 4)
+        summary = ExportTransferMetrics.objects.all().summarize()
+        self.assertEqual(summary["n_transfers"], 2)
+        self.assertEqual(summary["n_files"], 8)
+        self.assertEqual(summary["n_skipped"], 2)
+        self.assertEqual(summary["n_bytes"], 800)
+        self.assertEqual(summary["throughput"], 200)
+        self.assertEqual(summary["latency"]["p50"], 0.001)
+        self.assertEqual(summary["latency"]["p90"], 0.004)
+
+    def test_summarize_empty(self):
+        summary = ExportTransferMetrics.objects.all().summarize()
+        self.assertEqual(summary["n_transfers"], 0)
+        self.assertIsNone(summary["throughput"])
@@ -0,0 +1,110 @@
+import builtins
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+from unittest import mock
+
+from accounts.models.choices import ExportBackend, ExportState
+from accounts.models.export_destination import ExportDestination
+from accounts.models.utils.connection_pool import CONNECTION_POOL
+from accounts.models.utils.fan_out import FanOutExporter
+from django.test import SimpleTestCase
+
+
+def record_state(states: list, source, destination, state: ExportState):
+    states.append(state)
+
+
+class FanOutExporterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.local_directory = tempfile.TemporaryDirectory()
+        self.remote_directory = tempfile.TemporaryDirectory()
+        self.sources = []
+        for i in range(12):
+            path = Path(self.local_directory.name) / f"{i}.dcm"
+            path.write_bytes(bytes([i]) * 100000)
+            self.sources.append(str(path))
+        self.export_destinations = []
+        for i in range(1, 3):
+            root = Path(self.remote_directory.name) / str(i)
+            export_destination = ExportDestination(
+                id=i,
+                ip="127.0.0.1",
+                destination=str(root),
+                backend=ExportBackend.LOCAL.name,
+            )
+            self.export_destinations.append(export_destination)
+
+    def tearDown(self):
+        for export_destination in self.export_destinations:
+            export_destination.release_connection()
+        CONNECTION_POOL.close_all()
+        self.local_directory.cleanup()
+        self.remote_directory.cleanup()
+
+    def get_destinations(self, export_destination):
+        root = Path(export_destination.destination)
+        return [root / Path(source).name for source in self.sources]
+
+    def get_jobs(self, results=None):
+        jobs = []
+        for export_destination in self.export_destinations:
+            callback = None
+            if results is not None:
+                states = results.setdefault(export_destination.id, [])
+                callback = partial(record_state, states)
+            destinations = self.get_destinations(export_destination)
+            jobs.append(
+                (export_destination, self.sources, destinations, callback)
+            )
+        return jobs
+
+    def test_run_reads_once(self):
+        with mock.patch(
+            "accounts.models.utils.fan_out.open",
+            create=True,
+            wraps=builtins.open,
+        ) as local_open:
+            unfinished = FanOutExporter(chunk_size=16384).run(self.get_jobs())
+        self.assertEqual(unfinished, [])
+        self.assertEqual(local_open.call_count, len(self.sources))
+        for export_destination in self.export_destinations:
+            destinations = self.get_destinations(export_destination)
+            for source, destination in zip(self.sources, destinations):
+                content = Path(destination).read_bytes()
+                self.assertEqual(content, Path(source).read_bytes())
+
+    def test_run_skips_existing_per_destination(self):
+        existing = self.get_destinations(self.export_destinations[0])[0]
+        existing.parent.mkdir(parents=True)
+        existing.write_bytes(b"existing")
+        results = {}
+        FanOutExporter().run(self.get_jobs(results))
+        first, second = self.export_destinations
+        self.assertEqual(results[first.id].count(ExportState.SKIPPED), 1)
+        self.assertEqual(results[first.id].count(ExportState.DONE), 11)
+        self.assertEqual(results[second.id], [ExportState.DONE] * 12)
+
+    def test_run_verify(self):
+        results = {}
+        FanOutExporter().run(self.get_jobs(results), verify="REMOTE")
+        for states in results.values():
+            self.assertEqual(states, [ExportState.DONE] * 12)
+
+    def test_run_detaches_slow_destination(self):
+        slow = self.export_destinations[1]
+        slow._get_throttle_callback = lambda: (
+            lambda n_bytes, total: time.sleep(0.05)
+        )
+        results = {}
+        exporter = FanOutExporter(chunk_size=16384, max_lag=2, lag_timeout=0.3)
+        unfinished = exporter.run(self.get_jobs(results))
+        self.assertEqual(unfinished, [slow])
+        fast = self.export_destinations[0]
+        self.assertEqual(results[fast.id], [ExportState.DONE] * 12)
+        # Files left pending are not partially written.
+        n_done = results[slow.id].count(ExportState.DONE)
+        self.assertLess(n_done, 12)
+        exported = list(Path(slow.destination).iterdir())
+        self.assertEqual(len(exported), n_done)
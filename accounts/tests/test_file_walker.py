@@ -0,0 +1,62 @@
+import os
+import tempfile
+from pathlib import Path
+
+from accounts.models.utils.file_walker import (
+    ROOT,
+    get_changed_directories,
+    walk,
+)
+from django.test import SimpleTestCase
+
+
+class FileWalkerTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        for i in range(30):
+            path = self.root / f"sub_{i % 3}" / f"level_{i % 2}" / f"{i}.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"0" * i)
+        (self.root / "top.txt").write_bytes(b"top")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_walk(self):
+        files, directories = walk(self.root, workers=4)
+        expected = sorted(
+            str(path.relative_to(self.root))
+            for path in self.root.rglob("*")
+            if path.is_file()
+        )
+        self.assertEqual([relative for relative, _, _ in files], expected)
+        for relative, size, mtime in files:
+            stat = os.stat(self.root / relative)
+            self.assertEqual(size, stat.st_size)
+            self.assertEqual(mtime, stat.st_mtime)
+        # Root, 3 subdirectories and 2 levels each.
+        self.assertEqual(len(directories), 10)
+        self.assertIn(ROOT, directories)
+
+    def test_get_changed_directories(self):
+        _, directories = walk(self.root)
+        self.assertEqual(get_changed_directories(self.root, directories), [])
+        changed = self.root / "sub_1" / "level_0"
+        new_file = changed / "new.txt"
+        new_file.write_bytes(b"new")
+        stat = os.stat(changed)
+        # Ensure a different modification time on coarse-grained filesystems.
+        os.utime(changed, (stat.st_atime, stat.st_mtime + 1))
+        self.assertEqual(
+            get_changed_directories(self.root, directories),
+            ["sub_1/level_0"],
+        )
+
+    def test_get_changed_directories_removed(self):
+        _, directories = walk(self.root)
+        for path in (self.root / "sub_2" / "level_1").iterdir():
+            path.unlink()
+        (self.root / "sub_2" / "level_1").rmdir()
+        changed = get_changed_directories(self.root, directories)
+        self.assertIn("sub_2/level_1", changed)
@@ -0,0 +1,109 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from accounts.models.choices import ExportBackend, ExportState
+from accounts.models.export_destination import ExportDestination
+from accounts.models.utils.connection_pool import CONNECTION_POOL
+from accounts.models.utils.local_backend import copy_file
+from django.test import SimpleTestCase
+from paramiko import SSHException
+
+
+class LocalBackendTestCase(SimpleTestCase):
+    def setUp(self):
+        self.local_directory = tempfile.TemporaryDirectory()
+        self.remote_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.remote_directory.name)
+        self.sources = []
+        for i in range(12):
+            path = Path(self.local_directory.name) / f"{i}.dcm"
+            path.write_bytes(bytes([i]) * 1000 * i)
+            self.sources.append(str(path))
+        self.destinations = [
+            str(self.root / f"series_{i % 3}" / f"{i}.dcm") for i in range(12)
+        ]
+        self.export_destination = ExportDestination(
+            id=1,
+            ip="127.0.0.1",
+            username="user",
+            password="password",
+            destination=str(self.root),
+            backend=ExportBackend.LOCAL.name,
+        )
+
+    def tearDown(self):
+        self.export_destination.release_connection()
+        CONNECTION_POOL.close_all()
+        self.local_directory.cleanup()
+        self.remote_directory.cleanup()
+
+    def assert_exported(self, destinations):
+        for source, destination in zip(self.sources, destinations):
+            content = Path(destination).read_bytes()
+            self.assertEqual(content, Path(source).read_bytes())
+
+    def test_copy_file(self):
+        source = self.sources[5]
+        for hardlink in (False, True):
+            destination = self.root / f"{hardlink}.dcm"
+            method = copy_file(source, destination, hardlink=hardlink)
+            self.assertEqual(
+                destination.read_bytes(), Path(source).read_bytes()
+            )
+            if hardlink:
+                self.assertEqual(method, "hardlink")
+            else:
+                self.assertNotEqual(method, "hardlink")
+
+    def test_put(self):
+        self.export_destination.put(
+            self.sources, self.destinations, workers=4
+        )
+        self.assert_exported(self.destinations)
+
+    def test_put_skips_existing(self):
+        self.export_destination.put(self.sources, self.destinations)
+        results = []
+        self.export_destination.put(
+            self.sources,
+            self.destinations,
+            callback=lambda *args: results.append(args[2]),
+        )
+        self.assertEqual(results, [ExportState.SKIPPED] * 12)
+
+    def test_put_tar(self):
+        self.export_destination.put_tar(self.sources, self.destinations)
+        self.assert_exported(self.destinations)
+
+    def test_put_verify(self):
+        results = []
+        self.export_destination.put(
+            self.sources,
+            self.destinations,
+            callback=lambda *args: results.append(args[2]),
+            verify="REMOTE",
+        )
+        self.assertEqual(results, [ExportState.DONE] * 12)
+
+    def test_put_verify_keeps_transfer_error(self):
+        # The last file fails to transfer, and so does verifying the others.
+        missing = str(Path(self.local_directory.name) / "missing.dcm")
+        with mock.patch.object(
+            ExportDestination,
+            "remote_checksums",
+            side_effect=SSHException("Verification failed"),
+        ):
+            with self.assertRaises(FileNotFoundError):
+                self.export_destination.put(
+                    self.sources[:-1] + [missing],
+                    self.destinations,
+                    verify="REMOTE",
+                )
+
+    def test_probe(self):
+        latency, throughput = self.export_destination.probe(size=1024 ** 2)
+        self.assertGreaterEqual(latency, 0)
+        self.assertTrue(throughput is None or throughput > 0)
+        # Probe files are removed.
+        self.assertEqual(list(self.root.iterdir()), [])
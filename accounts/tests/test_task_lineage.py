@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from accounts.filters.task_result import TaskResultFilter
+from accounts.models import TaskLineage
+from accounts.signals import record_published_task_lineage
+from django.test import TestCase
+from django.utils import timezone
+from django_celery_results.models import TaskResult
+
+
+class TaskLineageTestCase(TestCase):
+    def setUp(self):
+        # root -> child -> grandchild, and an unrelated task without lineage.
+        TaskLineage.objects.record("root", task_name="plan")
+        TaskLineage.objects.record("child", parent_id="root", root_id="root")
+        TaskLineage.objects.record(
+            "grandchild", parent_id="child", root_id="root"
+        )
+        for task_id in ("root", "child", "grandchild", "other"):
+            TaskResult.objects.create(task_id=task_id)
+
+    def filter(self, **params):
+        queryset = TaskResult.objects.all()
+        filtered = TaskResultFilter(data=params, queryset=queryset).qs
+        return set(filtered.values_list("task_id", flat=True))
+
+    def test_record_defaults_root_to_self(self):
+        lineage = TaskLineage.objects.get(task_id="root")
+        self.assertEqual(lineage.root_id, "root")
+        self.assertIsNone(lineage.parent_id)
+
+    def test_record_ignores_recorded_tasks(self):
+        TaskLineage.objects.record("child", parent_id="other")
+        lineage = TaskLineage.objects.get(task_id="child")
+        self.assertEqual(lineage.parent_id, "root")
+
+    def test_publish_signal(self):
+        headers = {"id": "new", "parent_id": "child", "root_id": "root"}
+        record_published_task_lineage(sender="export", headers=headers)
+        lineage = TaskLineage.objects.get(task_id="new")
+        self.assertEqual(lineage.task_name, "export")
+        self.assertEqual(lineage.parent_id, "child")
+
+    def test_filter_by_parent(self):
+        self.assertEqual(self.filter(parent="root"), {"child"})
+        self.assertEqual(self.filter(parent="NULL"), {"root", "other"})
+
+    def test_filter_by_root(self):
+        self.assertEqual(
+            self.filter(root="root"), {"root", "child", "grandchild"}
+        )
+
+    def test_prune(self):
+        TaskLineage.objects.filter(task_id="root").update(
+            created=timezone.now() - timedelta(days=2)
+        )
+        before = timezone.now() - timedelta(days=1)
+        self.assertEqual(TaskLineage.objects.prune(before), 1)
+        self.assertFalse(TaskLineage.objects.filter(task_id="root").exists())
@@ -0,0 +1,103 @@
+import io
+import os
+import socket
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import paramiko
+from accounts.benchmarks.sftp_server import SFTPStandIn
+from accounts.models.export_destination import ExportDestination
+from accounts.models.utils.transport_tuning import (
+    TRANSPORT_PROFILES,
+    get_supported_ciphers,
+    parse_ciphers,
+    put_blocks,
+)
+from django.test import SimpleTestCase
+
+
+class TransportTuningTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_parse_ciphers(self):
+        ciphers = parse_ciphers(" aes128-ctr, ,aes256-gcm@openssh.com,")
+        self.assertEqual(ciphers, ["aes128-ctr", "aes256-gcm@openssh.com"])
+        self.assertEqual(parse_ciphers(""), [])
+        self.assertEqual(parse_ciphers(None), [])
+
+    def test_get_supported_ciphers(self):
+        ciphers = ["unknown-cipher", "aes128-ctr"]
+        self.assertEqual(get_supported_ciphers(ciphers), ["aes128-ctr"])
+        client, server = socket.socketpair()
+        transport = paramiko.Transport(client)
+        try:
+            transport.get_security_options().ciphers = ["aes256-ctr"]
+            supported = get_supported_ciphers(
+                ["aes128-ctr", "aes256-ctr"], transport
+            )
+        finally:
+            transport.close()
+            server.close()
+        self.assertEqual(supported, ["aes256-ctr"])
+
+    def test_put_blocks(self):
+        data = os.urandom(1024 * 1024 + 123)
+        path = self.root / "blocks.bin"
+        progress = []
+        with SFTPStandIn() as server:
+            transport = paramiko.Transport((server.host, server.port))
+            try:
+                transport.connect(username="user", password="password")
+                sftp_client = paramiko.SFTPClient.from_transport(transport)
+                attributes = put_blocks(
+                    sftp_client,
+                    io.BytesIO(data),
+                    str(path),
+                    128 * 1024,
+                    file_size=len(data),
+                    callback=lambda n, total: progress.append(n),
+                )
+            finally:
+                transport.close()
+        self.assertEqual(path.read_bytes(), data)
+        self.assertEqual(attributes.st_size, len(data))
+        self.assertEqual(progress[-1], len(data))
+        self.assertEqual(len(progress), 9)
+
+    def test_put_blocks_confirms_size(self):
+        # The host reports a short write.
+        sftp_client = mock.MagicMock()
+        attributes = paramiko.SFTPAttributes()
+        attributes.st_size = 10
+        sftp_client.stat.return_value = attributes
+        with self.assertRaises(IOError):
+            put_blocks(sftp_client, io.BytesIO(b"0" * 20), "/remote", 8)
+
+    def test_benchmark_transport(self):
+        with SFTPStandIn() as server:
+            export_destination = ExportDestination(
+                id=-1,
+                ip=server.host,
+                port=server.port,
+                username="user",
+                password="password",
+                destination=str(self.root),
+            )
+            results = export_destination.benchmark_transport(
+                size=256 * 1024, save=False
+            )
+        names = [result["name"] for result in results]
+        self.assertIn("default", names)
+        self.assertLessEqual(len(results), len(TRANSPORT_PROFILES))
+        for result in results:
+            self.assertGreater(result["throughput"], 0)
+        # Probe files are removed.
+        self.assertEqual(list(self.root.iterdir()), [])
+        # Tuning fields are left untouched unless saved.
+        self.assertIsNone(export_destination.block_size)
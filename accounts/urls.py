@@ -11,6 +11,7 @@ router.register(r"laboratory", views.LaboratoryViewSet)
 router.register(r"profile", views.ProfileViewSet)
 router.register(r"user", views.UserViewSet)
 router.register(r"export_destination", views.ExportDestinationViewSet)
+router.register(r"export_progress", views.ExportProgressViewSet)
 router.register(r"task_result", views.TaskResultViewSet)
 
 
@@ -26,6 +27,11 @@ urlpatterns = [
         views.ExportDestinationViewSet.as_view({"POST": "export_instance"}),
         name="export_instance",
     ),
+    path(
+        "accounts/export_destination/estimate_instance/",
+        views.ExportDestinationViewSet.as_view({"POST": "estimate_instance"}),
+        name="estimate_instance",
+    ),
     path(
         "accounts/export_destination/<int:pk>/status/",
         views.ExportDestinationViewSet.as_view({"get": "get_status"}),
@@ -4,6 +4,7 @@
 for the :mod:`accounts` package.
 """
 from accounts.views.export_destination import ExportDestinationViewSet
+from accounts.views.export_progress import ExportProgressViewSet
 from accounts.views.group import GroupViewSet
 from accounts.views.laboratory import LaboratoryViewSet
 from accounts.views.profile import ProfileViewSet
@@ -1,12 +1,26 @@
 """
 Definition of the :class:`ExportDestinationViewSet` class.
 """
+from datetime import timedelta
+
 from accounts.filters import ExportDestinationFilter
 from accounts.models.export_destination import ExportDestination
+from accounts.models.export_destination_health import ExportDestinationHealth
+from accounts.models.export_transfer_metrics import ExportTransferMetrics
 from accounts.serializers.export_destination import ExportDestinationSerializer
-from accounts.tasks import export_mri_scan, export_mri_session, export_run
+from accounts.serializers.export_destination_health import (
+    ExportDestinationHealthSerializer,
+)
+from accounts.tasks import (
+    SERVER_EXPORT_ARGUMENTS,
+    benchmark_export_destination,
+    export_mri_scan,
+    export_mri_session,
+    export_run,
+    export_subject_mri_data,
+)
 from django.db.models import QuerySet
-from paramiko import SSHException
+from django.utils import timezone
 from pylabber.views.defaults import DefaultsMixin
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -16,8 +30,12 @@ from rest_framework.response import Response
 EXPORT_HANDLERS: dict = {
     "django_mri": {"Session": export_mri_session, "Scan": export_mri_scan},
     "django_analyses": {"Run": export_run},
+    "research": {"Subject": export_subject_mri_data},
 }
 
+#: Default rolling window (in days) of export destination metrics.
+DEFAULT_METRICS_WINDOW: int = 7
+
 
 class ExportDestinationViewSet(DefaultsMixin, viewsets.ModelViewSet):
     """
@@ -46,27 +64,132 @@ class ExportDestinationViewSet(DefaultsMixin, viewsets.ModelViewSet):
             instance_id = request.data.pop("instance_id")
         except KeyError:
             return Response(status.HTTP_400_BAD_REQUEST)
+        # Subject cohorts are restricted by the requesting user, see
+        # SubjectViewSet.export_files().
+        if any(key in request.data for key in SERVER_EXPORT_ARGUMENTS):
+            return Response(status=status.HTTP_400_BAD_REQUEST)
         handler = EXPORT_HANDLERS.get(app_label, {}).get(model_name)
         if handler:
+            # The export's progress may be followed by its job ID, see
+            # ExportProgressViewSet.
+            job_id = None
             try:
-                handler.delay(
+                job_id = handler.delay(
                     export_destination_id, instance_id, **self.request.data
-                )
+                ).id
             except AttributeError:
                 handler(
                     export_destination_id, instance_id, **self.request.data
                 )
             finally:
-                return Response(status.HTTP_200_OK)
+                return Response(data={"job_id": job_id})
         return Response(status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["POST"])
+    def estimate_instance(self, request: Request):
+        """
+        Starts estimating the export of an instance (a dry run of
+        :meth:`export_instance`): the number of files and bytes to export,
+        how many of them already exist in each export destination, and the
+        estimated export duration. Nothing is transferred and no scans are
+        converted to NIfTI. As the estimate connects to the destinations,
+        it runs as a task, whose result is the estimate. Returns the
+        estimate's task ID.
+        """
+        try:
+            app_label = request.data.pop("app_label")
+            model_name = request.data.pop("model_name")
+            export_destination_id = request.data.pop("export_destination_id")
+            instance_id = request.data.pop("instance_id")
+        except KeyError:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        # Subject cohorts are restricted by the requesting user, see
+        # SubjectViewSet.export_files().
+        if any(key in request.data for key in SERVER_EXPORT_ARGUMENTS):
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        handler = EXPORT_HANDLERS.get(app_label, {}).get(model_name)
+        if handler is None:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        kwargs = {**request.data, "dry_run": True}
+        result = handler.delay(export_destination_id, instance_id, **kwargs)
+        return Response(
+            data={"task_id": result.id}, status=status.HTTP_202_ACCEPTED
+        )
+
     @action(detail=True, methods=["get"])
     def get_status(self, request: Request, pk: int):
-        export_destination = ExportDestination.objects.get(id=pk)
+        """
+        Returns whether this destination passed its last health probe (see
+        :func:`~accounts.tasks.probe_export_destinations`), without
+        connecting to it. Destinations never probed, or not probed recently,
+        are reported as unavailable.
+        """
+        health = ExportDestinationHealth.objects.filter(
+            export_destination_id=pk
+        ).first()
+        healthy = (
+            health is not None and health.is_healthy and not health.is_stale
+        )
+        return Response(data=healthy)
+
+    @action(detail=True, methods=["get"])
+    def health(self, request: Request, pk: int):
+        """
+        Returns the last health probe result of this destination
+        (reachability, handshake latency, authentication and circuit breaker
+        state).
+        """
+        export_destination = self.get_object()
         try:
-            export_destination.sftp_client
-        except (RuntimeError, SSHException, ConnectionResetError):
-            status = False
+            health = export_destination.health
+        except ExportDestinationHealth.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        serializer = ExportDestinationHealthSerializer(health)
+        return Response(data=serializer.data)
+
+    @action(detail=True, methods=["POST"])
+    def benchmark_transport(self, request: Request, pk: int):
+        """
+        Starts benchmarking the candidate transport profiles (ciphers, SSH
+        compression, window, packet and block sizes) against this
+        destination, storing the fastest one once done. Returns the
+        benchmark's task ID.
+        """
+        export_destination = self.get_object()
+        kwargs = {}
+        if "size" in request.data:
+            try:
+                kwargs["size"] = int(request.data["size"])
+            except (TypeError, ValueError):
+                return Response(status=status.HTTP_400_BAD_REQUEST)
+        result = benchmark_export_destination.delay(
+            export_destination.id, **kwargs
+        )
+        return Response(
+            data={"task_id": result.id}, status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=True, methods=["get"])
+    def metrics(self, request: Request, pk: int):
+        """
+        Returns the export transfer metrics of this destination, aggregated
+        over a rolling window of *days* days (default 7) or for a single
+        *task_id*.
+        """
+        export_destination = self.get_object()
+        queryset = ExportTransferMetrics.objects.filter(
+            export_destination=export_destination
+        )
+        task_id = request.query_params.get("task_id")
+        if task_id:
+            queryset = queryset.filter(task_id=task_id)
         else:
-            status = True
-        return Response(data=status)
+            try:
+                days = float(
+                    request.query_params.get("days", DEFAULT_METRICS_WINDOW)
+                )
+            except ValueError:
+                return Response(status=status.HTTP_400_BAD_REQUEST)
+            since = timezone.now() - timedelta(days=days)
+            queryset = queryset.filter(created__gte=since)
+        return Response(data=queryset.summarize())
@@ -0,0 +1,92 @@
+"""
+Definition of the :class:`ExportProgressViewSet` class.
+"""
+from accounts.models.export_manifest_entry import (
+    FAILED_STATES,
+    ExportManifestEntry,
+)
+from accounts.models.export_progress import ExportProgress
+from accounts.models.export_task_failure import ExportTaskFailure
+from accounts.serializers.export_progress import ExportProgressSerializer
+from django.db.models import F, Q, QuerySet
+from pylabber.views.defaults import DefaultsMixin
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.request import Request
+
+
+class ExportProgressViewSet(DefaultsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint that allows the aggregated progress of export jobs to be
+    viewed, looked up by job ID (the Celery task ID of the export request),
+    so that the progress of a fanned-out export may be polled as a single
+    object. Jobs coalesced onto an identical request report the progress of
+    that request's job. Users may only view jobs exporting to destinations
+    they may export to.
+    """
+
+    queryset = ExportProgress.objects.order_by("-created")
+    serializer_class = ExportProgressSerializer
+    lookup_field = "job_id"
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        user = self.request.user
+        queryset = super().filter_queryset(queryset)
+        # Jobs exporting to destinations the user may export to.
+        destination_users = "manifest_set__export_destination__users"
+        return queryset.filter(
+            Q(**{destination_users: user})
+            | Q(**{f"coalesced_into__{destination_users}": user})
+        ).distinct()
+
+    def get_object(self) -> ExportProgress:
+        """
+        Returns the requested export job's progress, or that of the job it
+        coalesced onto if nothing was dispatched for it, see
+        :func:`~accounts.tasks.dispatch_export`.
+
+        Returns
+        -------
+        ExportProgress
+            Export progress
+        """
+        progress = super().get_object()
+        if progress.coalesced_into is not None and not progress.n_tasks_total:
+            return progress.coalesced_into
+        return progress
+
+    @action(detail=True, methods=["get"])
+    def failures(self, request: Request, job_id: str = None):
+        """
+        Returns the failed tasks of an export job, with their exception and
+        traceback, and the files that failed to transfer or verify
+        (paginated). Task failures are recorded whether or not task results
+        are stored, see :class:`~accounts.tasks.ExportUnit`.
+        """
+        progress = self.get_object()
+        tasks = (
+            ExportTaskFailure.objects.filter(progress=progress)
+            .order_by("created")
+            .values(
+                "task_id", "task_name", "exception", "traceback", "created"
+            )
+        )
+        files = (
+            ExportManifestEntry.objects.filter(
+                manifest__progress=progress, state__in=FAILED_STATES
+            )
+            .order_by("id")
+            .values(
+                "source",
+                "destination",
+                "size",
+                "state",
+                "modified",
+                export_destination=F("manifest__export_destination"),
+                task_id=F("manifest__job_id"),
+            )
+        )
+        page = self.paginate_queryset(files)
+        response = self.get_paginated_response(page)
+        response.data["tasks"] = list(tasks)
+        return response
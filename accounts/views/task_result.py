@@ -4,12 +4,16 @@ Definition of the :class:`TaskResultViewSet` class.
 from typing import Tuple
 
 from accounts.filters.task_result import TaskResultFilter
+from accounts.models.export_manifest_entry import ExportManifestEntry
+from accounts.models.task_lineage import TaskLineage
 from accounts.serializers.task_result import TaskResultSerializer
-from django.db.models import OuterRef, Subquery, QuerySet
+from django.db.models import F, OuterRef, Subquery, QuerySet
 from django_celery_results.models import TaskResult
 from pylabber.views.defaults import DefaultsMixin
 from pylabber.views.pagination import StandardResultsSetPagination
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.request import Request
 
 TASK_ORDERING_FIELDS: Tuple[str] = (
     "status",
@@ -18,9 +22,12 @@ TASK_ORDERING_FIELDS: Tuple[str] = (
     "worker",
     "date_created",
     "date_done",
+    "parent",
+    "root",
 )
-PARENT_QUERY: QuerySet = TaskResult.objects.filter(
-    meta__contains=OuterRef("task_id")
+#: Lineage of the outer task result, looked up by the unique task ID index.
+LINEAGE_QUERY: QuerySet = TaskLineage.objects.filter(
+    task_id=OuterRef("task_id")
 )
 
 
@@ -40,5 +47,30 @@ class TaskResultViewSet(DefaultsMixin, viewsets.ModelViewSet):
         return (
             super()
             .get_queryset()
-            .annotate(parent=Subquery(PARENT_QUERY.values("task_id")[:1]))
+            .annotate(
+                parent=Subquery(LINEAGE_QUERY.values("parent_id")[:1]),
+                root=Subquery(LINEAGE_QUERY.values("root_id")[:1]),
+            )
         )
+
+    @action(detail=True, methods=["get"])
+    def files(self, request: Request, pk: int = None):
+        """
+        Returns the files exported by an export task, paginated. Export tasks
+        receive their file lists by manifest reference rather than as task
+        arguments, see :func:`~accounts.tasks.export_files`.
+        """
+        task = self.get_object()
+        entries = (
+            ExportManifestEntry.objects.filter(manifest__job_id=task.task_id)
+            .order_by("id")
+            .values(
+                "source",
+                "destination",
+                "size",
+                "state",
+                export_destination=F("manifest__export_destination"),
+            )
+        )
+        page = self.paginate_queryset(entries)
+        return self.get_paginated_response(page)
@@ -12,6 +12,7 @@ from pathlib import Path
 
 # import django_heroku
 import environ
+from celery.schedules import crontab
 
 from django_mri.analysis.mri_interfaces import interfaces
 from django_mri.analysis.mri_output_parsers import MRI_OUTPUT_PARSERS
@@ -38,6 +39,7 @@ env = environ.Env(
     QUESTIONNAIRE_DATA_PATH=(str, ""),
     APP_IP=(str, "localhost"),
     TESTING_MODE=(bool, False),
+    EXPORT_SUMMARY_RESULTS=(bool, False),
 )
 environ.Env.read_env()
 
@@ -363,6 +365,9 @@ SSH_KNOWN_HOSTS = os.path.expanduser("~/.ssh/known_hosts")
 
 # accounts
 EXPORT_MUTATORS = EXPORT_MUTATORS
+EXPORT_HEALTH_INTERVAL = 60
+# Store a per-job summary rather than each export task's result.
+EXPORT_SUMMARY_RESULTS = env("EXPORT_SUMMARY_RESULTS")
 
 # django_analyses
 ANALYSIS_INTERFACES = interfaces
@@ -433,6 +438,17 @@ CELERY_RESULT_BACKEND = "django-db"
 CELERY_TASK_TRACK_STARTED = True
 CELERYD_TIME_LIMIT = 72000
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "probe-export-destinations": {
+        "task": "accounts.probe-export-destinations",
+        "schedule": EXPORT_HEALTH_INTERVAL,
+        "options": {"expires": EXPORT_HEALTH_INTERVAL},
+    },
+    "prune-task-lineage": {
+        "task": "accounts.prune-task-lineage",
+        "schedule": crontab(hour=4, minute=30),
+    },
+}
 
 # Uncomment to keep results forever
 # CELERY_RESULT_EXPIRES = 0
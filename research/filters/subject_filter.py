@@ -1,7 +1,10 @@
 """
 Definition of the :class:`SubjectFilter` class.
 """
-from django.db.models import Q
+from typing import Dict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
 from django_dicom.models.patient import Patient
 from django_filters import rest_framework as filters
 from django_mri.models.scan import Scan
@@ -132,3 +135,38 @@ class SubjectFilter(filters.FilterSet):
         return queryset.filter(
             custom_attributes__questionnaire_id__value=value
         )
+
+
+def filter_subjects(params: Dict, user=None) -> QuerySet:
+    """
+    Returns the subjects matching *params* (any of the :class:`SubjectFilter`
+    query parameters), restricted to the subjects *user* collaborates on
+    like :meth:`~research.views.subject.SubjectViewSet.filter_queryset`.
+    Used to resolve export cohorts server-side, without listing subject IDs.
+
+    Parameters
+    ----------
+    params : Dict
+        :class:`SubjectFilter` query parameters
+    user : User, optional
+        Requesting user, no subjects are matched if None
+
+    Returns
+    -------
+    QuerySet
+        Matching subjects
+
+    Raises
+    ------
+    ValidationError
+        If *params* are invalid
+    """
+    filterset = SubjectFilter(data=params, queryset=Subject.objects.all())
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    if user is None:
+        return Subject.objects.none()
+    queryset = filterset.qs
+    if not user.is_superuser:
+        queryset = queryset.filter_by_collaborators(user)
+    return queryset
@@ -1,6 +1,7 @@
 from accounts.tests.utils import LoggedInTestCase
 from django.test import TestCase
 from django.urls import reverse
+from research.filters.subject_filter import filter_subjects
 from rest_framework import status
 
 from ..factories import SubjectFactory
@@ -62,6 +63,50 @@ class LoggedInSubjectViewTestCase(LoggedInTestCase):
         response = self.client.get(reverse("research:subject-list"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_export_requires_subjects(self):
+        url = reverse("research:export_subject_data")
+        data = {"export_destination_id": 1, "mri": {}}
+        response = self.client.post(url, data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_invalid_filters(self):
+        url = reverse("research:export_subject_data")
+        data = {
+            "export_destination_id": 1,
+            "filters": {"study": "a,b"},
+            "mri": {},
+        }
+        response = self.client.post(url, data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("study", response.data)
+
+    def test_export_rejects_spoofed_cohort(self):
+        url = reverse("research:export_subject_data")
+        spoofed = {"subject_filters": {"id": self.test_subject.id}}
+        for parameters in (spoofed, {"user_id": self.user.id}):
+            data = {"export_destination_id": 1, "mri": parameters}
+            response = self.client.post(url, data=data, format="json")
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+        url = reverse("accounts:export_instance")
+        data = {
+            "app_label": "research",
+            "model_name": "Subject",
+            "export_destination_id": 1,
+            "instance_id": None,
+            **spoofed,
+        }
+        response = self.client.post(url, data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_subjects_restricted_to_collaborators(self):
+        params = {"id": self.test_subject.id}
+        self.assertFalse(filter_subjects(params).exists())
+        self.assertFalse(filter_subjects(params, user=self.user).exists())
+        self.user.is_superuser = True
+        self.assertEqual(filter_subjects(params, user=self.user).count(), 1)
+
     # def test_detail_view(self):
     #     url = self.test_subject.get_absolute_url()
     #     response = self.client.get(url)
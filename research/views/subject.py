@@ -3,7 +3,7 @@ Definition of the :class:`SubjectViewSet` class.
 """
 from typing import Callable, Dict
 
-from accounts.tasks import export_subject_mri_data
+from accounts.tasks import SERVER_EXPORT_ARGUMENTS, export_subject_mri_data
 from bokeh.client import pull_session
 from bokeh.embed import autoload_static, server_session
 from bokeh.resources import CDN
@@ -65,17 +65,42 @@ class SubjectViewSet(DefaultsMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=["POST"])
     def export_files(self, request):
-        try:
-            export_destination_id = request.data.pop("export_destination_id")
-            instance_id = request.data.pop("instance_id")
-        except KeyError:
-            Response(status.HTTP_400_BAD_REQUEST)
-        else:
-            for data_type, parameters in request.data.items():
-                handler = DATA_EXPORT_HANDLERS.get(data_type)
-                if handler:
-                    handler(export_destination_id, instance_id, **parameters)
-            return Response(status.HTTP_200_OK)
+        """
+        Exports the data of the subjects listed by *instance_id*, and/or of
+        the cohort matching *filters* (any of the :class:`SubjectFilter`
+        query parameters). Cohorts are resolved server-side by the export
+        tasks, restricted to the subjects the requesting user collaborates
+        on (see :meth:`filter_queryset`).
+        """
+        for parameters in request.data.values():
+            if isinstance(parameters, dict) and any(
+                key in parameters for key in SERVER_EXPORT_ARGUMENTS
+            ):
+                return Response(status=status.HTTP_400_BAD_REQUEST)
+        export_destination_id = request.data.pop("export_destination_id", None)
+        instance_id = request.data.pop("instance_id", None)
+        filters = request.data.pop("filters", None)
+        if export_destination_id is None or (
+            instance_id is None and filters is None
+        ):
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        kwargs = {}
+        if filters is not None:
+            filterset = SubjectFilter(
+                data=filters, queryset=Subject.objects.none()
+            )
+            if not filterset.is_valid():
+                return Response(
+                    data=filterset.errors, status=status.HTTP_400_BAD_REQUEST
+                )
+            kwargs = {"subject_filters": filters, "user_id": request.user.id}
+        for data_type, parameters in request.data.items():
+            handler = DATA_EXPORT_HANDLERS.get(data_type)
+            if handler:
+                handler(
+                    export_destination_id, instance_id, **parameters, **kwargs
+                )
+        return Response(status.HTTP_200_OK)
 
     @action(detail=False, methods=["GET"])
     def to_csv(self, request, *args, **kwargs):